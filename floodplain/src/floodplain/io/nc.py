@@ -11,133 +11,131 @@ import pandas as pd
 import geopandas as gpd
 from shapely.geometry import Point
 import xarray as xr
-import math
 import numpy as np
 from netCDF4 import Dataset
 import osr
 import textwrap
 
 EARTH_RADIUS = 6371000.
+
+PIXC_VARIABLES = ['classification', 'pixel_area',
+                  'longitude', 'latitude', 'height', 
+                  'range_index', 'azimuth_index',
+                  'inc', 'cross_track']
+TIDE_VARIABLES = ['pole_tide', 'load_tide_got', 'load_tide_fes', 'solid_earth_tide']
+
+
+def read_variable(group, name: str) -> np.array:
+    '''
+    Read a netcdf variable as a float array, fill values being replaced by NaN
+    
+    :param group: netCDF4 dataset or group containing the variable
+    :param name: variable name
+    :return 1D array of float
+    '''
+    values = group.variables[name][:]
+    return np.ma.filled(np.ma.asarray(values, dtype=float), np.nan)
+
+
 class PixcReader():
 
     def __init__(self, pixc: str, vec: str = None):
         '''
         Read pixel cloud file and vec file.
+        Variables are read once, in columnar form; point geometries are only built by get_data().
         
         :param pixc: filename of the pixel cloud file
         :param vec: filename of the vec file
         '''
         
-        # Read pixel cloud and convert to dataframe
-        dnc = xr.open_dataset(pixc,group="pixel_cloud")  
-        df = dnc.to_dataframe()
-        df = df.loc[df.index.get_level_values('complex_depth') == 0]
-
+        # Open pixel cloud file once, for all groups
+        with Dataset(pixc) as dnc:
+            dnc_pixc = dnc.groups["pixel_cloud"]
+            dnc_tvp = dnc.groups["tvp"]
         
-        try:        
-            df = df[['classification','pixel_area',
-                     'longitude','latitude', 'height', 
-                     'range_index', 'azimuth_index',
-                     'inc', 'cross_track', 'pole_tide', 'load_tide_got', 'load_tide_fes', 'solid_earth_tide', 'geoid']]
-                     
-            tide_correctly_loaded = True
-        except:
-            # should be removed, kept to be compatible with old simulations...
-            df = df[['classification','pixel_area',
-                'longitude','latitude', 'height', 
-                'range_index', 'azimuth_index',
-                'inc', 'cross_track', 'geoid']]
-            tide_correctly_loaded = False
-         
-        df = df.loc[(df.classification > 1.0)] # Keep only water pixel point
+            # Read pixel cloud variables
+            tide_correctly_loaded = all(name in dnc_pixc.variables for name in TIDE_VARIABLES)
+            if tide_correctly_loaded:
+                list_var = PIXC_VARIABLES + TIDE_VARIABLES + ['geoid']
+            else:
+                # should be removed, kept to be compatible with old simulations...
+                list_var = PIXC_VARIABLES + ['geoid']
+            df = pd.DataFrame({name: read_variable(dnc_pixc, name) for name in list_var}, columns=list_var)
+            
+            # Add information (range spacing)
+            nominal_range_spacing = dnc.getncattr("nominal_slant_range_spacing")
+            near_range = dnc.getncattr("near_range")
+            if "altitude" in dnc_tvp.variables:
+                height = read_variable(dnc_tvp, "altitude")
+            else:
+                # should be removed, kept to be compatible with old simulations...
+                height = read_variable(dnc_tvp, "height")
+            
+            # Get attributes
+            self.range_max = dnc_pixc.getncattr('interferogram_size_range')
+            self.azimuth_max = dnc_pixc.getncattr('interferogram_size_azimuth')
+            
+            # Read orbit
+            x_trj = read_variable(dnc_tvp, "x")[0:2]
+            y_trj = read_variable(dnc_tvp, "y")[0:2]
+            z_trj = read_variable(dnc_tvp, "z")[0:2]
         
+        df = df.loc[(df.classification > 1.0)] # Keep only water pixel point
         
-        # Read vec file and convert to dataframe
+        # Read vec file and join on range and azimuth indices
         if vec:
-            vec_dnc = xr.open_dataset(vec,decode_times=False)  
-            vec_df = vec_dnc.to_dataframe()
-            vec_df[['index_i']] = vec_df[['range_index']].astype(int)
-            vec_df[['index_j']] = vec_df[['azimuth_index']].astype(int)
-            vec_df = vec_df[['index_i', 'index_j', 'longitude_vectorproc',
-                             'latitude_vectorproc', 'height_vectorproc']]
-            vec_df.rename(columns={'longitude_vectorproc': 'longitude', 
-                    'latitude_vectorproc': 'latitude',
-                    'height_vectorproc': 'height'}, inplace=True)
+            with Dataset(vec) as vec_dnc:
+                vec_df = pd.DataFrame({'index_i': read_variable(vec_dnc, 'range_index').astype(int),
+                                       'index_j': read_variable(vec_dnc, 'azimuth_index').astype(int),
+                                       'longitude': read_variable(vec_dnc, 'longitude_vectorproc'),
+                                       'latitude': read_variable(vec_dnc, 'latitude_vectorproc'),
+                                       'height': read_variable(vec_dnc, 'height_vectorproc')}, 
+                                      columns=['index_i', 'index_j', 'longitude', 'latitude', 'height'])
             vec_df = vec_df.set_index(['index_i', 'index_j'])
             
             df = df.drop(['longitude','latitude', 'height'],axis=1)
-            df[['index_i']] = df[['range_index']].astype(int)
-            df[['index_j']] = df[['azimuth_index']].astype(int)
+            df = df.assign(index_i=df['range_index'].values.astype(int), index_j=df['azimuth_index'].values.astype(int))
             df = df.set_index(['index_i', 'index_j'])
             
             df = pd.concat([df, vec_df], axis=1,join='inner')
-            df = df.reset_index()
-            df = df.drop(['index_i','index_j'],axis=1)
-        
-        geom = [Point(x,y) for x, y in zip(df['longitude'], df['latitude'])]
-
-        # Create geodataframe
-        self.data = gpd.GeoDataFrame(df, geometry=geom)
+            
         # Drop Nan values
-        self.data.dropna(inplace=True)
+        self.data = df.dropna().reset_index(drop=True)
         # Longitude must be set between -180 and 180
-        self.data['longitude'] = self.data.apply(lambda row: row.longitude if row.longitude < 180.0 else row.longitude - 360.0,
-                                                 axis=1)
-        self.data[['range_index']] = self.data[['range_index']].astype(int)
-        self.data[['azimuth_index']] = self.data[['azimuth_index']].astype(int)
-         
-        # Add information (range spacing)
-        attrs_globals = xr.open_dataset(pixc).attrs
-        nominal_range_spacing = attrs_globals["nominal_slant_range_spacing"]
-        near_range = attrs_globals["near_range"]
-        try:
-            height = xr.open_dataset(pixc,group="tvp")["altitude"]
-        except:
-            # should be removed, kept to be compatible with old simulations...
-            height = xr.open_dataset(pixc,group="tvp")["height"]
-
-        #to be cleaned
-      
-        self.data['cos_alpha'] = self.data.apply(lambda row:
-                                           float(height[row['azimuth_index']])/(near_range + row['range_index'] * nominal_range_spacing), 
-                                            axis=1)
-        self.data['cos_alpha']  = self.data.apply(lambda row: min(row['cos_alpha'], 0.99999),axis=1)
-        self.data['range_spacing'] = self.data.apply(lambda row: nominal_range_spacing/math.sin(math.acos(row['cos_alpha'])),axis=1)
- 
-                                                   
-        # ~ self.data['range_spacing'] = self.data.apply(lambda row:
-                                           # ~ nominal_range_spacing / 
-                                           # ~ math.sin(math.acos(
-                                           # ~ float(height[row['azimuth_index']])/(near_range + row['range_index'] * nominal_range_spacing))), 
-                                           # ~ axis=1)
+        longitude = self.data['longitude'].values
+        self.data['longitude'] = np.where(longitude < 180.0, longitude, longitude - 360.0)
+        self.data['range_index'] = self.data['range_index'].values.astype(int)
+        self.data['azimuth_index'] = self.data['azimuth_index'].values.astype(int)
         
+        # Range spacing on ground
+        cos_alpha = height[self.data['azimuth_index'].values] / (near_range + self.data['range_index'].values * nominal_range_spacing)
+        self.data['cos_alpha'] = np.minimum(cos_alpha, 0.99999)
+        self.data['range_spacing'] = nominal_range_spacing / np.sin(np.arccos(self.data['cos_alpha'].values))
         
         # Compute wse using heights and corrections 
         ## TODO : Deal with nan correction and consider them as 0.
         if tide_correctly_loaded:
-            self.data['elevation'] = self.data.apply(lambda row: row['height']-row['pole_tide']-
-                                                row['load_tide_got']-row['load_tide_fes']-
-                                                row['solid_earth_tide']-row['geoid'], axis=1)
+            self.data['elevation'] = self.data['height'] - self.data['pole_tide'] - \
+                                     self.data['load_tide_got'] - self.data['load_tide_fes'] - \
+                                     self.data['solid_earth_tide'] - self.data['geoid']
         else:
             # should be removed, kept to be compatible with old simulations...
-            self.data['elevation'] = self.data.apply(lambda row: row['height']-row['geoid'], axis=1)            
-  
-        # Get attributes
-        self.range_max = dnc.attrs['interferogram_size_range']
-        self.azimuth_max = dnc.attrs['interferogram_size_azimuth']
+            self.data['elevation'] = self.data['height'] - self.data['geoid']
         
-        # Read orbit and convert to dataframe
-        dnc_trj = xr.open_dataset(pixc,group="tvp")  
-        df_trj = dnc_trj.to_dataframe()    
-            
-        d_az_trj =  np.sqrt((df_trj[['x']].values[0]-df_trj[['x']].values[1])**2+(df_trj[['y']].values[0]-df_trj[['y']].values[1])**2+(df_trj[['z']].values[0]-df_trj[['z']].values[1])**2)
-        alt = np.sqrt(df_trj[['x']].values[0]**2+df_trj[['y']].values[0]**2+df_trj[['z']].values[0]**2)
+        # Along-track sampling from the 2 first orbit points
+        d_az_trj = np.sqrt((x_trj[0]-x_trj[1])**2+(y_trj[0]-y_trj[1])**2+(z_trj[0]-z_trj[1])**2)
+        alt = np.sqrt(x_trj[0]**2+y_trj[0]**2+z_trj[0]**2)
         d_az_ground = d_az_trj*EARTH_RADIUS/alt
         
         self.along_track_sampling = d_az_ground
         
+        # Point geometries, built on first call of get_data()
+        self.geometry = None
+        
     def get_data(self) -> gpd.GeoDataFrame:
-        return self.data.copy()
+        if self.geometry is None:
+            self.geometry = [Point(x,y) for x, y in zip(self.data['longitude'].values, self.data['latitude'].values)]
+        return gpd.GeoDataFrame(self.data.copy(), geometry=list(self.geometry))
 
 
 def textjoin(text):
@@ -38,6 +38,7 @@ import multiprocessing as mp
 
 import cnes.common.lib.my_tools as my_tools
 import cnes.common.lib.my_timer as my_timer
+import cnes.common.lib_lake.lake_db as lake_db
 import cnes.common.lib_lake.locnes_filenames as locnes_filenames
 
 import pge_lake_sp
@@ -76,6 +77,8 @@ class MultiLakeSP(object):
         self.flag_prod_shp = in_params["flag_prod_shp"]
         # Flag to increment output file counter
         self.flag_inc_file_counter = in_params["flag_inc_file_counter"]
+        # Flag to process both swaths in parallel (not used when continental passes are processed in a pool of workers)
+        self.flag_parallel_swaths = in_params["flag_parallel_swaths"]
         
         # Log level
         self.error_file = in_params["errorFile"]
@@ -99,6 +102,7 @@ class MultiLakeSP(object):
         self.list_laketile_pixcvec_files = []
         self.nb_input = 0  # Nb of input files
         self.cmd_file_path_list = []  # list of command files
+        self.cmd_file_pass_list = []  # pass number of each command file
 
     def run_preprocessing(self):
         """
@@ -165,10 +169,12 @@ class MultiLakeSP(object):
         print("")
 
         print("[multiLakeSPProcessing]  Writing command files")
-        for (cycle_num, pass_num, continent_id) in self.cycle_pass_set:
+        # NB: sorted by pass, then continent, then cycle, so that successive continental passes cover the same PLD subset
+        for (cycle_num, pass_num, continent_id) in sorted(self.cycle_pass_set, key=lambda cur_key: (cur_key[1], cur_key[2], cur_key[0])):
             print("[multiLakeSPProcessing]  Writing command files for cycle %s orbit %s and continent_id %s" %(cycle_num, pass_num, continent_id))
             cmd_file = self.create_cmd_file(cycle_num, pass_num, continent_id)
             self.cmd_file_path_list.append(cmd_file)
+            self.cmd_file_pass_list.append(pass_num)
             print("")
 
     def run_processing(self, cmd_file = None):
@@ -186,6 +192,10 @@ class MultiLakeSP(object):
         timer_proc.start()  # Init timer
         
         if not cmd_file:
+            # Keep PLD subset in memory while processing continental passes of the same pass number
+            lake_db.enable_pld_cache()
+            prev_pass = None
+            
             for indf, cmd_file in enumerate(self.cmd_file_path_list):
                 print("")
                 print("")
@@ -195,6 +205,11 @@ class MultiLakeSP(object):
                 print("")
                 print("")
 
+                # 0 - Release PLD subset of another pass
+                if self.cmd_file_pass_list[indf] != prev_pass:
+                    lake_db.clear_pld_cache()
+                    prev_pass = self.cmd_file_pass_list[indf]
+
                 # 1 - Init
                 my_lake_sp = pge_lake_sp.PGELakeSP(cmd_file)
 
@@ -203,6 +218,9 @@ class MultiLakeSP(object):
 
                 # 3 - Stop
                 my_lake_sp.stop()
+                
+            # Release and disable PLD cache
+            lake_db.enable_pld_cache(False)
 
         else:
             print("")
@@ -229,12 +247,17 @@ class MultiLakeSP(object):
         print("")
 
     def run_multiprocessing(self):
+        """
+        Process SAS_L2_HR_LakeSP for each continental pass, with a pool of persistent worker processes
+        Each worker keeps its PLD subset in memory while it processes continental passes of the same pass number
+        """
         n_cores = int(mp.cpu_count())
-        pool = mp.Pool(n_cores)
-        with pool:
+        with mp.Pool(n_cores, initializer=init_worker) as pool:
             print('Running map')
             print("[multiLakeSPProcessing] PROCESSING...")
-            tmp_result = pool.map(self.run_processing, self.cmd_file_path_list)
+            # NB: chunksize=1 so that idle workers pull the next continental pass in queue order
+            for _ in pool.imap(run_lake_sp, zip(self.cmd_file_path_list, self.cmd_file_pass_list), chunksize=1):
+                pass
             pool.close()
             pool.join()
 
@@ -305,6 +328,8 @@ class MultiLakeSP(object):
         writer_command_file.write("Produce shp = " + str(self.flag_prod_shp) + "\n")
         writer_command_file.write("# To increment the file counter in the output filenames (=True, default); else=False\n")
         writer_command_file.write("Increment file counter = " + str(self.flag_inc_file_counter) + "\n")
+        writer_command_file.write("# To process both swaths in parallel, in 2 processes (=True); else=False (default)\n")
+        writer_command_file.write("Parallel swaths = " + str(self.flag_parallel_swaths) + "\n")
         writer_command_file.write("\n")
         
         # 3.5 - Fill LOGGING section
@@ -345,7 +370,54 @@ class MultiLakeSP(object):
     
 
 #######################################
-        
+
+
+# Context of the current worker process of the multiprocessing pool
+# - pass / int: pass number of the PLD subset currently in cache
+WORKER_CONTEXT = {}
+
+
+def init_worker():
+    """
+    Initialize a worker process of the multiprocessing pool (called once per worker)
+    """
+    WORKER_CONTEXT["pass"] = None
+    lake_db.enable_pld_cache()
+
+
+def run_lake_sp(in_task):
+    """
+    Process SAS_L2_HR_LakeSP for one continental pass, within a worker process of the multiprocessing pool
+    The PLD subset in cache is released only when the continental pass belongs to another pass than the previous one of the worker
+    
+    :param in_task: command file full path, pass number
+    :type in_task: tuple
+    """
+    (cmd_file, pass_num) = in_task
+    
+    print("")
+    print("***********************************************")
+    print("***** Dealing with command file %s *****" % cmd_file)
+    print("***********************************************")
+    print("")
+    
+    # 0 - Release PLD subset of another pass
+    if pass_num != WORKER_CONTEXT["pass"]:
+        lake_db.clear_pld_cache()
+        WORKER_CONTEXT["pass"] = pass_num
+
+    # 1 - Init
+    my_lake_sp = pge_lake_sp.PGELakeSP(cmd_file)
+
+    # 2 - Run
+    my_lake_sp.start()
+
+    # 3 - Stop
+    my_lake_sp.stop()
+
+
+#######################################
+
 
 def read_command_file(in_filename):
     """
@@ -369,6 +441,7 @@ def read_command_file(in_filename):
     out_params["pass_num"] = None
     out_params["flag_prod_shp"] = False
     out_params["flag_inc_file_counter"] = True
+    out_params["flag_parallel_swaths"] = False
     out_params["errorFile"] = None
     out_params["logFile"] = None
     out_params["logfilelevel"] = "DEBUG"
@@ -421,6 +494,9 @@ def read_command_file(in_filename):
         # Flag to increment the file counter in the output filenames (=True, default); else=False
         if "increment file counter" in list_options:
             out_params["flag_inc_file_counter"] = config.get("OPTIONS", "Increment file counter")
+        # Flag to process both swaths in parallel (=True); else=False (default)
+        if "parallel swaths" in list_options:
+            out_params["flag_parallel_swaths"] = config.getboolean("OPTIONS", "Parallel swaths")
             
     # 6 - Retrieve LOGGING
     if "LOGGING" in config.sections():
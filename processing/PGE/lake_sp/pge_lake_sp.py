@@ -140,6 +140,7 @@ class PGELakeSP():
         # Default values
         out_params["flag_prod_shp"] = False
         out_params["flag_inc_file_counter"] = True
+        out_params["flag_parallel_swaths"] = False
 
         # 1 - Read parameter file
         config = configparser.ConfigParser()
@@ -179,6 +180,9 @@ class PGELakeSP():
             # Flag to increment the file counter in the output filenames (=True, default); else=False
             if "increment file counter" in list_options:
                 out_params["flag_inc_file_counter"] = config.get("OPTIONS", "Increment file counter")
+            # Flag to process both swaths in parallel (=True); else=False (default)
+            if "parallel swaths" in list_options:
+                out_params["flag_parallel_swaths"] = config.get("OPTIONS", "Parallel swaths")
 
         # 6 - Retrieve LOGGING
         error_file = config.get("LOGGING", "errorFile")
@@ -252,6 +256,7 @@ class PGELakeSP():
             self.cfg.add_section(section)
             self.cfg.set(section, "Produce shp", param_list["flag_prod_shp"])
             self.cfg.set(section, "Increment file counter", param_list["flag_inc_file_counter"])
+            self.cfg.set(section, "Parallel swaths", param_list["flag_parallel_swaths"])
             
             # Add section FILE_INFORMATION
             section = "FILE_INFORMATION"
@@ -335,6 +340,9 @@ class PGELakeSP():
             # Increment output file counter
             self.cfg.test_var_config_file('OPTIONS', 'Increment file counter', bool, logger=logger)
             logger.debug('OK - Increment file counter = ' + str(self.cfg.get('OPTIONS', 'Increment file counter')))
+            # Process both swaths in parallel
+            self.cfg.test_var_config_file('OPTIONS', 'Parallel swaths', bool, logger=logger)
+            logger.debug('OK - Parallel swaths = ' + str(self.cfg.get('OPTIONS', 'Parallel swaths')))
             
             # 5 - FILE_INFORMATION section
             # Name of producing agency
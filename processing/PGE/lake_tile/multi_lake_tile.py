@@ -30,13 +30,18 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import argparse
 import configparser as cfg
 import datetime
+import math
 import os
 import sys
 import multiprocessing as mp
+from osgeo import ogr
 
 import cnes.common.lib.my_tools as my_tools
 import cnes.common.lib.my_timer as my_timer
+import cnes.common.lib_lake.lake_db as lake_db
 import cnes.common.lib_lake.locnes_filenames as locnes_filenames
+import cnes.sas.lake_tile.proc_pixc as proc_pixc
+import cnes.common.service_config_file as service_config_file
 import pge_lake_tile
 
 
@@ -185,23 +190,38 @@ class MultiLakeTile(object):
         timer_proc.start()  # Init timer
         
         if not cmd_file:
-            for indf, cmd_file in enumerate(self.cmd_file_path_list) :
-                print("")
-                print("")
-                print("***********************************************")
-                print("***** Dealing with command file %d / %d *****" % (indf+1, len(self.cmd_file_path_list)))
-                print("***********************************************")
-                print("")
-                print("")
-
-                # 1 - Init
-                my_lake_tile = pge_lake_tile.PGELakeTile(cmd_file)
-
-                # 2 - Run
-                my_lake_tile.start()
-
-                # 3 - Stop
-                my_lake_tile.stop()
+            
+            # Group tiles by pass, in order to load the PLD only once per pass
+            dict_pass = self.group_tiles_by_pass()
+            
+            cpt_file = 0
+            for cur_pass in sorted(dict_pass.keys()):
+                
+                # 0 - Load PLD over the footprint of all the tiles of the pass
+                self.preload_lake_db(dict_pass[cur_pass])
+                
+                for indf in dict_pass[cur_pass]:
+                    cpt_file += 1
+                    cmd_file = self.cmd_file_path_list[indf]
+                    print("")
+                    print("")
+                    print("***********************************************")
+                    print("***** Dealing with command file %d / %d *****" % (cpt_file, len(self.cmd_file_path_list)))
+                    print("***********************************************")
+                    print("")
+                    print("")
+    
+                    # 1 - Init
+                    my_lake_tile = pge_lake_tile.PGELakeTile(cmd_file)
+    
+                    # 2 - Run
+                    my_lake_tile.start()
+    
+                    # 3 - Stop
+                    my_lake_tile.stop()
+                    
+            # Release and disable PLD cache
+            lake_db.enable_pld_cache(False)
 
         else :
             print("")
@@ -227,16 +247,106 @@ class MultiLakeTile(object):
         print("")
         print("")
 
+    def group_tiles_by_pass(self):
+        """
+        Group tiles by pass number; the ground footprint of a pass being the same for all cycles,
+        the PLD subset loaded for a pass can be reused by the tiles of all cycles
+        
+        :return: out_dict_pass = indices of the tiles within the list of PIXC files, sorted by tile then cycle 
+                    (i.e. neighbouring tiles are consecutive), for each pass number
+        :rtype: dict
+        """
+        out_dict_pass = {}
+        for indf, pixc_file in enumerate(self.list_pixc):
+            information = locnes_filenames.get_info_from_filename(pixc_file, "PIXC")
+            out_dict_pass.setdefault(information["pass"], []).append((information["tile_ref"], information["cycle"], indf))
+        for cur_pass in out_dict_pass:
+            out_dict_pass[cur_pass] = [indf for (tile_ref, cycle_num, indf) in sorted(out_dict_pass[cur_pass])]
+        return out_dict_pass
+
+    def compute_footprint(self, in_list_indf):
+        """
+        Compute the union of the polygons of the given tiles
+        
+        :param in_list_indf: indices of the tiles within the list of PIXC files
+        :type in_list_indf: list of int
+        
+        :return: footprint of the tiles
+        :rtype: ogr.Geometry
+        """
+        footprint = ogr.Geometry(ogr.wkbMultiPolygon)
+        for indf in in_list_indf:
+            footprint.AddGeometry(proc_pixc.get_tile_poly_from_pixc_file(os.path.join(self.pixc_dir, self.list_pixc[indf])))
+        return footprint.UnionCascaded()
+
+    def preload_lake_db(self, in_list_indf):
+        """
+        Load in cache the subset of the PLD covering the footprint of the given tiles;
+        this subset is then reused by the LakeTile processing of each of these tiles
+        
+        :param in_list_indf: indices of the tiles within the list of PIXC files
+        :type in_list_indf: list of int
+        """
+        
+        if self.lake_db is None:
+            return
+        
+        print("[multiLakeTileProcessing] Loading PLD over %d tile(s)..." % len(in_list_indf))
+        
+        # 1 - Compute footprint of the tiles
+        footprint = self.compute_footprint(in_list_indf)
+        
+        # 2 - Replace PLD subset of the previous tiles
+        lake_db.clear_pld_cache()
+        lake_db.preload_pld(self.lake_db, footprint)
+
     def run_multiprocessing(self):
+        """
+        Process SAS_L2_HR_LakeTile for each input tile, with a pool of persistent worker processes
+        Tiles are queued by runs of consecutive tiles of the same pass: the worker processing a run 
+        loads the PLD only over the footprint of the tiles of this run, and reuses it for all of them
+        """
         n_cores = int(mp.cpu_count())
-        pool = mp.Pool(n_cores)
-        with pool:
+        
+        # 1 - Build the queue of runs of tiles, i.e. (list of command files, WKT of the footprint of these tiles)
+        # NB: about NB_TASKS_PER_WORKER runs per worker, for load balancing between workers
+        size_run = max(1, int(math.ceil(len(self.cmd_file_path_list) / float(n_cores * NB_TASKS_PER_WORKER))))
+        list_tasks = []
+        dict_pass = self.group_tiles_by_pass()
+        for cur_pass in sorted(dict_pass.keys()):
+            for ind_start in range(0, len(dict_pass[cur_pass]), size_run):
+                list_indf = dict_pass[cur_pass][ind_start:ind_start+size_run]
+                footprint_wkt = None
+                if self.lake_db is not None:
+                    footprint_wkt = self.compute_footprint(list_indf).ExportToWkt()
+                list_tasks.append(([self.cmd_file_path_list[indf] for indf in list_indf], footprint_wkt))
+        print("[multiLakeTileProcessing] %d tile(s) queued in %d run(s) of at most %d tile(s)" % (len(self.cmd_file_path_list), 
+                                                                                                   len(list_tasks), size_run))
+                
+        # 2 - Run the tiles on the pool
+        with mp.Pool(n_cores, initializer=init_worker, initargs=(self.lake_db, self.get_param_file())) as pool:
             print('Running map')
             print("[multiLakeTileProcessing] PROCESSING...")
-            tmp_result = pool.map(self.run_processing, self.cmd_file_path_list)
+            # NB: chunksize=1 so that idle workers pull the next run in queue order
+            for _ in pool.imap(run_lake_tile, list_tasks, chunksize=1):
+                pass
             pool.close()
             pool.join()
 
+    def get_param_file(self):
+        """
+        Get the parameter file written in the command files
+        
+        :return: parameter file full path
+        :rtype: string
+        """
+        if self.param_file is not None:
+            retour = self.param_file
+        else:
+            # needed by jenkins script
+            retour = os.path.join(sys.path[0], "lake_tile_param.cfg")
+        return retour
+
     def create_cmd_file(self, indf):
         """
         Create command file for PGE_L2_HR_LakeTile for each input tile
@@ -284,11 +394,7 @@ class MultiLakeTile(object):
         
         # 5.1 - Fill PATHS section
         writer_command_file.write("[PATHS]\n")
-        if self.param_file is not None:
-            writer_command_file.write("param_file = %s\n" % self.param_file)
-        else:
-            # needed by jenkins script
-            writer_command_file.write("param_file = " + os.path.join(sys.path[0], "lake_tile_param.cfg") + "\n")
+        writer_command_file.write("param_file = %s\n" % self.get_param_file())
 
         writer_command_file.write("PIXC file = " + pixc_file + "\n")
         writer_command_file.write("PIXCVecRiver file = " + os.path.join(self.pixcvec_river_dir, self.list_pixcvec_river[indf]) + "\n")
@@ -347,6 +453,72 @@ class MultiLakeTile(object):
 #######################################
 
 
+# Number of runs of tiles queued per worker process of the multiprocessing pool
+NB_TASKS_PER_WORKER = 4
+
+# Context of the current worker process of the multiprocessing pool
+# - lake_db / str: full path of the PLD
+WORKER_CONTEXT = {}
+
+
+def init_worker(in_lake_db, in_param_file):
+    """
+    Initialize a worker process of the multiprocessing pool (called once per worker):
+    the parameter file, shared by all the tiles, is parsed once for all the tiles of the worker
+    
+    :param in_lake_db: full path of the PLD (=None if no PLD)
+    :type in_lake_db: str
+    :param in_param_file: full path of the parameter file written in the command files
+    :type in_param_file: str
+    """
+    WORKER_CONTEXT["lake_db"] = in_lake_db
+    
+    # Path as read by PGELakeTile in the command files
+    param_file = os.path.expandvars(in_param_file)
+    if os.path.exists(param_file):
+        service_config_file.preload_config(param_file)
+
+
+def run_lake_tile(in_task):
+    """
+    Process SAS_L2_HR_LakeTile for a run of consecutive tiles of the same pass, within a worker process of the multiprocessing pool
+    The PLD subset covering these tiles is loaded once, and reused for all of them
+    NB: the configuration and logging services are set up for each tile, as the command and log files are specific to each tile
+    
+    :param in_task: list of command files full path, WKT of the footprint of the tiles
+    :type in_task: tuple
+    """
+    (list_cmd_file, footprint_wkt) = in_task
+    
+    # 0 - Load PLD over the footprint of the tiles
+    if WORKER_CONTEXT["lake_db"] is not None:
+        lake_db.clear_pld_cache()
+        lake_db.preload_pld(WORKER_CONTEXT["lake_db"], ogr.CreateGeometryFromWkt(footprint_wkt))
+    
+    for cmd_file in list_cmd_file:
+    
+        print("")
+        print("***********************************************")
+        print("***** Dealing with command file %s *****" % cmd_file)
+        print("***********************************************")
+        print("")
+
+        # 1 - Init
+        my_lake_tile = pge_lake_tile.PGELakeTile(cmd_file)
+
+        # 2 - Run
+        my_lake_tile.start()
+
+        # 3 - Stop
+        my_lake_tile.stop()
+        
+    # 4 - Release PLD cache
+    lake_db.clear_pld_cache()
+
+
+#######################################
+
+
 def read_command_file(in_filename):
     """
     Read the command file in input and store parameters in a dictionary
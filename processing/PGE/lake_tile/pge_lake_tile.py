@@ -406,6 +406,9 @@ class PGELakeTile():
             # max number of contour points for hull computation 2
             self.cfg.test_var_config_file('CONFIG_PARAMS', 'NB_PIX_MAX_CONTOUR', int, val_default=8000, logger=logger)
             logger.debug('OK - NB_PIX_MAX_CONTOUR = ' + str(self.cfg.get('CONFIG_PARAMS', 'NB_PIX_MAX_CONTOUR')))
+            # Number of processes computing lake boundaries in parallel
+            self.cfg.test_var_config_file('CONFIG_PARAMS', 'NB_PROC_HULL', int, val_default=1, logger=logger)
+            logger.debug('OK - NB_PROC_HULL = ' + str(self.cfg.get('CONFIG_PARAMS', 'NB_PROC_HULL')))
 
             # Big lakes parameters for improved geoloc
             self.cfg.test_var_config_file('CONFIG_PARAMS', 'BIGLAKE_MODEL', str, valeurs=["polynomial", "no"], val_default="polynomial", logger=logger)
@@ -576,17 +579,20 @@ class PGELakeTile():
 
             # 1 - Read input data
             logger.info("> 1 - Init and format input objects...")
-            self._read_input_data()
+            with my_timer.stage("LakeTile.read_input_data"):
+                self._read_input_data()
             logger.info("")
             
             # 2 - Read lake db
             logger.info("> 2 - Init and read lake DB object...")
-            self._read_lake_db()
+            with my_timer.stage("LakeTile.read_lake_db"):
+                self._read_lake_db()
             logger.info("")
 
             # 3 - Prepare output data
             logger.info("> 3 - Prepare output objects...")
-            self._prepare_output_data()
+            with my_timer.stage("LakeTile.prepare_output_data"):
+                self._prepare_output_data()
             logger.info("")
             
             logger.info("****************************")
@@ -595,25 +601,29 @@ class PGELakeTile():
             
             # 4 - Initialization
             logger.info("> 4 - Initialization of SASLakeTile class")
-            my_lake_tile = sas_lake_tile.SASLakeTile(self.obj_pixc, self.obj_pixcvec, self.obj_lake_db, self.obj_lake)
+            with my_timer.stage("LakeTile.initialization"):
+                my_lake_tile = sas_lake_tile.SASLakeTile(self.obj_pixc, self.obj_pixcvec, self.obj_lake_db, self.obj_lake)
             logger.info(self.timer.info(0)) 
             logger.info("")         
             
             # 5 - Run pre-processing
             logger.info("> 5 - Run SASpre-processing")
-            my_lake_tile.run_preprocessing()
+            with my_timer.stage("LakeTile.preprocessing"):
+                my_lake_tile.run_preprocessing()
             logger.info(self.timer.info(0))
             logger.info("")
             
             # 6 - Run processing
             logger.info("> 6 - Run SASprocessing")
-            my_lake_tile.run_processing()
+            with my_timer.stage("LakeTile.processing"):
+                my_lake_tile.run_processing()
             logger.info(self.timer.info(0))
             logger.info("")
     
             # 7 - Run post-processing
             logger.info("> 7 - Run SASpost-processing")
-            my_lake_tile.run_postprocessing()
+            with my_timer.stage("LakeTile.postprocessing"):
+                my_lake_tile.run_postprocessing()
             logger.info(self.timer.info(0))
             logger.info("")
             
@@ -623,7 +633,8 @@ class PGELakeTile():
             
             # 8 - Write output data
             logger.info("> 8 - Write output data")
-            self._write_output_data()
+            with my_timer.stage("LakeTile.write_output_data"):
+                self._write_output_data()
             
         except service_error.SwotError:
             raise
@@ -585,15 +585,18 @@ def get_polygon_from_binar_image( in_range, in_azimuth, in_v_long, in_v_lat):
         lake_contours = find_contours(lake_img, 0.99999999999)
 
     # 5 - Round contour range and azimuth coordinates to units, since they are indices in input parameters
-    # Removing duplicate points from lake contour
+    # Removing duplicate points from lake contour (1st occurrence kept, in contour order)
     lake_contour_int = []
 
     for contour in lake_contours:
-        contour_points = []
+        contour_round = np.round(contour, 0).astype(int)
+        _, idx_first = np.unique(contour_round, axis=0, return_index=True)
+        lake_contour_int.append(contour_round[np.sort(idx_first)])
 
-        [contour_points.append(tuple(np.round(coords, 0))) for coords in contour if tuple(np.round(coords, 0)) not in contour_points]
-
-        lake_contour_int.append(contour_points)
+    # Index image: for each (azimuth, range) pixel, index of the 1st input point located on it (-1 if none)
+    idx_img = np.full(lake_img.shape, -1, dtype=np.int64)
+    _, idx_first = np.unique(lake_y * lake_img.shape[1] + lake_x, return_index=True)
+    idx_img[lake_y[idx_first], lake_x[idx_first]] = idx_first
 
     # 6 - Convert (azimuth, range) contour into polygon
     logger.debug("Inital polygon contains 1 external ring and %d holes rings " % (len(lake_contour_int) - 1))
@@ -609,28 +612,50 @@ def get_polygon_from_binar_image( in_range, in_azimuth, in_v_long, in_v_lat):
         if len(contour) > 8000:
             logger.warning("Current contour contains %d points ... can be time consuming" % len(contour))
 
+        # Retrieve index of input points from range and azimuth coordinates
+        contour_idx = idx_img[contour[:, 0], contour[:, 1]]
+
         list_of_points = []
+        set_of_points = set()
+        # Bounding boxes (xmin, ymin, xmax, ymax) of the segments of list_of_points
+        seg_bbox = np.empty((len(contour), 4))
 
-        for (y, x) in contour:  # Look over azimuth and range indices
+        for (y, x), point_idx in zip(contour, contour_idx):  # Look over azimuth and range indices
 
             # Retrieve lon/lat coordinates from range and azimtu coordinates
             # if current range and azimuth are found in input range and azimuth list
-            if np.where(np.logical_and(lake_x == x, lake_y == y))[0].any():
-                point_idx = np.where(np.logical_and(lake_x == x, lake_y == y))[0][0]
-                lon = in_v_long[point_idx]
-                lat = in_v_lat[point_idx]
-
-                new_point = (lon, lat)
+            if point_idx >= 0:
+                new_point = (in_v_long[point_idx], in_v_lat[point_idx])
 
                 # Add new point :
                 #     - if new_point not in list
                 #     - if list contains more than 3 points : check if new points create a crossing between segments
-                if new_point not in list_of_points:
-                    if len(list_of_points) < 3:
-                        list_of_points.append(new_point)
-                    else:
+                if new_point in set_of_points:
+                    continue
+                nb_points = len(list_of_points)
+                if nb_points >= 3:
+                    # A crossing is only possible with a segment whose bounding box overlaps the one of the new segment
+                    # (last segment of list_of_points excluded, since it shares the previous point)
+                    (prev_lon, prev_lat) = list_of_points[-1]
+                    cur_bbox = seg_bbox[:nb_points-2]
+                    flag_crossing = np.any((cur_bbox[:, 0] <= max(prev_lon, new_point[0])) &
+                                           (cur_bbox[:, 2] >= min(prev_lon, new_point[0])) &
+                                           (cur_bbox[:, 1] <= max(prev_lat, new_point[1])) &
+                                           (cur_bbox[:, 3] >= min(prev_lat, new_point[1])))
+                    if flag_crossing:
                         list_of_points = add_new_point_to_list_of_point(new_point, list_of_points)
-                # code commenté : list_of_points = addNewPoint(new_point, list_of_points)
+                        set_of_points = set(list_of_points)
+                        # Rebuild bounding boxes of segments
+                        coords = np.array(list_of_points)
+                        seg_bbox[:len(coords)-1, :2] = np.minimum(coords[:-1], coords[1:])
+                        seg_bbox[:len(coords)-1, 2:] = np.maximum(coords[:-1], coords[1:])
+                        continue
+                if nb_points >= 1:
+                    (prev_lon, prev_lat) = list_of_points[-1]
+                    seg_bbox[nb_points-1] = (min(prev_lon, new_point[0]), min(prev_lat, new_point[1]),
+                                             max(prev_lon, new_point[0]), max(prev_lat, new_point[1]))
+                list_of_points.append(new_point)
+                set_of_points.add(new_point)
             else:
                 logger.debug("Point of coordinates %d, %d not found -> Point removed" % (y, x))
 
@@ -37,6 +37,10 @@ import cnes.common.service_error as service_error
 import cnes.common.lib.my_variables as my_var
 
 
+# Number of elements along the 1st dimension read at once when reading a subset of a variable
+NC_READ_CHUNK_SIZE = 1000000
+
+
 class MyNcReader(object):
     """
         class MyNcReader
@@ -160,6 +164,22 @@ class MyNcReader(object):
             retour = in_group.getncattr(in_name)
         return retour
     
+    def get_dict_att(self, in_group=None):
+        """
+        Get all the global attributes in a single pass over the NetCDF file
+        
+        :param in_group: group containing the global attributes
+        :type in_group: netCDF4.Group
+        
+        :return: value associated to each attribute name
+        :rtype: dict
+        """
+        if in_group is None:
+            retour = dict(self.content.__dict__)
+        else:
+            retour = dict(in_group.__dict__)
+        return retour
+    
     #----------------------------------------
     
     def get_list_var(self, in_group=None):
@@ -194,16 +214,23 @@ class MyNcReader(object):
         for value in list_var:
             print(value + " - units = " + self.get_var_unit(value, in_group=in_group))
     
-    def get_var_value(self, in_name, in_group=None):
+    def get_var_value(self, in_name, in_group=None, in_index=None, in_chunk_size=NC_READ_CHUNK_SIZE):
         """
         Get the data associated to the variable in_name
         _FillValue values are converted to numpy.nan
         The multiplication by the scale_factor is done if there is a scale_factor attribute 
         
+        If in_index is given, only the corresponding elements along the 1st dimension are returned (in the order of in_index);
+        the variable is then read by contiguous chunks of in_chunk_size elements, so that it is never loaded at full size
+        
         :param in_name: name of the variable
         :type in_name: string
         :param in_group: group containing the variable in_name (optionnal)
         :type in_group: netCDF4.Group
+        :param in_index: indices of the elements to read along the 1st dimension (optionnal; =None to read all)
+        :type in_index: 1D-array of int
+        :param in_chunk_size: number of elements along the 1st dimension read at once when in_index is given
+        :type in_chunk_size: int
         
         :return: out_data = formatted data
         :rtype: numpy.array
@@ -219,7 +246,10 @@ class MyNcReader(object):
         # 1 - Get data
         try:
             variable_obj = cur_content.variables[in_name]
-            out_data = numpy.copy(variable_obj[:])
+            if in_index is None:
+                out_data = numpy.copy(variable_obj[:])
+            else:
+                out_data = read_var_subset(variable_obj, in_index, in_chunk_size)
         except KeyError:
             message = "Variable %s does not exist in NetCDF file" % in_name
             raise service_error.ProcessingError(message, logger)
@@ -291,6 +321,22 @@ class MyNcReader(object):
 
         return out_data
     
+    def get_dict_var(self, in_list_name=None, in_group=None):
+        """
+        Get the data of several variables in a single pass over the NetCDF file (see get_var_value for formatting)
+        
+        :param in_list_name: names of the variables to read (=None to read all variables)
+        :type in_list_name: list of string
+        :param in_group: group containing the variables (optionnal)
+        :type in_group: netCDF4.Group
+        
+        :return: formatted data of each variable name
+        :rtype: dict
+        """
+        if in_list_name is None:
+            in_list_name = self.get_list_var(in_group=in_group)
+        return {name: self.get_var_value(name, in_group=in_group) for name in in_list_name}
+    
     def get_var_unit(self, in_name, in_group=None):
         """
         Get the unit of variable named in_name
@@ -321,6 +367,50 @@ class MyNcReader(object):
 #######################################
 
 
+def read_var_subset(in_variable, in_index, in_chunk_size=NC_READ_CHUNK_SIZE):
+    """
+    Read the elements in_index along the 1st dimension of a NetCDF variable, by contiguous chunks of in_chunk_size elements
+    
+    :param in_variable: NetCDF variable
+    :type in_variable: netCDF4.Variable
+    :param in_index: indices of the elements to read along the 1st dimension
+    :type in_index: 1D-array of int
+    :param in_chunk_size: number of elements along the 1st dimension read at once
+    :type in_chunk_size: int
+    
+    :return: out_data = data of the selected elements, in the order of in_index
+    :rtype: numpy.array
+    """
+    
+    # 1 - Sort indices to read the variable sequentially
+    index = numpy.asarray(in_index, dtype=numpy.int64)
+    sorted_order = numpy.argsort(index, kind="stable")
+    sorted_index = index[sorted_order]
+    
+    # 2 - Read chunks containing at least one selected element
+    list_data = []
+    list_chunk, list_first = numpy.unique(sorted_index // in_chunk_size, return_index=True)
+    list_last = numpy.append(list_first[1:], sorted_index.size)
+    for chunk, first, last in zip(list_chunk, list_first, list_last):
+        start = int(chunk) * in_chunk_size
+        stop = min(start + in_chunk_size, in_variable.shape[0])
+        cur_index = sorted_index[first:last] - start
+        list_data.append(numpy.copy(in_variable[start:stop][cur_index]))
+    
+    # 3 - Restore order of in_index
+    if list_data:
+        sorted_data = numpy.concatenate(list_data)
+    else:
+        sorted_data = numpy.copy(in_variable[0:0])
+    out_data = numpy.empty_like(sorted_data)
+    out_data[sorted_order] = sorted_data
+    
+    return out_data
+
+
+#######################################
+
+
 class MyNcWriter(object):
     """
         class MyNcWriter
@@ -27,7 +27,6 @@ import logging
 import numpy as np
 from numpy.lib.stride_tricks import as_strided
 
-from scipy.cluster import hierarchy
 from scipy.ndimage import median_filter
 import scipy.ndimage as ndimage
 
@@ -42,12 +41,18 @@ if skimage.__version__ >= "0.11":
 else:
     from skimage.filter.rank import median as median_filter
 
-from sklearn.cluster import KMeans, MeanShift, estimate_bandwidth
+from sklearn.cluster import MeanShift, estimate_bandwidth
 
 import cnes.common.lib.my_tools as my_tools
 import cnes.common.service_error as service_error
 
 
+# Width (in m) of the height bins used by histogram-based clustering (k-means method)
+HEIGHT_BIN_SIZE = 0.01
+# Maximum number of height bins; bins are widened for larger height ranges
+HEIGHT_NB_BINS_MAX = 10000
+
+
 def relabel_lake_using_segmentation_heigth(in_x, in_y, in_height, in_pix_area, min_size, height_segmentation_method):
     """
     This function main interest is to determine the number of lakes inside a subset of PixC in radar geometry.
@@ -146,41 +151,19 @@ def relabel_lake_using_segmentation_heigth(in_x, in_y, in_height, in_pix_area, m
 
     elif height_segmentation_method == 5:
         logger.debug("Lake segmentation method = k-means clustering method")
-        std_heigth = np.std(in_height)
-        nb_classes = 1
-
-        min_count = 100
-        nb_pix_min_by_class = 30
-
-        labels = None
-
-        in_std_height_max = 1
-        out_labels = np.ones(in_height.shape)
-        while std_heigth > in_std_height_max and min_count > nb_pix_min_by_class:
-            nb_classes += 1
-            # Cluster height over nb_classes classes
-            kmeans_classif = KMeans(n_clusters=nb_classes)
-            kmeans_classif.fit(in_height.reshape(-1, 1))  # Turn line into column for in_height
-
-            out_labels = kmeans_classif.labels_
-            # Compute heigth std inside each class
-            std_heigth = np.max([np.std(in_height[np.where(labels == curLabel)]) for curLabel in np.unique(labels)])
-
-            unique_labels, counts = np.unique(labels, return_counts=True)
-            min_count = np.min(counts)
-            # If number of classes upper than 10 => stop iteration
-            if nb_classes > 10:
-                break
+        out_labels, nb_classes, std_heigth = get_kmeans_labelling(in_height)
         logger.debug("NB classes : %d, max std : %f " % (nb_classes, std_heigth))
 
     elif height_segmentation_method == 6:
         logger.debug("Lake segmentation method = hierarchical clustering")
-        # buid matrix
+        # Single-linkage clustering with a distance threshold over heights (duplicated in 2 columns, as done before 
+        # with hierarchy.fclusterdata, i.e. distance = sqrt(2) * height difference) is equivalent to sorting heights
+        # and splitting where the gap between consecutive heights is over the threshold; no distance matrix is built
         thresh = 1.5
-        mat = np.zeros((in_height.size, 2))
-        mat[:, 0] = in_height
-        mat[:, 1] = in_height
-        tmp_labels = hierarchy.fclusterdata(mat, thresh, criterion="distance")
+        sorted_idx = np.argsort(in_height, kind="mergesort")
+        flag_gap = np.sqrt(2.) * np.diff(in_height[sorted_idx]) > thresh
+        tmp_labels = np.zeros(in_height.shape, dtype=int)
+        tmp_labels[sorted_idx] = np.cumsum(np.concatenate(([1], flag_gap.astype(int))))
         out_labels = split_labels_by_region(in_x, in_y, tmp_labels)
 
     elif height_segmentation_method == 7:
@@ -264,11 +247,7 @@ def get_1d_from_2d(in_img, in_x, in_y):
     :type: 1D array of int or float
     """
 
-    out_vect = np.zeros(in_x.shape, dtype=in_img.dtype)
-    nb_pts = in_x.size
-
-    for ind in range(nb_pts):
-        out_vect[ind] = in_img[in_y[ind], in_x[ind]]
+    out_vect = np.asarray(in_img[in_y, in_x], dtype=in_img.dtype)
     return out_vect
 
 
@@ -289,11 +268,8 @@ def get_2d_from_1d(in_values, in_x, in_y):
     if (in_x.size != in_y.size) or (in_x.size != in_values.size):
         raise ValueError("in_values, in_x and in_y must be the same size but are : in_values = %d in_x = %d and in_y = %d" \
                          % (in_values.size, in_x.size, in_y.size))
-    nb_pts = in_x.size
-
     out_img = np.zeros((np.max(in_y) + 1, np.max(in_x) + 1), dtype=in_values.dtype)
-    for ind in range(nb_pts):
-        out_img[in_y[ind], in_x[ind]] = in_values[ind]
+    out_img[in_y, in_x] = in_values
 
     return out_img
 
@@ -373,6 +349,171 @@ def get_otsu_labelling(in_height, in_pix_area, min_size):
     return out_labels, split_lake_flag
 
 
+def get_kmeans_labelling(in_height, in_std_height_max=1):
+    """
+    This function clusters heights with k-means, over 2 classes if height std is over in_std_height_max.
+    NB: the former implementation was designed to add classes (up to 11) until the height std of each class is below 
+    in_std_height_max, but its stopping test always stopped the iterations after 2 classes; this behaviour is kept.
+
+    :param in_height: height of pixels
+    :type in_height: 1D vector of float
+    :param in_std_height_max: height std over which heights are clustered
+    :type in_std_height_max: float
+
+    :return out_labels: class of each pixel (from 1 to out_nb_classes)
+    :type out_labels: 1D vector of int
+    :return out_nb_classes: number of classes
+    :type out_nb_classes: int
+    :return out_std_height: maximum height std of the classes
+    :type out_std_height: float
+    """
+    out_std_height = np.std(in_height)
+    out_nb_classes = 1
+    out_labels = np.ones(in_height.shape, dtype=int)
+
+    if out_std_height > in_std_height_max:
+        out_nb_classes = 2
+        
+        # 1 - Heights are binned once: k-means is run over the histogram, whatever the number of pixels
+        bin_centers, bin_counts, pix_bin = get_height_histogram(in_height)
+        
+        # 2 - Cluster height over 2 classes, starting from the mean height +/- height std
+        centers = split_class_center(np.array([np.mean(in_height)]), in_height, out_labels)
+        centers, bin_labels = compute_kmeans_1d_histogram(bin_centers, bin_counts, centers)
+        out_labels = bin_labels[pix_bin] + 1
+        
+        # 3 - Compute heigth std inside each class
+        std_by_class, _ = compute_std_by_label(in_height, out_labels, out_nb_classes)
+        out_std_height = np.max(std_by_class)
+
+    return out_labels, out_nb_classes, out_std_height
+
+
+def get_height_histogram(in_height, in_bin_size=HEIGHT_BIN_SIZE, in_nb_bins_max=HEIGHT_NB_BINS_MAX):
+    """
+    This function bins heights into a histogram, in order to run clustering over bins instead of pixels.
+
+    :param in_height: height of pixels
+    :type in_height: 1D vector of float
+    :param in_bin_size: width of bins (widened if the height range needs more than in_nb_bins_max bins)
+    :type in_bin_size: float
+    :param in_nb_bins_max: maximum number of bins
+    :type in_nb_bins_max: int
+
+    :return out_bin_centers: mean height of pixels in each non-empty bin
+    :type out_bin_centers: 1D vector of float
+    :return out_bin_counts: number of pixels in each non-empty bin
+    :type out_bin_counts: 1D vector of int
+    :return out_pix_bin: index of the non-empty bin of each pixel
+    :type out_pix_bin: 1D vector of int
+    """
+    # 1 - Compute bin of each pixel
+    height_min = np.min(in_height)
+    bin_size = max(in_bin_size, (np.max(in_height) - height_min) / in_nb_bins_max)
+    if bin_size > 0:
+        pix_bin = np.floor((in_height - height_min) / bin_size).astype(int)
+    else:
+        pix_bin = np.zeros(in_height.shape, dtype=int)
+
+    # 2 - Keep non-empty bins only
+    list_bins, out_pix_bin, out_bin_counts = np.unique(pix_bin, return_inverse=True, return_counts=True)
+    out_pix_bin = out_pix_bin.reshape(in_height.shape)
+    out_bin_centers = np.bincount(out_pix_bin, weights=in_height) / out_bin_counts
+
+    return out_bin_centers, out_bin_counts, out_pix_bin
+
+
+def compute_kmeans_1d_histogram(in_bin_centers, in_bin_counts, in_centers, in_nb_iter_max=100):
+    """
+    This function runs 1D k-means (Lloyd iterations) over a histogram of heights, each bin being weighted by its number of pixels.
+
+    :param in_bin_centers: mean height of each bin
+    :type in_bin_centers: 1D vector of float
+    :param in_bin_counts: number of pixels in each bin
+    :type in_bin_counts: 1D vector of int
+    :param in_centers: initial centers of classes
+    :type in_centers: 1D vector of float
+    :param in_nb_iter_max: maximum number of iterations
+    :type in_nb_iter_max: int
+
+    :return out_centers: centers of classes, in increasing order
+    :type out_centers: 1D vector of float
+    :return out_bin_labels: class of each bin (from 0 to number of classes - 1)
+    :type out_bin_labels: 1D vector of int
+    """
+    out_centers = np.sort(np.asarray(in_centers, dtype=float))
+    nb_classes = out_centers.size
+    out_bin_labels = np.zeros(in_bin_centers.shape, dtype=int)
+
+    for _ in range(in_nb_iter_max):
+        # 1 - Assign each bin to the closest center; as centers are sorted, bounds are the middles between consecutive centers
+        bin_labels = np.searchsorted((out_centers[1:] + out_centers[:-1]) / 2., in_bin_centers)
+        
+        # 2 - Update centers (empty classes keep their center)
+        weights = np.bincount(bin_labels, weights=in_bin_counts, minlength=nb_classes)
+        sums = np.bincount(bin_labels, weights=in_bin_counts * in_bin_centers, minlength=nb_classes)
+        new_centers = np.where(weights > 0, sums / np.maximum(weights, 1), out_centers)
+        
+        # 3 - Stop when assignment is stable
+        flag_stable = np.array_equal(bin_labels, out_bin_labels)
+        out_bin_labels = bin_labels
+        out_centers = np.sort(new_centers)
+        if flag_stable:
+            break
+
+    return out_centers, out_bin_labels
+
+
+def split_class_center(in_centers, in_height, in_labels):
+    """
+    This function computes initial centers of classes for k-means with one more class:
+    the class with the highest height std is replaced by 2 classes centered at its mean +/- its std.
+
+    :param in_centers: centers of current classes
+    :type in_centers: 1D vector of float
+    :param in_height: height of pixels
+    :type in_height: 1D vector of float
+    :param in_labels: current class of pixels (from 1 to number of classes)
+    :type in_labels: 1D vector of int
+
+    :return out_centers: initial centers of classes
+    :type out_centers: 1D vector of float
+    """
+    std_by_class, _ = compute_std_by_label(in_height, in_labels, in_centers.size)
+    ind_max = int(np.argmax(std_by_class))
+    std_max = max(std_by_class[ind_max], np.finfo(float).eps)
+    out_centers = np.concatenate((np.delete(in_centers, ind_max), 
+                                  [in_centers[ind_max] - std_max, in_centers[ind_max] + std_max]))
+    return np.sort(out_centers)
+
+
+def compute_std_by_label(in_height, in_labels, in_nb_labels=None):
+    """
+    This function computes the height std and the number of pixels of each label, in one pass.
+
+    :param in_height: height of pixels
+    :type in_height: 1D vector of float
+    :param in_labels: label of pixels (from 1 to number of labels)
+    :type in_labels: 1D vector of int
+    :param in_nb_labels: number of labels (=None to use the maximum label)
+    :type in_nb_labels: int
+
+    :return out_std: height std of each label (0 for empty labels)
+    :type out_std: 1D vector of float
+    :return out_counts: number of pixels of each label
+    :type out_counts: 1D vector of int
+    """
+    labels = np.asarray(in_labels, dtype=int) - 1
+    if in_nb_labels is None:
+        in_nb_labels = int(np.max(labels)) + 1
+    out_counts = np.bincount(labels, minlength=in_nb_labels)
+    nb_pix = np.maximum(out_counts, 1)
+    mean = np.bincount(labels, weights=in_height, minlength=in_nb_labels) / nb_pix
+    mean_sq = np.bincount(labels, weights=(in_height - mean[labels])**2, minlength=in_nb_labels) / nb_pix
+    out_std = np.sqrt(mean_sq)
+    return out_std, out_counts
+
+
 def sliding_window(arr, window_size):
     """
     Construct a sliding window view of the array
@@ -205,20 +205,12 @@ def merge_2_layers(in_layer1, in_layer2, in_continent_id=None, flag_add_nogeom_f
         raise service_error.ProcessingError(message, logger)
 
     # 3 - Retrieve only features corresponding to the specified continent code
-    if in_continent_id:
+    cond = get_continent_filter(fields_name_1, in_continent_id)
+    if cond is not None:
         logger.debug("Filter layer by continent %s " % str(in_continent_id))
-        # Find attribute filter depending on the list of fields
-        continent_pfaf_id = lake_db.compute_continent_code(in_continent_id)
-        if "lake_id" in fields_name_1:
-            cond = "lake_id like '" + continent_pfaf_id + "%' or obs_id like '" + continent_pfaf_id + "%'"  # Case of _Obs and _Prior layers
-            # Run filter
-            in_layer1.SetAttributeFilter(cond)
-            in_layer2.SetAttributeFilter(cond)
-        elif "obs_id" in fields_name_1:
-            cond = "obs_id like '" + continent_pfaf_id + "%'"  # Case of _Unassigned layer
-            # Run filter
-            in_layer1.SetAttributeFilter(cond)
-            in_layer2.SetAttributeFilter(cond)
+        # Run filter
+        in_layer1.SetAttributeFilter(cond)
+        in_layer2.SetAttributeFilter(cond)
 
     nb_feature1 = in_layer1.GetFeatureCount()
     nb_feature2 = in_layer2.GetFeatureCount()
@@ -249,10 +241,9 @@ def merge_2_layers(in_layer1, in_layer2, in_continent_id=None, flag_add_nogeom_f
     if flag_add_nogeom_feat:
         for cur_layer in [in_layer1, in_layer2]:
             # 9.1 - Retrieve features without a geometry
-            if "obs_id" in fields_name_1:
-                cur_layer.SetAttributeFilter("obs_id = 'no_data'")
-            elif "pass_kept" in fields_name_1:
-                cur_layer.SetAttributeFilter("pass_kept = 'no_data'")
+            cond_nogeom = get_nogeom_filter(fields_name_1)
+            if cond_nogeom is not None:
+                cur_layer.SetAttributeFilter(cond_nogeom)
             # 9.2 - Add them to output layer
             for cur_feature in cur_layer:
                 out_layer.CreateFeature(cur_feature)
@@ -261,3 +252,168 @@ def merge_2_layers(in_layer1, in_layer2, in_continent_id=None, flag_add_nogeom_f
     in_layer2.SetAttributeFilter(None)
 
     return out_data_source, out_layer
+
+
+def stream_layers_to_shp(in_list_layers, in_list_shp, in_layer_defn, in_shp_filename, in_continent_id=None,
+                         in_layers_filter=None, flag_add_nogeom_feat=False):
+    """
+    Write the features of the layers in_list_layers, then of the shapefiles listed in in_list_shp, directly into the shapefile
+    in_shp_filename, in a single pass and without intermediate memory layer
+    (same result as merge_2_layers + merge_mem_layer_with_shp + write_mem_layer_as_shp, for features which don't overlap).
+    Fields are copied by name; fields not in in_layer_defn are ignored.
+    The min and max values of the "time" field, if it exists, are computed during the same pass.
+    Features without geometry (i.e. not observed), added if flag_add_nogeom_feat=True, are not filtered by continent 
+    (as in merge_2_layers).
+    
+    :param in_list_layers: layers to write first (typically LakeSP memory layers of each swath)
+    :type in_list_layers: list of OGRlayer
+    :param in_list_shp: list of shapefiles full path to write after (typically LakeTile shapefiles)
+    :type in_list_shp: list of string
+    :param in_layer_defn: definition of the fields of the output layer
+    :type in_layer_defn: OGRFeatureDefn
+    :param in_shp_filename: output shapefile full path
+    :type in_shp_filename: string
+    :param in_continent_id: 2-letter identifier of the processed continent
+    :type in_continent_id: string
+    :param in_layers_filter: attribute filter to select the features of in_list_layers (=None to select all)
+    :type in_layers_filter: string
+    :param flag_add_nogeom_feat: =True to add features with no geometry in the output layer, =False otherwise (default)
+    :type flag_add_nogeom_feat: boolean
+    
+    :return: out_time_min = min value > 0 of the time field (None if no value)
+    :rtype: out_time_min = float
+    :return: out_time_max = max value > 0 of the time field (None if no value)
+    :rtype: out_time_max = float
+    """
+    logger = logging.getLogger("my_shp_file")
+    logger.debug("== stream_layers_to_shp ==")
+    
+    shp_driver = ogr.GetDriverByName(str('ESRI Shapefile'))  # Driver for shapefiles
+    
+    # 1 - Delete output file if already exists
+    if os.path.exists(in_shp_filename):
+        logger.warning("Output shapefile %s already exists => delete file" % in_shp_filename)
+        shp_driver.DeleteDataSource(in_shp_filename)
+        
+    # 2 - Create output file and layer
+    data_source = shp_driver.CreateDataSource(in_shp_filename)
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(4326)  # WGS84
+    layer_name = os.path.basename(in_shp_filename).split(".")[0]
+    out_layer = data_source.CreateLayer(str(layer_name), srs, geom_type=ogr.wkbMultiPolygon)
+    fields_name = []
+    for ind in range(in_layer_defn.GetFieldCount()):
+        out_layer.CreateField(in_layer_defn.GetFieldDefn(ind))
+        fields_name.append(in_layer_defn.GetFieldDefn(ind).GetName())
+    out_layer_defn = out_layer.GetLayerDefn()
+    # Index of each output field, from its full name or its name as written in the shapefile (possibly truncated)
+    dict_fields_ind = {cur_name: ind for (ind, cur_name) in enumerate(fields_name)}
+    for ind in range(out_layer_defn.GetFieldCount()):
+        dict_fields_ind.setdefault(out_layer_defn.GetFieldDefn(ind).GetName(), ind)
+    ind_time = fields_name.index("time") if "time" in fields_name else None
+    
+    # 3 - Attribute filters
+    cond_continent = get_continent_filter(fields_name, in_continent_id)
+    cond_nogeom = get_nogeom_filter(fields_name) if flag_add_nogeom_feat else None
+    
+    # 4 - Write features of each input layer
+    out_time_min = None
+    out_time_max = None
+    nb_feat = 0
+    list_sources = [(cur_layer, [cond_continent, in_layers_filter]) for cur_layer in in_list_layers] + \
+                   [(cur_shp, [cond_continent]) for cur_shp in in_list_shp]
+    for (cur_source, cur_list_filter) in list_sources:
+        
+        # 4.1 - Get current layer
+        if isinstance(cur_source, str):
+            logger.debug("> Adding %s" % os.path.basename(cur_source))
+            cur_data_source = shp_driver.Open(cur_source, 0)  # Open in reading mode
+            cur_layer = cur_data_source.GetLayer()  # Get the layer
+        else:
+            cur_data_source = None
+            cur_layer = cur_source
+            
+        # 4.2 - Map fields of current layer to output fields, by name
+        cur_layer_defn = cur_layer.GetLayerDefn()
+        field_map = []
+        for ind in range(cur_layer_defn.GetFieldCount()):
+            cur_name = cur_layer_defn.GetFieldDefn(ind).GetName()
+            field_map.append(dict_fields_ind.get(cur_name, -1))
+            
+        # 4.3 - Copy features with a geometry, then features without geometry if asked
+        list_cond = [cur_list_filter]
+        if cond_nogeom is not None:
+            list_cond.append([cond_nogeom])
+        for (ind_pass, cur_list_cond) in enumerate(list_cond):
+            cur_list_cond = [cond for cond in cur_list_cond if cond is not None]
+            if cur_list_cond:
+                cur_layer.SetAttributeFilter(" and ".join(["(%s)" % cond for cond in cur_list_cond]))
+            else:
+                cur_layer.SetAttributeFilter(None)
+            cur_layer.ResetReading()
+            for cur_feature in cur_layer:
+                has_geom = cur_feature.GetGeometryRef() is not None
+                if (ind_pass == 0) != has_geom:
+                    continue
+                out_feature = ogr.Feature(out_layer_defn)
+                out_feature.SetFromWithMap(cur_feature, 1, field_map)
+                out_layer.CreateFeature(out_feature)
+                nb_feat += 1
+                # Update time coverage
+                if ind_time is not None and out_feature.IsFieldSet(ind_time):
+                    cur_time = out_feature.GetFieldAsDouble(ind_time)
+                    if cur_time > 0:
+                        out_time_min = cur_time if out_time_min is None else min(out_time_min, cur_time)
+                        out_time_max = cur_time if out_time_max is None else max(out_time_max, cur_time)
+                out_feature.Destroy()
+            
+        # 4.4 - Reset filter or close current file
+        cur_layer.SetAttributeFilter(None)
+        if cur_data_source is not None:
+            cur_data_source.Destroy()
+            
+    # 5 - Close output file
+    data_source.Destroy()
+    logger.debug("%d features written in %s" % (nb_feat, os.path.basename(in_shp_filename)))
+    
+    return out_time_min, out_time_max
+
+
+def get_continent_filter(in_fields_name, in_continent_id):
+    """
+    Compute the attribute filter selecting the features of the specified continent, depending on the fields of the layer
+    
+    :param in_fields_name: names of the fields of the layer
+    :type in_fields_name: list of string
+    :param in_continent_id: 2-letter identifier of the processed continent
+    :type in_continent_id: string
+    
+    :return: attribute filter (None if no filter)
+    :rtype: string
+    """
+    retour = None
+    if in_continent_id:
+        continent_pfaf_id = lake_db.compute_continent_code(in_continent_id)
+        if "lake_id" in in_fields_name:
+            retour = "lake_id like '" + continent_pfaf_id + "%' or obs_id like '" + continent_pfaf_id + "%'"  # Case of _Obs and _Prior layers
+        elif "obs_id" in in_fields_name:
+            retour = "obs_id like '" + continent_pfaf_id + "%'"  # Case of _Unassigned layer
+    return retour
+
+
+def get_nogeom_filter(in_fields_name):
+    """
+    Compute the attribute filter selecting the features without geometry (ie not observed), depending on the fields of the layer
+    
+    :param in_fields_name: names of the fields of the layer
+    :type in_fields_name: list of string
+    
+    :return: attribute filter (None if no filter)
+    :rtype: string
+    """
+    retour = None
+    if "obs_id" in in_fields_name:
+        retour = "obs_id = 'no_data'"
+    elif "pass_kept" in in_fields_name:
+        retour = "pass_kept = 'no_data'"
+    return retour
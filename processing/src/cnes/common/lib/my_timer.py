@@ -27,8 +27,22 @@
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-import time
+from contextlib import contextmanager
+import json
 import math
+import os
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+# Functions called at the end of each named stage, as hook(in_name, in_wall_time, in_peak_memory_rise)
+STAGE_HOOKS = []
+# If this environment variable is set, stage measurements are appended to the file it designates (1 JSON record per line)
+BENCHMARK_ENV_VAR = "SHT_BENCHMARK_FILE"
 
 
 class Timer(object):
@@ -131,6 +145,95 @@ class Timer(object):
 #######################################
 
 
+def get_peak_memory():
+    """
+    Get the peak resident memory of the current process since its start
+
+    :return: peak resident memory in MB (None if not available)
+    :rtype: float
+    """
+    retour = None
+    if resource is not None:
+        # ru_maxrss is given in kB on Linux
+        retour = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    return retour
+
+
+def add_stage_hook(in_hook):
+    """
+    Register a function to call at the end of each stage
+
+    :param in_hook: function with signature hook(in_name, in_wall_time, in_peak_memory_rise)
+    :type in_hook: function
+    """
+    if in_hook not in STAGE_HOOKS:
+        STAGE_HOOKS.append(in_hook)
+
+
+def remove_stage_hook(in_hook):
+    """
+    Unregister a function previously registered with add_stage_hook
+
+    :param in_hook: function to unregister
+    :type in_hook: function
+    """
+    if in_hook in STAGE_HOOKS:
+        STAGE_HOOKS.remove(in_hook)
+
+
+def write_stage_to_file(in_name, in_wall_time, in_peak_memory_rise):
+    """
+    Stage hook appending the measurement to the file given by BENCHMARK_ENV_VAR
+
+    :param in_name: name of the stage
+    :type in_name: str
+    :param in_wall_time: wall time of the stage in seconds
+    :type in_wall_time: float
+    :param in_peak_memory_rise: rise of the peak resident memory of the process during the stage, in MB
+    :type in_peak_memory_rise: float
+    """
+    out_file = os.environ.get(BENCHMARK_ENV_VAR)
+    if out_file:
+        with open(out_file, "a") as fp:
+            fp.write(json.dumps({"stage": in_name,
+                                 "wall_time": in_wall_time,
+                                 "peak_memory_rise": in_peak_memory_rise,
+                                 "pid": os.getpid()}) + "\n")
+
+
+@contextmanager
+def stage(in_name):
+    """
+    Measure the wall time of the enclosed block and the rise of the peak resident memory of the process
+    during it, and give them to the registered stage hooks
+    Nothing is measured if no hook is registered
+
+    :param in_name: name of the stage (ex: "LakeTile.processing")
+    :type in_name: str
+    """
+    if not STAGE_HOOKS:
+        yield
+    else:
+        start_time = time.time()
+        start_peak_memory = get_peak_memory()
+        yield
+        wall_time = time.time() - start_time
+        # ru_maxrss only increases: its rise is the memory the stage needed above the former peak of the process
+        # (0 if the stage stayed below it)
+        peak_memory_rise = None
+        if start_peak_memory is not None:
+            peak_memory_rise = get_peak_memory() - start_peak_memory
+        for hook in STAGE_HOOKS:
+            hook(in_name, wall_time, peak_memory_rise)
+
+
+if os.environ.get(BENCHMARK_ENV_VAR):
+    add_stage_hook(write_stage_to_file)
+
+
+#######################################
+
+
 if __name__ == '__main__':
 
     my_time = Timer()
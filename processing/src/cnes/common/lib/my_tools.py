@@ -36,6 +36,10 @@ import os
 from osgeo import osr, ogr
 import pyproj
 from shapely.ops import transform
+try:
+    from shapely import contains_xy  # shapely >= 2.0
+except ImportError:
+    from shapely.vectorized import contains as contains_xy
 
 from scipy.spatial import distance
 from scipy.ndimage.measurements import label
@@ -43,6 +47,13 @@ from scipy.ndimage.measurements import label
 import cnes.common.service_error as service_error
 import cnes.common.lib.my_variables as my_var
 
+# pyproj >= 2 provides Transformer, older versions only provide Proj + transform
+PYPROJ_HAS_TRANSFORMER = hasattr(pyproj, "Transformer")
+# Cache of coordinate transformations, shared by all calls within the process
+# key = (source, target) ; value = transformation function or (spatial references, osr transformation)
+PYPROJ_TRANSFORM_CACHE = {}
+OSR_TRANSFORM_CACHE = {}
+
 
 def test_file(in_file, in_extent=None):
     """
@@ -411,8 +422,7 @@ def compute_bin_mat(in_size_x, in_size_y, in_x, in_y, verbose=True):
         logger.debug("> Binary matrix size = (X=%d , Y=%d)" % (in_size_x, in_size_y))
 
     # 2 - Put 1 for every pixels defined by the input vectors
-    for ind in range(nb_pts):
-        out_bin_im[in_y[ind], in_x[ind]] = 1
+    out_bin_im[in_y, in_x] = 1
 
     return out_bin_im
 
@@ -457,10 +467,7 @@ def get_1d_from_2d(img, in_x, in_y):
     """
 
     vect = np.zeros(in_x.shape)
-    nb_pts = in_x.size
-
-    for ind in range(nb_pts):
-        vect[ind] = img[in_y[ind], in_x[ind]]
+    vect[:] = img[in_y, in_x]
     return vect
 
 def get_2d_from_1d(vect, in_x, in_y):
@@ -478,9 +485,8 @@ def get_2d_from_1d(vect, in_x, in_y):
     :rtype: 2D matrix of values (int, float, ...)
     """
     img = np.zeros((np.max(in_y) + 1, np.max(in_x) + 1))
-    nb_pts = in_x.size
-    for ind in range(nb_pts):
-        img[in_y[ind], in_x[ind]] = vect[ind]
+    # NB: if a pixel is given several times, the last value is kept
+    img[in_y, in_x] = vect[:in_x.size]
 
     return img
 
@@ -510,8 +516,7 @@ def convert_2d_mat_in_1d_vec(in_x, in_y, in_mat):
     # Init output vector (same size of input in_x and in_y)
     out_vector = np.zeros(nb_pix)
     # Fill the output vector
-    for indp in range(nb_pix):
-        out_vector[indp] = in_mat[in_y[indp], in_x[indp]]
+    out_vector[:] = in_mat[in_y, in_x]
 
     return out_vector
 
@@ -519,6 +524,200 @@ def convert_2d_mat_in_1d_vec(in_x, in_y, in_mat):
 #######################################
 
 
+class LabelIndex(object):
+    """
+    Index of the positions of each value in a 1D-array of labels, computed in one pass (stable sort);
+    the indices related to a label are then retrieved without rescanning the whole array,
+    i.e. LabelIndex(labels).get_index(label) is equivalent to np.where(labels == label)[0]
+    """
+
+    def __init__(self, in_labels):
+        """
+        Constructor
+
+        :param in_labels: label of each element
+        :type in_labels: 1D-array of int, float or bytes
+
+        Variables of the object:
+        - labels / 1D-array: sorted unique values of in_labels
+        - counts / 1D-array of int: number of elements for each value of labels
+        - sorted_index / 1D-array of int: indices of elements grouped by label, in increasing order within each group
+        - bounds / 1D-array of int: position in sorted_index of the first index of each label, followed by the number of elements
+        - dict_pos / dict: position of each label in labels
+        """
+        in_labels = np.asarray(in_labels)
+        nb_elem = in_labels.size
+
+        # 1 - Group indices by label; stable sort keeps increasing indices within each group
+        self.sorted_index = np.argsort(in_labels, kind="mergesort")
+        sorted_labels = in_labels[self.sorted_index]
+
+        # 2 - Compute bounds of each group
+        flag_first = np.ones(nb_elem, dtype=bool)
+        flag_first[1:] = sorted_labels[1:] != sorted_labels[:-1]
+        first_pos = np.where(flag_first)[0]
+        self.labels = sorted_labels[first_pos]
+        self.bounds = np.append(first_pos, nb_elem)
+        self.counts = np.diff(self.bounds)
+
+        # 3 - Position of each label
+        self.dict_pos = {}
+        for pos, cur_label in enumerate(self.labels.tolist()):
+            self.dict_pos[cur_label] = pos
+
+    def get_index(self, in_label):
+        """
+        Get indices of elements having the label in_label
+
+        :param in_label: label value
+        :type in_label: int, float or bytes
+
+        :return: indices of elements with label in_label, in increasing order (empty if label doesn't exist)
+        :rtype: 1D-array of int
+        """
+        pos = self.dict_pos.get(in_label)
+        if pos is None:
+            retour = np.zeros(0, dtype=self.sorted_index.dtype)
+        else:
+            retour = self.sorted_index[self.bounds[pos]:self.bounds[pos+1]]
+        return retour
+
+    def get_count(self, in_label):
+        """
+        Get number of elements having the label in_label
+
+        :param in_label: label value
+        :type in_label: int, float or bytes
+
+        :return: number of elements with label in_label
+        :rtype: int
+        """
+        pos = self.dict_pos.get(in_label)
+        if pos is None:
+            retour = 0
+        else:
+            retour = int(self.counts[pos])
+        return retour
+
+    def get_mode(self, in_values):
+        """
+        Get the most frequent value of in_values among the elements of each label, for all labels at once
+        In case of tie, the smallest value is kept, as np.unique(in_values[get_index(label)]) would do
+
+        :param in_values: value of each element (same size as the array of labels)
+        :type in_values: 1D-array
+
+        :return: most frequent value for each label
+        :rtype: dict
+        """
+        # 1 - Sort values within each group of elements
+        group = np.repeat(np.arange(self.labels.size), self.counts)
+        values = np.asarray(in_values)[self.sorted_index]
+        values = values[np.lexsort((values, group))]
+
+        # 2 - Count runs of identical values within each group
+        flag_first = np.ones(values.size, dtype=bool)
+        flag_first[1:] = (group[1:] != group[:-1]) | (values[1:] != values[:-1])
+        first_pos = np.where(flag_first)[0]
+        run_group = group[first_pos]
+        run_values = values[first_pos]
+        run_counts = np.diff(np.append(first_pos, values.size))
+
+        # 3 - Keep the largest run of each group (smallest value in case of tie)
+        order = np.lexsort((run_values, -run_counts, run_group))
+        flag_group = np.ones(order.size, dtype=bool)
+        flag_group[1:] = run_group[order][1:] != run_group[order][:-1]
+
+        return dict(zip(self.labels.tolist(), run_values[order][flag_group].tolist()))
+
+
+class DisjointSet(object):
+    """
+    Disjoint-set (union-find) structure, with path compression and union by size,
+    used to gather elements linked two by two into groups in quasi-linear time
+    """
+
+    def __init__(self):
+        """
+        Constructor
+
+        Variables of the object:
+        - dict_parent / dict: parent of each element (the element itself for the root of a group)
+        - dict_size / dict: number of elements in the group of each root element
+        - list_elem / list: elements in order of first addition
+        """
+        self.dict_parent = {}
+        self.dict_size = {}
+        self.list_elem = []
+
+    def add(self, in_elem):
+        """
+        Add an element as a new single group, if not already added
+
+        :param in_elem: element to add
+        :type in_elem: any hashable
+        """
+        if in_elem not in self.dict_parent:
+            self.dict_parent[in_elem] = in_elem
+            self.dict_size[in_elem] = 1
+            self.list_elem.append(in_elem)
+
+    def find(self, in_elem):
+        """
+        Get the root element of the group of in_elem
+
+        :param in_elem: element already added
+        :type in_elem: any hashable
+
+        :return: root element of the group
+        :rtype: any hashable
+        """
+        # 1 - Go up to the root
+        root = in_elem
+        while self.dict_parent[root] != root:
+            root = self.dict_parent[root]
+        # 2 - Path compression
+        while self.dict_parent[in_elem] != root:
+            self.dict_parent[in_elem], in_elem = root, self.dict_parent[in_elem]
+        return root
+
+    def union(self, in_elem1, in_elem2):
+        """
+        Gather the groups of in_elem1 and in_elem2 (elements are added if needed)
+
+        :param in_elem1: first element
+        :type in_elem1: any hashable
+        :param in_elem2: second element
+        :type in_elem2: any hashable
+        """
+        self.add(in_elem1)
+        self.add(in_elem2)
+        root1 = self.find(in_elem1)
+        root2 = self.find(in_elem2)
+        if root1 != root2:
+            if self.dict_size[root1] < self.dict_size[root2]:
+                root1, root2 = root2, root1
+            self.dict_parent[root2] = root1
+            self.dict_size[root1] += self.dict_size.pop(root2)
+
+    def get_groups(self):
+        """
+        Get elements gathered by group; groups are ordered by their first added element,
+        elements are in order of addition within each group
+
+        :return: list of groups
+        :rtype: list of list
+        """
+        dict_groups = {}
+        for cur_elem in self.list_elem:
+            dict_groups.setdefault(self.find(cur_elem), []).append(cur_elem)
+        # NB: dict keeps insertion order, i.e. order of the first element of each group
+        return list(dict_groups.values())
+
+
+#######################################
+
+
 def compute_mean_2sigma(in_v_val, name=None):
     """
     Compute the mean of the input values, after remove of non-sense values, i.e. below or above the median +/- 2*standard deviation
@@ -664,6 +863,81 @@ def get_utm_epsg_code(lon, lat):
     return epsg
 
 
+def get_proj_definition(in_crs):
+    """
+    Build the pyproj definition of a coordinate reference system
+
+    :param in_crs: EPSG code (ex: 4326 or "32631") or PROJ string (ex: "+proj=geocent +datum=WGS84")
+    :type in_crs: int or string
+
+    :return: definition understood by the installed pyproj version
+    :rtype: string
+    """
+    retour = str(in_crs)
+    if not retour.startswith("+"):
+        if PYPROJ_HAS_TRANSFORMER:
+            retour = "epsg:%s" % retour
+        else:
+            # pyproj < 2 only knows EPSG codes through the init file
+            retour = "+init=epsg:%s" % retour
+    return retour
+
+
+def get_pyproj_transform(in_crs_source, in_crs_target):
+    """
+    Get the function transforming coordinates from in_crs_source to in_crs_target.
+    Transformations are built once per (source, target) pair and cached for the whole process.
+    Coordinates are always given and returned in (x, y) = (lon, lat) order.
+
+    :param in_crs_source: source EPSG code or PROJ string
+    :type in_crs_source: int or string
+    :param in_crs_target: target EPSG code or PROJ string
+    :type in_crs_target: int or string
+
+    :return: transformation function, with signature func(x, y, z=None)
+    :rtype: function
+    """
+    key = (str(in_crs_source), str(in_crs_target))
+    if key not in PYPROJ_TRANSFORM_CACHE:
+        source = get_proj_definition(in_crs_source)
+        target = get_proj_definition(in_crs_target)
+        if PYPROJ_HAS_TRANSFORMER:
+            transformer = pyproj.Transformer.from_crs(source, target, always_xy=True)
+            PYPROJ_TRANSFORM_CACHE[key] = transformer.transform
+        else:
+            PYPROJ_TRANSFORM_CACHE[key] = partial(pyproj.transform, pyproj.Proj(source), pyproj.Proj(target))
+    return PYPROJ_TRANSFORM_CACHE[key]
+
+
+def get_osr_transformation(in_epsg_source, in_epsg_target):
+    """
+    Get the OSR transformation from in_epsg_source to in_epsg_target.
+    Transformations are built once per EPSG pair and cached for the whole process.
+    Coordinates are kept in the traditional GIS (lon, lat) order.
+
+    :param in_epsg_source: source EPSG code
+    :type in_epsg_source: int or string
+    :param in_epsg_target: target EPSG code
+    :type in_epsg_target: int or string
+
+    :return: coordinate transformation
+    :rtype: osr.CoordinateTransformation
+    """
+    key = (int(in_epsg_source), int(in_epsg_target))
+    if key not in OSR_TRANSFORM_CACHE:
+        list_srs = []
+        for epsg in key:
+            srs = osr.SpatialReference()
+            srs.ImportFromEPSG(epsg)
+            if hasattr(osr, "OAMS_TRADITIONAL_GIS_ORDER"):
+                # GDAL >= 3 follows the authority axis order (lat, lon) by default
+                srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+            list_srs.append(srs)
+        # Spatial references are kept with the transformation to stay alive as long as it
+        OSR_TRANSFORM_CACHE[key] = (list_srs, osr.CoordinateTransformation(list_srs[0], list_srs[1]))
+    return OSR_TRANSFORM_CACHE[key][1]
+
+
 def get_utm_coords(in_lon, in_lat):
     """
     get UTM coordinates
@@ -678,11 +952,8 @@ def get_utm_coords(in_lon, in_lat):
     lat_mean = np.mean(in_lat)
     lon_mean = np.mean(in_lon)
 
-    # code commenté x_c, y_c, zone_number, zone_lettre = utm.from_latlon(lat_mean, lon_mean)
-    latlon = pyproj.Proj(init="epsg:4326")
-    epsg=get_utm_epsg_code(lon_mean, lat_mean)
-    utm_proj = pyproj.Proj(init='epsg:' + epsg)
-    X, Y = pyproj.transform(latlon, utm_proj, in_lon, in_lat)
+    epsg = get_utm_epsg_code(lon_mean, lat_mean)
+    X, Y = get_pyproj_transform(4326, epsg)(in_lon, in_lat)
     return (X,Y, )
 
 
@@ -704,7 +975,6 @@ def get_area(in_polygon, centroid=None):
     tmp_poly = in_polygon.Clone()
 
     # 1 - Computation of EPSG code corresponding UTM zone
-    epsg_code = "32"  # Initialization
     # Retrieve centroid coordinates
     if centroid is None:
         poly_centroid = tmp_poly.Centroid().GetPoint(0)
@@ -716,18 +986,10 @@ def get_area(in_polygon, centroid=None):
 
     epsg_code = get_utm_epsg_code(centroid_lon, centroid_lat)
 
-    # 1 - Projection of tmp_poly into UTM
-    src_source = osr.SpatialReference()
-    src_source.ImportFromEPSG(4326)
-
-    src_target = osr.SpatialReference()
-    src_target.ImportFromEPSG(int(epsg_code))
-
-    transform = osr.CoordinateTransformation(src_source, src_target)
+    # 2 - Projection of tmp_poly into UTM
+    tmp_poly.Transform(get_osr_transformation(4326, epsg_code))
 
-    tmp_poly.Transform(transform)
-
-    # 2 - Compute and return area
+    # 3 - Compute and return area
     return tmp_poly.GetArea()
 
 
@@ -752,10 +1014,7 @@ def get_utm_coords_from_lonlat(in_long, in_lat, utm_epsg_code=None):
         lon_mean = np.mean(in_long)
         utm_epsg_code = get_utm_epsg_code(lon_mean, lat_mean)
 
-    latlon_proj = pyproj.Proj(init="epsg:4326")
-    utm_proj = pyproj.Proj(init='epsg:' + utm_epsg_code)
-
-    X, Y = pyproj.transform(latlon_proj, utm_proj, in_long, in_lat)
+    X, Y = get_pyproj_transform(4326, utm_epsg_code)(in_long, in_lat)
 
     return X, Y, utm_epsg_code
 
@@ -772,11 +1031,7 @@ def get_lon_lat_polygon_from_utm(in_utm_poly, in_utm_epsg_code):
     :return: polygon in geographical lon lat coordinates
     :rtype: shapely Polygon or Multipolygon geometry
     """
-    utm_proj = pyproj.Proj(init='epsg:' + in_utm_epsg_code)
-    latlon_proj_wrap = pyproj.Proj(init="epsg:4326")
-    projection_wm_func = partial(pyproj.transform, utm_proj, latlon_proj_wrap)
-
-    lonlat_poly = transform(projection_wm_func, in_utm_poly)
+    lonlat_poly = transform(get_pyproj_transform(in_utm_epsg_code, 4326), in_utm_poly)
 
     return lonlat_poly
 
@@ -827,6 +1082,37 @@ def load_pixels_to_mem_layer(in_lon, in_lat):
     return out_layer, out_data_source
 
 
+def get_points_in_polygon(in_poly, in_lon, in_lat):
+    """
+    Test, in a vectorised way, which pixels given their longitude and latitude coordinates are located inside a polygon
+    
+    :param in_poly: polygon
+    :type in_poly: shapely Polygon or Multipolygon geometry
+    :param in_lon: longitudes of pixels
+    :type in_lon: 1D-array of float
+    :param in_lat: latitudes of pixels
+    :type in_lat: 1D-array of float
+    
+    :return: out_flag_inside = True for pixels located inside in_poly, False otherwise
+    :rtype: 1D-array of bool
+    """
+    
+    # 0 - Init output variable
+    out_flag_inside = np.zeros(in_lon.shape, dtype=bool)
+    
+    # 1 - Select pixels inside the bounding box of the polygon
+    lon_min, lat_min, lon_max, lat_max = in_poly.bounds
+    idx_bbox = np.where((in_lon >= lon_min) & (in_lon <= lon_max) & (in_lat >= lat_min) & (in_lat <= lat_max))[0]
+    
+    # 2 - Point-in-polygon test over selected pixels
+    if idx_bbox.size > 0:
+        out_flag_inside[idx_bbox] = contains_xy(in_poly, 
+                                                np.asarray(in_lon[idx_bbox], dtype=np.float64), 
+                                                np.asarray(in_lat[idx_bbox], dtype=np.float64))
+    
+    return out_flag_inside
+
+
 def get_layer_fields_name_and_type(in_layer):
     """
     Return name and type of each field of a layer
@@ -26,13 +26,18 @@
 
 """
 
-import json
 import logging
 import numpy as np
 from osgeo import ogr
 from scipy.spatial import KDTree
 import sqlite3
 import os
+import sys
+import shapely
+import shapely.wkb
+from shapely.ops import transform
+from shapely.prepared import prep
+from shapely.strtree import STRtree
 
 import cnes.common.service_config_file as service_config_file
 
@@ -67,12 +72,18 @@ class LakeDb(object):
         - lake_layer / osgeo.ogr.Layer: layer of lake table in PLD
         - lake_ds / osgeo.ogr.DataSource: associated DataSource
         - list_lakeid / set: list of lake_id of the PLD lakes located over the retrieved subset of PLD
+        - dict_lakeid_fid / dict: FID in lake_layer of each PLD lake of the retrieved subset; key = lake_id as string
+        - lake_index / LayerSpatialIndex: spatial index over lake_layer (=None until first use)
         - influence_lake_flag / boolean: flag indicating if the influence lake geometries are used or not
         - influence_lake_layer / osgeo.ogr.Layer: layer of lake influence area table in PLD
         - influence_lake_ds / osgeo.ogr.DataSource: associated DataSource
+        - dict_influence_fid / dict: FID in influence_lake_layer of each influence area; key = lake_id as string
+                                    (=None until first use)
+        - influence_index / LayerSpatialIndex: spatial index over influence_lake_layer (=None until first use)
         - basin_flag / boolean: flag indicating if the basin geometries are used or not
         - basin_layer / osgeo.ogr.Layer: layer of basin table in PLD
         - basin_ds / osgeo.ogr.DataSource: associated DataSource
+        - basin_index / LayerSpatialIndex: spatial index over basin_layer (=None until first use)
         - az_0_geom / osgeo.ogr.Geometry: geometries of lakes located at the bottom of tile
         - az_max_geom / osgeo.ogr.Geometry: geometries of lakes located at the top of tile
         - az_0_and_max_geom / osgeo.ogr.Geometry: geometries of lakes located at the top and bottom of tile
@@ -107,16 +118,21 @@ class LakeDb(object):
         self.lake_layer = None
         self.lake_ds = None
         self.list_lakeid = set()
+        self.dict_lakeid_fid = {}
+        self.lake_index = None
 
         # Influence area table layer and DataSource
         self.influence_lake_flag = False  # Use of influence lake geometries (default = False)
         self.influence_lake_layer = None
         self.influence_lake_ds = None
+        self.dict_influence_fid = None
+        self.influence_index = None
 
         # Basin table layer and dataSource
         self.basin_flag = False  # Use of basin geometries (default = False)
         self.basin_layer = None
         self.basin_ds = None
+        self.basin_index = None
 
         # Geometries of lakes located at the top or bottom of tile
         self.az_0_geom = ogr.Geometry(ogr.wkbMultiPolygon)
@@ -197,11 +213,63 @@ class LakeDb(object):
     def set_list_lakeid(self):
         """
         Set the list of lake_id of the PLD lakes located over the retrieved subset of PLD
+        and index their feature in lake_layer by lake_id
         """
         self.lake_layer.ResetReading()
         for cur_lake in self.lake_layer:
-            self.list_lakeid.add(cur_lake.GetField(self.lakedb_id_name))
+            cur_lakeid = cur_lake.GetField(self.lakedb_id_name)
+            self.list_lakeid.add(cur_lakeid)
+            self.dict_lakeid_fid[str(cur_lakeid)] = cur_lake.GetFID()
         self.lake_layer.ResetReading()
+        
+    def get_lake_feature(self, in_lakeid):
+        """
+        Get the feature of a PLD lake of the retrieved subset, without scanning lake_layer
+        
+        :param in_lakeid: identifier of the PLD lake
+        :type in_lakeid: str
+        
+        :return: out_feature = PLD lake feature (=None if in_lakeid is not in the retrieved subset)
+        :rtype: out_feature = OGRFeature
+        """
+        out_feature = None
+        fid = self.dict_lakeid_fid.get(str(in_lakeid))
+        if fid is not None:
+            out_feature = self.lake_layer.GetFeature(fid)
+        return out_feature
+
+    def get_lake_index(self):
+        """
+        Get the spatial index over lake_layer; it is built at first use
+        
+        :return: spatial index over lake_layer
+        :rtype: LayerSpatialIndex
+        """
+        if self.lake_index is None:
+            self.lake_index = LayerSpatialIndex(self.lake_layer, self.lakedb_id_name)
+        return self.lake_index
+        
+    def get_basin_index(self):
+        """
+        Get the spatial index over basin_layer; it is built at first use
+        
+        :return: spatial index over basin_layer
+        :rtype: LayerSpatialIndex
+        """
+        if self.basin_index is None:
+            self.basin_index = LayerSpatialIndex(self.basin_layer, self.basindb_id_name)
+        return self.basin_index
+
+    def get_influence_index(self):
+        """
+        Get the spatial index over influence_lake_layer; it is built at first use
+        
+        :return: spatial index over influence_lake_layer
+        :rtype: LayerSpatialIndex
+        """
+        if self.influence_index is None:
+            self.influence_index = LayerSpatialIndex(self.influence_lake_layer, self.lakedb_id_name)
+        return self.influence_index
 
     # ----------------------------------------
 
@@ -254,9 +322,14 @@ class LakeDb(object):
         out_poly = None
         
         if self.influence_lake_layer is not None:
-            request = "%s = '%s'" %(self.lakedb_id_name, in_lakeid)
-            self.influence_lake_layer.SetAttributeFilter(request)
-            cur_feature = self.influence_lake_layer.GetNextFeature()
+            # Index influence areas by lake_id at first use
+            if self.dict_influence_fid is None:
+                self.dict_influence_fid = {}
+                self.influence_lake_layer.SetAttributeFilter(None)
+                for cur_feature in self.influence_lake_layer:
+                    self.dict_influence_fid[str(cur_feature.GetField(self.lakedb_id_name))] = cur_feature.GetFID()
+                self.influence_lake_layer.ResetReading()
+            cur_feature = self.influence_lake_layer.GetFeature(self.dict_influence_fid[str(in_lakeid)])
             out_poly = cur_feature.GetGeometryRef().Clone()
             
         return out_poly
@@ -307,40 +380,45 @@ class LakeDb(object):
 
         if self.lake_layer:  # Processing only if a PLD is used
             
-            # 1 - Spatial filter of the PLD over the area covered by the studied polygon
-            self.lake_layer.SetSpatialFilter(in_poly)
+            # 1 - Retrieve PLD lakes intersecting the studied polygon with the spatial index of the tile
+            lake_index = self.get_lake_index()
+            obs_geom = shapely.wkb.loads(bytes(in_poly.ExportToWkb()))
+            if not obs_geom.is_valid:
+                obs_geom = obs_geom.buffer(0)
+            list_idx = lake_index.query(obs_geom)
 
             # 2 - Processing according to the number of PLD lakes intersecting polygon
-            nb_lakes = self.lake_layer.GetFeatureCount()
+            nb_lakes = len(list_idx)
             logger.debug("Current observed lake matched with %d lakes from Prior Lake Database" % (nb_lakes))
+            
+            if nb_lakes > 0:
+                # Observed lake area, in the UTM zone of its centroid (as my_tools.get_area)
+                utm_epsg = get_utm_epsg_of_geom(obs_geom)
+                obs_geom_utm = lake_index.project(obs_geom, utm_epsg)
+                area_obs = obs_geom_utm.area
 
             if nb_lakes == 1:  # Easy match: polygon matches only one PLD lake
 
-                # 2.1 - Retrieve PLD lake info
-                cur_lake_bd = self.lake_layer.GetNextFeature()  # PLD lake feature
-                cur_id = str(cur_lake_bd.GetField(self.lakedb_id_name))  # PLD lake identifier
+                # 2.1 - Retrieve PLD lake identifier
+                cur_id = lake_index.list_id[list_idx[0]]  # PLD lake identifier
                 logger.debug("Associated PLD identifier = %s" % cur_id)
                 
                 if cur_id:  # Test but should not occur...
                     
-                    # 2.2 - Compute the geometry of the intersection between the observed lake and the PLD lake
-                    geom_inter = in_poly.Intersection(cur_lake_bd.GetGeometryRef())
-                    
-                    if geom_inter is not None:
-                        
-                        # 2.3 - Compute associated fraction of observed lake covered by PLD lake
-                        area_obs = my_tools.get_area(in_poly)
-                        area_inter = my_tools.get_area(geom_inter)
-                        frac_inter = round(area_inter/area_obs*100.)
+                    # 2.2 - Compute the area of the intersection between the observed lake and the PLD lake
+                    area_inter = obs_geom_utm.intersection(lake_index.get_geom_utm(list_idx[0], utm_epsg)).area
                         
-                        # 2.4 - Save info to output lists
-                        # only if overlap percentage is important enough
-                        if frac_inter > self.min_overlap:
-                            out_list_prior_id.append(cur_id)  # PLD identifier
-                            out_list_pld_overlap.append(str(frac_inter))  # Overlap
-                            out_pixcvec_lakeid[:] = cur_id  # Set lake_id attributes in PIXCVec product
-                        else:
-                            logger.debug("Overlap = {}% (<{}%) => PLD lake not linked with observed lake".format(frac_inter, self.min_overlap))
+                    # 2.3 - Compute associated fraction of observed lake covered by PLD lake
+                    frac_inter = round(area_inter/area_obs*100.)
+                    
+                    # 2.4 - Save info to output lists
+                    # only if overlap percentage is important enough
+                    if frac_inter > self.min_overlap:
+                        out_list_prior_id.append(cur_id)  # PLD identifier
+                        out_list_pld_overlap.append(str(frac_inter))  # Overlap
+                        out_pixcvec_lakeid[:] = cur_id  # Set lake_id attributes in PIXCVec product
+                    else:
+                        logger.debug("Overlap = {}% (<{}%) => PLD lake not linked with observed lake".format(frac_inter, self.min_overlap))
                     
                 else:
                     logger.error("Something wrong happened in PLD: no identifier for this PLD lake!", exc_info=True)
@@ -351,35 +429,28 @@ class LakeDb(object):
                 # Init variables
                 tmp_list_prior_id = []  # List of PLD identifiers
                 tmp_list_pld_overlap = []  # List of fractions of observed lake covered by PLD lakes
-                prior_geoms = []
 
-                for cur_lake_bd in self.lake_layer:
+                for cur_idx in list_idx:
                     
                     # 2.1 - Retrieve PLD lake identifier
-                    cur_id = str(cur_lake_bd.GetField(self.lakedb_id_name))
+                    cur_id = lake_index.list_id[cur_idx]
                     logger.debug("Associated PLD identifier = %s" % cur_id)
 
                     if cur_id:  # Test but should not occur...
                         
-                        # 2.2 - Compute the geometry of the intersection between the observed lake and the PLD lake
-                        cur_geom = cur_lake_bd.GetGeometryRef().Clone()  # PLD lake geometry
-                        geom_inter = in_poly.Intersection(cur_geom)
-                        
-                        if geom_inter is not None:
-                            
-                            # 2.3 - Compute associated fraction of observed lake covered by PLD lake
-                            area_obs = my_tools.get_area(in_poly)
-                            area_inter = my_tools.get_area(geom_inter)
-                            frac_inter = round(area_inter/area_obs*100.)
+                        # 2.2 - Compute the area of the intersection between the observed lake and the PLD lake
+                        area_inter = obs_geom_utm.intersection(lake_index.get_geom_utm(cur_idx, utm_epsg)).area
                             
-                            # 2.4 - Save info to output lists
-                            # only if overlap percentage is important enough
-                            if frac_inter > self.min_overlap:
-                                tmp_list_prior_id.append(cur_id)  # PLD identifier
-                                tmp_list_pld_overlap.append(frac_inter)  # Overlap
-                                prior_geoms.append(cur_geom)
-                            else:
-                                logger.debug("Overlap = {}% (<{}%) => PLD lake not linked with observed lake".format(frac_inter, self.min_overlap))
+                        # 2.3 - Compute associated fraction of observed lake covered by PLD lake
+                        frac_inter = round(area_inter/area_obs*100.)
+                        
+                        # 2.4 - Save info to output lists
+                        # only if overlap percentage is important enough
+                        if frac_inter > self.min_overlap:
+                            tmp_list_prior_id.append(cur_id)  # PLD identifier
+                            tmp_list_pld_overlap.append(frac_inter)  # Overlap
+                        else:
+                            logger.debug("Overlap = {}% (<{}%) => PLD lake not linked with observed lake".format(frac_inter, self.min_overlap))
                             
                     else:
                         logger.error("Something wrong happened in PLD: no identifier for this PLD lake!", exc_info=True)
@@ -392,16 +463,14 @@ class LakeDb(object):
                     # Computation time: compute_pixcvec_lakeid_with_influence_area_map * 2,5 = compute_closest_polygon_with_kdtree
                     if self.influence_lake_layer:
                         logger.debug("Compute PIXCVec lake_id with influence area map")
-                        out_pixcvec_lakeid = self.compute_pixcvec_lakeid_with_influence_area_map(in_lon, in_lat, 
-                                                                                                 prior_geoms, tmp_list_prior_id)
+                        out_pixcvec_lakeid = self.compute_pixcvec_lakeid_with_influence_area_map(in_lon, in_lat, tmp_list_prior_id)
                     else:
                         logger.debug("Compute PIXCVec lake_id with kdtree")
-                        out_pixcvec_lakeid = compute_closest_polygon_with_kdtree(in_lon, in_lat, 
-                                                                                 prior_geoms, tmp_list_prior_id)
+                        out_pixcvec_lakeid = self.compute_closest_polygon_with_kdtree(in_lon, in_lat, tmp_list_prior_id)
 
                     # ATTENTION : Different results !!
-                    # print(self.compute_pixcvec_lakeid_with_influence_area_map(in_lon, in_lat) == compute_closest_polygon_with_kdtree(in_lon, \
-                    #                in_lat, prior_geoms, prior_id))
+                    # print(self.compute_pixcvec_lakeid_with_influence_area_map(in_lon, in_lat, prior_id) == \
+                    #       self.compute_closest_polygon_with_kdtree(in_lon, in_lat, prior_id))
                     # compute_pixcvec_lakeid_with_influence_area_map is more precise.
                     # compute_closest_polygon_with_kdtree less precise because computes the distance between pixels and polygon
                     # coordinates and not polygon edges.
@@ -416,11 +485,9 @@ class LakeDb(object):
                     for ind, unique_val in enumerate(unique):
                         logger.debug("%d pixels of current observed lake belong to lake_id %s " % (counts[ind], unique_val))
 
-            self.lake_layer.SetSpatialFilter(None)  # Delete spatial filter
-
         return out_list_prior_id, out_list_pld_overlap, out_pixcvec_lakeid
 
-    def compute_pixcvec_lakeid_with_influence_area_map(self, in_lon, in_lat, prior_geom_coords, list_prior_id):
+    def compute_pixcvec_lakeid_with_influence_area_map(self, in_lon, in_lat, list_prior_id):
         """
         Compute lake_id for each PIXC of associated observed lake in the case of more than one match with PLD.
 
@@ -428,8 +495,6 @@ class LakeDb(object):
         :type in_lon: 1D-array of float
         :param in_lat: latitudes of pixels
         :type in_lat: 1D-array of float
-        :param prior_geom_coords: coordinates of polygons of overlapping PLD lakes
-        :type prior_geom_coords: list of OGRPolygon
         :param list_prior_id: prior ID of overlapping PLD lakes
         :type list_prior_id: list of str
         
@@ -442,27 +507,18 @@ class LakeDb(object):
         out_lakedb_id_pixcvec = np.zeros(in_lat.size, dtype=object)
         out_lakedb_id_pixcvec[:] = ""
 
-        # 1. Filter Influence Area following attributes
-        request = "%s IN ('%s'" %(self.lakedb_id_name, list_prior_id[0])
-        for lakedb_id in list_prior_id[1:]:
-            request += ", '%s'" %(lakedb_id)
-        request += ")"
-        self.influence_lake_layer.SetAttributeFilter(request)
-        logger.debug("Filter %d influence Area with request %s" % (self.influence_lake_layer.GetFeatureCount(), request))
-
-        # 2. Create memory layer to store pixcvec points
-        lyr, ds = my_tools.load_pixels_to_mem_layer(in_lon, in_lat)
-
-        # 3. Filter point of pixcvec with influence area
-        for infl_area_feat in self.influence_lake_layer:
-            lyr.SetSpatialFilter(infl_area_feat.GetGeometryRef())
-            for feat_point in lyr:
-                out_lakedb_id_pixcvec[feat_point.GetFID()] = infl_area_feat.GetField(self.lakedb_id_name)
-            lyr.SetSpatialFilter(None)
-        self.influence_lake_layer.SetAttributeFilter(None)
-        ds.Destroy()
-
-        # 4. Compute lakedb_id for pixels located out of the influence area
+        # 1. Retrieve influence areas of overlapping PLD lakes from the spatial index of the tile
+        influence_index = self.get_influence_index()
+        list_idx = [influence_index.dict_id_idx[str(lakedb_id)] for lakedb_id in list_prior_id 
+                    if str(lakedb_id) in influence_index.dict_id_idx]
+        logger.debug("%d influence areas retrieved for lake_id %s" % (len(list_idx), ";".join(list_prior_id)))
+
+        # 2. Vectorised point-in-polygon test of pixcvec points with each influence area
+        for cur_idx in list_idx:
+            flag_inside = my_tools.get_points_in_polygon(influence_index.list_geom[cur_idx], in_lon, in_lat)
+            out_lakedb_id_pixcvec[flag_inside] = influence_index.list_id[cur_idx]
+
+        # 3. Compute lakedb_id for pixels located out of the influence area
         unassigned_pixels = np.where(out_lakedb_id_pixcvec == "")
         nb_pt_ass_kd = unassigned_pixels[0].size
         nb_pt_ass_infl = out_lakedb_id_pixcvec.size - nb_pt_ass_kd
@@ -470,12 +526,57 @@ class LakeDb(object):
         if nb_pt_ass_infl > 0 :
             logger.debug("%d pixels assigned using influence map" %(nb_pt_ass_infl))
         if nb_pt_ass_kd > 0 :
-            out_lakedb_id_pixcvec[unassigned_pixels] = compute_closest_polygon_with_kdtree(in_lon[unassigned_pixels], in_lat[unassigned_pixels], 
-                                                                                           prior_geom_coords, list_prior_id)
+            out_lakedb_id_pixcvec[unassigned_pixels] = self.compute_closest_polygon_with_kdtree(in_lon[unassigned_pixels], in_lat[unassigned_pixels], 
+                                                                                                list_prior_id)
             logger.debug("%d pixels assigned using kd tree" % nb_pt_ass_kd)
 
         return out_lakedb_id_pixcvec
 
+    def compute_closest_polygon_with_kdtree(self, in_lon, in_lat, list_prior_id):
+        """
+        Associate to each PIXCVec coordinate (in_lon, in_lat) the closest PLD lake among list_prior_id and its id.
+        The distance is computed between pixels and vertices of PLD lake boundaries, in the UTM zone of the mean of the pixels.
+        
+        The K-d tree over the vertices of all the PLD lakes of the tile is built once per UTM zone and reused for all calls;
+        a K-d tree restricted to list_prior_id is built only for pixels which closest vertex belongs to another PLD lake.
+
+        :param in_lon: improved longitude of PixC
+        :type in_lon: 1D array of float
+        :param in_lat: improved latitude of PixC
+        :type in_lat: 1D array of float
+        :param list_prior_id: prior ID of candidate PLD lakes
+        :type list_prior_id: list of str
+
+        :return: list of the closest prior_id associated to the (in_lon, in_lat) points
+        :rtype: 1D array of str
+        """
+        
+        # 0 - Init variables
+        lake_index = self.get_lake_index()
+        array_id = np.array(lake_index.list_id, dtype=object)
+        list_idx = np.array([lake_index.dict_id_idx[str(prior_id)] for prior_id in list_prior_id], dtype=int)
+        if in_lon.size == 0:
+            return np.empty(in_lon.shape, dtype=object)
+        
+        # 1 - Project pixels into the UTM zone of their mean
+        x_point, y_point, utm_epsg = my_tools.get_utm_coords_from_lonlat(in_lon, in_lat)
+        points_utm = np.column_stack((x_point, y_point))
+        
+        # 2 - Closest vertex among the vertices of all PLD lakes of the tile
+        tree_utm, vertices_feature_idx = lake_index.get_vertices_tree(utm_epsg)
+        _, kd_tree_idx_utm = tree_utm.query(points_utm)
+        closest_idx = vertices_feature_idx[kd_tree_idx_utm]
+        
+        # 3 - Closest vertex among the vertices of list_prior_id lakes only, for pixels closer to another PLD lake
+        flag_other = np.logical_not(np.isin(closest_idx, list_idx))
+        if flag_other.any():
+            list_vertices = [lake_index.get_vertices_utm(idx, utm_epsg) for idx in list_idx]
+            sub_vertices_feature_idx = np.repeat(list_idx, [vertices.shape[0] for vertices in list_vertices])
+            _, kd_tree_idx_utm = KDTree(np.concatenate(list_vertices)).query(points_utm[flag_other])
+            closest_idx[flag_other] = sub_vertices_feature_idx[kd_tree_idx_utm]
+        
+        return array_id[closest_idx]
+
     def link_poly_to_basin(self, in_poly):
         """
         Link a polygon to a list of basins(s) by considering intersection of both
@@ -493,30 +594,25 @@ class LakeDb(object):
         
         if self.basin_layer:
             
-            # 1 - Compute intersection
-            self.basin_layer.SetSpatialFilter(in_poly)
+            # 1 - Retrieve basins intersecting the polygon with the spatial index of the tile
+            basin_index = self.get_basin_index()
+            poly_geom = shapely.wkb.loads(bytes(in_poly.ExportToWkb()))
+            if not poly_geom.is_valid:
+                poly_geom = poly_geom.buffer(0)
+            list_idx = basin_index.query(poly_geom)
 
             # 2 - Get continent name
-            if self.basin_layer.GetFeatureCount() == 0:
+            if len(list_idx) == 0:
                 out_basin_list.append("000")  # Ocean
                 
-            elif self.basin_layer.GetFeatureCount() == 1:
-                feat = self.basin_layer.GetNextFeature()
-                basin_id = str(feat.GetField(self.basindb_id_name))
-                out_basin_list.append(basin_id)
+            elif len(list_idx) == 1:
+                out_basin_list.append(basin_index.list_id[list_idx[0]])
                 
             else :
                 area_intersection = []
-                for basin_feat in self.basin_layer:
-                    basin_id = str(basin_feat.GetField(self.basindb_id_name))
-                    basin_geom = basin_feat.GetGeometryRef()
-                    if basin_geom.IsValid():
-                        inter = in_poly.Intersection(basin_geom)
-                    else :
-                        logger.warning("PLD basin table contains an invalid geometry with basin_id %s" % basin_id)
-                        inter = in_poly.Intersection(basin_geom.Buffer(0))
-                    area_intersection.append(inter.GetArea())
-                    out_basin_list.append(basin_id)
+                for cur_idx in list_idx:
+                    area_intersection.append(poly_geom.intersection(basin_index.list_geom[cur_idx]).area)
+                    out_basin_list.append(basin_index.list_id[cur_idx])
                 # Sort out_basin_list by area intersection decreasing 
                 sorted_idx = sorted(range(len(area_intersection)), key=lambda k: area_intersection[k], reverse=True)
                 out_basin_list = [out_basin_list[idx] for idx in sorted_idx]
@@ -759,75 +855,28 @@ class LakeDbSqlite(LakeDb):
         """
         logger = logging.getLogger(self.__class__.__name__)
         logger.debug("Loading fields %s of table %s from file %s" %(" ".join(in_field_name_list), in_table_name, in_lakedb_filename))
-        cfg = service_config_file.get_instance()
         
         # 0 - Init output in memory
-        mem_driver = ogr.GetDriverByName('MEMORY')  # Memory driver
-        # 0.1 - Open the memory DataSource with write access
-        out_data_source = mem_driver.CreateDataSource('memData')
-        # 0.2 - Set spatial projection
-        srs = ogr.osr.SpatialReference()
-        srs.ImportFromEPSG(4326)
-        # 0.3 - Create memory layer
-        out_layer = out_data_source.CreateLayer(str('layer'), srs=srs, geom_type=ogr.wkbPolygon)
-        # 0.4 - Create needed fields
-        for ind, field_type in enumerate(in_field_type_list):
-            out_layer.CreateField(ogr.FieldDefn(in_field_name_list[ind], my_var.FORMAT_OGR[field_type]))
-        # Retrieve layer definition
-        lyr_defn = out_layer.GetLayerDefn()
-
-        # 1 - Open the SQLite database
-        # 1.1 - Define the connector
-        db_connector = sqlite3.connect(in_lakedb_filename, timeout=10)
-        # 1.2 - Load spatialite extension
-        db_connector.enable_load_extension(True)
-        db_connector.execute('SELECT load_extension("mod_spatialite")')
-        # 1.3 - Define the cursor
-        db_cursor = db_connector.cursor()
-        # Print info
-        if cfg.get('LOGGING', 'logFileLevel') == 'DEBUG':
-            (lakes_nb,) = db_cursor.execute('SELECT count(*) from %s' %(in_table_name)).fetchone()
-            logger.debug("%d features stored in table <%s>" % (lakes_nb, in_table_name))
-
-        # 2 - Select subset among PLD lakes using in_poly or having lake_id starting with in_basin_id
-        if in_poly is not None:
-            in_poly.FlattenTo2D()  # Transform 3D geometry into 2D geometry (necessary for spatialite query)
-            cmd = "SELECT %s, AsText(geometry) FROM %s WHERE ST_Intersects(GeomFromText('%s'), %s.geometry);" % (
-                ",".join(in_field_name_list), in_table_name, in_poly.ExportToWkt(), in_table_name)
-            db_cursor.execute(cmd)
-        elif in_basin_id is not None:
-            cmd = "SELECT {}, AsText(geometry) FROM {} WHERE {} LIKE '{}%';".format(
+        out_data_source, out_layer = create_mem_layer(in_field_name_list, in_field_type_list)
+
+        # 1 - Select subset among PLD lakes using in_poly or having lake_id starting with in_basin_id
+        if (in_poly is None) and (in_basin_id is not None):
+            # Selection by attribute: not cached
+            db_connector = open_spatialite_db(in_lakedb_filename)
+            db_cursor = db_connector.cursor()
+            cmd = "SELECT {}, AsBinary(geometry) FROM {} WHERE {} LIKE '{}%';".format(
                 ",".join(in_field_name_list), in_table_name, in_field_name_list[0], in_basin_id)
+            logger.debug(cmd)
             db_cursor.execute(cmd)
+            copy_db_features_to_layer(db_cursor, in_field_name_list, out_layer)
+            db_connector.close()
         else:
-            cmd = "SELECT %s, AsText(geometry) FROM %s ;" % (",".join(in_field_name_list), in_table_name)
-            db_cursor.execute(cmd)
-        logger.debug(cmd)
-
-        # 3 - Copy selected features to output memory layer
-        for db_feature in db_cursor:
-            
-            # 3.1 - Create empty feature
-            tmp_feat = ogr.Feature(lyr_defn)
-
-            # 3.2 - Fill feature with attributes and geometry from SQLite request
-            poly = ogr.CreateGeometryFromWkt(db_feature[-1])
-            for ind, fieldname in enumerate(in_field_name_list):
-                tmp_feat.SetField(fieldname, str(db_feature[ind]))
-            tmp_feat.SetGeometry(poly)
-
-            # 3.3 - Add feature to output layer
-            out_layer.CreateFeature(tmp_feat)
-
-            # 3.4 - Close temporary feature
-            tmp_feat.Destroy()
+            # Spatial selection
+            load_pld_table(in_lakedb_filename, in_table_name, in_field_name_list, in_field_type_list, out_layer, in_poly=in_poly)
 
-        # 4 - Reset reading pointer
+        # 2 - Reset reading pointer
         out_layer.ResetReading()
 
-        # 5 - Close spatialite database
-        db_connector.close()
-
         logger.info("%d features after focus over studied area" % out_layer.GetFeatureCount())
         return out_data_source, out_layer
 
@@ -957,73 +1006,16 @@ class LakeDbDirectory(LakeDb):
         """
         logger = logging.getLogger(self.__class__.__name__)
 
-        cfg = service_config_file.get_instance()
-
         # 0 - Init output in memory
-        mem_driver = ogr.GetDriverByName('MEMORY')  # Memory driver
-        # 0.1 - Open the memory DataSource with write access
-        out_data_source = mem_driver.CreateDataSource('memData')
-        # 0.2 - Set spatial projection
-        srs = ogr.osr.SpatialReference()
-        srs.ImportFromEPSG(4326)
-        # 0.3 - Create memory layer
-        out_layer = out_data_source.CreateLayer(str('layer'), srs=srs, geom_type=ogr.wkbPolygon)
-        # 0.4 - Create needed fields
-        for ind, field_type in enumerate(in_field_type_list):
-            out_layer.CreateField(ogr.FieldDefn(in_field_name_list[ind], my_var.FORMAT_OGR[field_type]))
-        # Retrieve layer definition
-        lyr_defn = out_layer.GetLayerDefn()
+        out_data_source, out_layer = create_mem_layer(in_field_name_list, in_field_type_list)
 
+        # 1 - Copy features selected in each PLD file to output memory layer
         for pld_path in self.pld_path_list:
             logger.debug("Loading fields %s of table %s from folder %s" % (
             " ".join(in_field_name_list), in_table_name, pld_path))
+            load_pld_table(pld_path, in_table_name, in_field_name_list, in_field_type_list, out_layer, in_poly=in_poly)
 
-            # 1 - Open the SQLite database
-            # 1.1 - Define the connector
-            db_connector = sqlite3.connect(pld_path, timeout=10)
-            # 1.2 - Load spatialite extension
-            db_connector.enable_load_extension(True)
-            db_connector.execute('SELECT load_extension("mod_spatialite")')
-            # 1.3 - Define the cursor
-            db_cursor = db_connector.cursor()
-            # Print info
-            if cfg.get('LOGGING', 'logFileLevel') == 'DEBUG':
-                (lakes_nb,) = db_cursor.execute('SELECT count(*) from %s' % (in_table_name)).fetchone()
-                logger.debug("%d features stored in table <%s>" % (lakes_nb, in_table_name))
-
-            # 2 - Select subset among PLD lakes using in_poly
-            if in_poly is not None:
-                in_poly.FlattenTo2D()  # Transform 3D geometry into 2D geometry (necessary for spatialite query)
-                cmd = "SELECT %s, AsText(geometry) FROM %s WHERE ST_Intersects(GeomFromText('%s'), %s.geometry);" % (
-                    ",".join(in_field_name_list), in_table_name, in_poly.ExportToWkt(), in_table_name)
-                db_cursor.execute(cmd)
-            else:
-                cmd = "SELECT %s, AsText(geometry) FROM %s ;" % (",".join(in_field_name_list), in_table_name)
-                db_cursor.execute(cmd)
-
-            logger.debug("Loading features to memory layer")
-            # 3 - Copy selected features to output memory layer
-            for db_feature in db_cursor:
-
-                # 3.1 - Create empty feature
-                tmp_feat = ogr.Feature(lyr_defn)
-
-                # 3.2 - Fill feature with attributes and geometry from SQLite request
-                poly = ogr.CreateGeometryFromWkt(db_feature[-1])
-                for ind, fieldname in enumerate(in_field_name_list):
-                    tmp_feat.SetField(fieldname, str(db_feature[ind]))
-                tmp_feat.SetGeometry(poly)
-
-                # 3.3 - Add feature to output layer
-                out_layer.CreateFeature(tmp_feat)
-
-                # 3.4 - Close temporary feature
-                tmp_feat.Destroy()
-
-            # 5 - Close spatialite database
-            db_connector.close()
-
-        # 4 - Reset reading pointer
+        # 2 - Reset reading pointer
         out_layer.ResetReading()
 
         logger.info("%d features after focus over studied area" % out_layer.GetFeatureCount())
@@ -1052,70 +1044,16 @@ class LakeDbDirectory(LakeDb):
         logger = logging.getLogger(self.__class__.__name__)
         logger.debug("Loading fields %s of table %s from file %s" % (
         " ".join(in_field_name_list), in_table_name, in_lakedb_filename))
-        cfg = service_config_file.get_instance()
 
         # 0 - Init output in memory
-        mem_driver = ogr.GetDriverByName('MEMORY')  # Memory driver
-        # 0.1 - Open the memory DataSource with write access
-        out_data_source = mem_driver.CreateDataSource('memData')
-        # 0.2 - Set spatial projection
-        srs = ogr.osr.SpatialReference()
-        srs.ImportFromEPSG(4326)
-        # 0.3 - Create memory layer
-        out_layer = out_data_source.CreateLayer(str('layer'), srs=srs, geom_type=ogr.wkbPolygon)
-        # 0.4 - Create needed fields
-        for ind, field_type in enumerate(in_field_type_list):
-            out_layer.CreateField(ogr.FieldDefn(in_field_name_list[ind], my_var.FORMAT_OGR[field_type]))
-        # Retrieve layer definition
-        lyr_defn = out_layer.GetLayerDefn()
-
-        # 1 - Open the SQLite database
-        # 1.1 - Define the connector
-        db_connector = sqlite3.connect(in_lakedb_filename, timeout=10)
-        # 1.2 - Load spatialite extension
-        db_connector.enable_load_extension(True)
-        db_connector.execute('SELECT load_extension("mod_spatialite")')
-        # 1.3 - Define the cursor
-        db_cursor = db_connector.cursor()
-        # Print info
-        if cfg.get('LOGGING', 'logFileLevel') == 'DEBUG':
-            (lakes_nb,) = db_cursor.execute('SELECT count(*) from %s' % (in_table_name)).fetchone()
-            logger.debug("%d features stored in table <%s>" % (lakes_nb, in_table_name))
-
-        # 2 - Select subset among PLD lakes using in_poly
-        if in_poly is not None:
-            in_poly.FlattenTo2D()  # Transform 3D geometry into 2D geometry (necessary for spatialite query)
-            cmd = "SELECT %s, AsText(geometry) FROM %s WHERE ST_Intersects(GeomFromText('%s'), %s.geometry);" % (
-                ",".join(in_field_name_list), in_table_name, in_poly.ExportToWkt(), in_table_name)
-            db_cursor.execute(cmd)
-        else:
-            cmd = "SELECT %s, AsText(geometry) FROM %s ;" % (",".join(in_field_name_list), in_table_name)
-            db_cursor.execute(cmd)
-
-        # 3 - Copy selected features to output memory layer
-        for db_feature in db_cursor:
-
-            # 3.1 - Create empty feature
-            tmp_feat = ogr.Feature(lyr_defn)
-
-            # 3.2 - Fill feature with attributes and geometry from SQLite request
-            poly = ogr.CreateGeometryFromWkt(db_feature[-1])
-            for ind, fieldname in enumerate(in_field_name_list):
-                tmp_feat.SetField(fieldname, str(db_feature[ind]))
-            tmp_feat.SetGeometry(poly)
-
-            # 3.3 - Add feature to output layer
-            out_layer.CreateFeature(tmp_feat)
+        out_data_source, out_layer = create_mem_layer(in_field_name_list, in_field_type_list)
 
-            # 3.4 - Close temporary feature
-            tmp_feat.Destroy()
+        # 1 - Copy selected features to output memory layer
+        load_pld_table(in_lakedb_filename, in_table_name, in_field_name_list, in_field_type_list, out_layer, in_poly=in_poly)
 
-        # 4 - Reset reading pointer
+        # 2 - Reset reading pointer
         out_layer.ResetReading()
 
-        # 5 - Close spatialite database
-        db_connector.close()
-
         logger.info("%d features after focus over studied area" % out_layer.GetFeatureCount())
         return out_data_source, out_layer
 
@@ -1169,63 +1107,607 @@ def select_pld_file_from_polygon(pld_path_list, basin_lyr):
 #######################################
 
 
-def compute_closest_polygon_with_kdtree(in_lon, in_lat, prior_geoms, prior_id):
+# this is a pointer to the module object instance itself.
+THIS = sys.modules[__name__]
+
+# Subsets of PLD tables already loaded from SQLite files
+# They are shared by all the tiles processed by the current process (i.e. all tiles of a pass or a cycle)
+# key = (full path of PLD, table name, tuple of loaded fieldnames) ; value = PldTableCache object
+PLD_CACHE = {}
+# PLD_CACHE is used only if enabled by a driver processing several tiles (see enable_pld_cache and preload_pld);
+# otherwise, PLD features are loaded straight into the layer of the tile
+THIS.flag_pld_cache = False
+
+
+class PldTableCache(object):
     """
-    Associate to each PIXCVec coordinate (in_lon, in_lat) the closest prior lake and its id
-
-    :param in_lon: improved longitude of PixC related to in_poly
-    :type in_lon: 1D array of float
-    :param in_lat: improved latitude of PixC related to in_poly
-    :type in_lat: 1D array of float
-    :param prior_geom_coords: List of coordinates of polygons of prior lake database selected
-    :type prior_geom_coords: 2D array of float
-    :param prior_id: List of prior ID from lake DB
-    :type prior_id: 1D array of str
-
-    :return: list of the closest prior_id associated to the (in_lon, in_lat) points
-    :rtype: list of str
+    This class stores in memory the subset of a PLD table already loaded from a SQLite file,
+    in order to reuse it for all the tiles it covers
     """
-    prior_geom_coords = []
-    for geom in prior_geoms:
-        # Get the coordinates with json library
-        json_geom = geom.ExportToJson()
-        multi_polygon = json.loads(json_geom)['coordinates']
 
-        multi_polygon_array = np.array([])
-        # Loop on multi_polygon in case of multi polygon geometry
-        for poly in multi_polygon:
-            multi_polygon_array = np.append(multi_polygon_array, poly[:-1])
+    def __init__(self, in_lakedb_filename, in_table_name, in_field_name_list, in_field_type_list):
+        """
+        Constructor
+
+        :param in_lakedb_filename: full path of PLD
+        :type in_lakedb_filename: str
+        :param in_table_name: name of table to load from DB
+        :type in_table_name: str
+        :param in_field_name_list: list of fieldnames to load from table, first element is the identifier
+        :type in_field_name_list: list of str
+        :param in_field_type_list: list of type of each in_field_name_list
+        :type in_field_type_list: list of str
+
+        Variables of the object:
+        - lakedb_filename / str: full path of PLD
+        - table_name / str: name of the loaded table
+        - field_name_list / list of str: loaded fieldnames, first element is the identifier
+        - data_source / osgeo.ogr.DataSource: memory DataSource storing the loaded features
+        - layer / osgeo.ogr.Layer: memory layer storing the loaded features
+        - list_id / set: identifiers of the loaded features
+        - extent / osgeo.ogr.Geometry: union of the polygons used to select the loaded features
+        - flag_full / boolean: =True if the whole table has been loaded, =False otherwise
+        """
+        self.lakedb_filename = in_lakedb_filename
+        self.table_name = in_table_name
+        self.field_name_list = in_field_name_list
+        self.data_source, self.layer = create_mem_layer(in_field_name_list, in_field_type_list)
+        self.list_id = set()
+        self.extent = None
+        self.flag_full = False
+
+    def is_covering(self, in_poly=None):
+        """
+        Test if all the features of the table intersecting in_poly are already loaded
 
-        # Reshape the 1-D array into 2-D array
-        multi_polygon_array = multi_polygon_array.reshape(int(multi_polygon_array.shape[0] / 2), 2)
-        prior_geom_coords.append(multi_polygon_array)  # Add the coordinates of the cur_geom to the list
+        :param in_poly: polygon to spatially select features from table (=None to select all features)
+        :type in_poly: ogr.Polygon
 
-    lon_coords, lat_coords, prior_id_list = np.array([]), np.array([]), np.array([], dtype=object)
-    for coords, id in zip(prior_geom_coords, prior_id):
-        lon_coords = np.append(lon_coords, coords[:, 0])
-        lat_coords = np.append(lat_coords, coords[:, 1])
-        prior_id_list = np.append(prior_id_list, len(coords[:, 0]) * [
-            id])  # Fill the associated prior_id list of the lon/lat coordinates
+        :return: True if features have already been loaded, False otherwise
+        :rtype: boolean
+        """
+        retour = self.flag_full
+        if (not retour) and (in_poly is not None) and (self.extent is not None):
+            retour = self.extent.Contains(in_poly)
+        return retour
 
-    # Project coordinates to UTM before compute distances
-    x_coords_utm, y_coords_utm, utm_code = my_tools.get_utm_coords_from_lonlat(lon_coords, lat_coords)
-    x_point, y_point, utm_code = my_tools.get_utm_coords_from_lonlat(in_lon, in_lat)
+    def load(self, in_poly=None):
+        """
+        Load features of the table intersecting in_poly, which are not already loaded
 
-    # Cdist computation
-    # dist_mat = cdist(np.stack((x_coords_utm, y_coords_utm), axis=-1), np.stack((x_point, y_point), axis=-1))
-    # cdist_idx = np.argmin(dist_mat, axis = 0)
+        :param in_poly: polygon to spatially select features from table (=None to select all features)
+        :type in_poly: ogr.Polygon
+        """
+        logger = logging.getLogger(self.__class__.__name__)
 
-    # Build the K-d tree
-    tree_utm = KDTree(list(zip(x_coords_utm, y_coords_utm)))
+        # 1 - Copy features not already loaded to memory layer
+        nb_loaded = select_pld_features(self.lakedb_filename, self.table_name, self.field_name_list, self.layer,
+                                        in_poly=in_poly, in_list_id=self.list_id)
+        logger.debug("%d features added to PLD cache of table <%s>" % (nb_loaded, self.table_name))
 
-    # Built the list point for the query
-    points_list_utm = np.vstack((x_point, y_point)).T
+        # 2 - Update loaded extent
+        if in_poly is None:
+            self.flag_full = True
+        elif self.extent is None:
+            self.extent = in_poly.Clone()
+        else:
+            self.extent = self.extent.Union(in_poly)
 
-    # Apply K-d tree and get the result: distance and index
-    _, kd_tree_idx_utm = tree_utm.query(points_list_utm)
+    def copy_to_layer(self, out_layer, in_poly=None):
+        """
+        Copy features of the table intersecting in_poly to out_layer;
+        features are first loaded from the database if not already in memory
+
+        :param out_layer: layer in which features are added; must have the same fields as the cache
+        :type out_layer: osgeo.ogr.Layer
+        :param in_poly: polygon to spatially select features from table (=None to select all features)
+        :type in_poly: ogr.Polygon
+        """
 
-    # code commenté return prior_id_list[cdist_idx]
-    return prior_id_list[kd_tree_idx_utm]
+        # 1 - Load missing features
+        if not self.is_covering(in_poly):
+            self.load(in_poly=in_poly)
+
+        # 2 - Copy selected features
+        out_lyr_defn = out_layer.GetLayerDefn()
+        self.layer.SetSpatialFilter(in_poly)
+        self.layer.ResetReading()
+        for cache_feat in self.layer:
+            out_feat = ogr.Feature(out_lyr_defn)
+            out_feat.SetFrom(cache_feat)
+            out_layer.CreateFeature(out_feat)
+            out_feat.Destroy()
+        self.layer.SetSpatialFilter(None)
+        self.layer.ResetReading()
+
+
+def select_pld_features(in_lakedb_filename, in_table_name, in_field_name_list, out_layer, in_poly=None, in_list_id=None):
+    """
+    Copy features of the table in_table_name of PLD in_lakedb_filename intersecting in_poly to out_layer,
+    using the spatial index of the table when it exists
+
+    :param in_lakedb_filename: full path of PLD
+    :type in_lakedb_filename: str
+    :param in_table_name: name of table to load from DB
+    :type in_table_name: str
+    :param in_field_name_list: list of fieldnames to load from table, first element is the identifier
+    :type in_field_name_list: list of str
+    :param out_layer: layer in which features are added; must have the fields in_field_name_list
+    :type out_layer: osgeo.ogr.Layer
+    :param in_poly: polygon to spatially select features from table (=None to select all features)
+    :type in_poly: ogr.Polygon
+    :param in_list_id: identifiers of features already in out_layer, to skip; updated with added identifiers (=None to copy all features)
+    :type in_list_id: set
+
+    :return: number of added features
+    :rtype: int
+    """
+    logger = logging.getLogger("lake_db")
+    cfg = service_config_file.get_instance()
+
+    # 1 - Open the SQLite database
+    db_connector = open_spatialite_db(in_lakedb_filename)
+    db_cursor = db_connector.cursor()
+    # Print info
+    if (cfg is not None) and (cfg.get('LOGGING', 'logFileLevel') == 'DEBUG'):
+        (lakes_nb,) = db_cursor.execute('SELECT count(*) from %s' %(in_table_name)).fetchone()
+        logger.debug("%d features stored in table <%s>" % (lakes_nb, in_table_name))
+
+    # 2 - Select subset among PLD features using in_poly
+    if in_poly is not None:
+        in_poly.FlattenTo2D()  # Transform 3D geometry into 2D geometry (necessary for spatialite query)
+        poly_wkt = in_poly.ExportToWkt()
+        cmd = "SELECT %s, AsBinary(geometry) FROM %s WHERE ST_Intersects(GeomFromText('%s'), %s.geometry)" % (
+            ",".join(in_field_name_list), in_table_name, poly_wkt, in_table_name)
+        if has_spatial_index(db_cursor, in_table_name):
+            # Pre-select candidates with the R-tree index before the exact intersection test
+            cmd += " AND %s.ROWID IN (SELECT ROWID FROM SpatialIndex WHERE f_table_name = '%s' " \
+                   "AND f_geometry_column = 'geometry' AND search_frame = GeomFromText('%s'))" % (
+                in_table_name, in_table_name, poly_wkt)
+        else:
+            logger.warning("No spatial index for table <%s> of %s => full scan" % (in_table_name, in_lakedb_filename))
+        cmd += ";"
+    else:
+        cmd = "SELECT %s, AsBinary(geometry) FROM %s ;" % (",".join(in_field_name_list), in_table_name)
+    logger.debug(cmd)
+    db_cursor.execute(cmd)
+
+    # 3 - Copy features to output layer
+    out_nb_added = copy_db_features_to_layer(db_cursor, in_field_name_list, out_layer, in_list_id=in_list_id)
+
+    # 4 - Close spatialite database
+    db_connector.close()
+
+    return out_nb_added
+
+
+def load_pld_table(in_lakedb_filename, in_table_name, in_field_name_list, in_field_type_list, out_layer, in_poly=None):
+    """
+    Copy features of the table in_table_name of PLD in_lakedb_filename intersecting in_poly to out_layer;
+    if the PLD cache is enabled, features are taken from (and kept in) the cache, otherwise they are read from the database
+
+    :param in_lakedb_filename: full path of PLD
+    :type in_lakedb_filename: str
+    :param in_table_name: name of table to load from DB
+    :type in_table_name: str
+    :param in_field_name_list: list of fieldnames to load from table, first element is the identifier
+    :type in_field_name_list: list of str
+    :param in_field_type_list: list of type of each in_field_name_list
+    :type in_field_type_list: list of str
+    :param out_layer: layer in which features are added; must have the fields in_field_name_list
+    :type out_layer: osgeo.ogr.Layer
+    :param in_poly: polygon to spatially select features from table (=None to select all features)
+    :type in_poly: ogr.Polygon
+    """
+    if THIS.flag_pld_cache:
+        # Use PLD subset already loaded for previous tiles when possible
+        cur_cache = get_pld_table_cache(in_lakedb_filename, in_table_name, in_field_name_list, in_field_type_list)
+        cur_cache.copy_to_layer(out_layer, in_poly=in_poly)
+    else:
+        select_pld_features(in_lakedb_filename, in_table_name, in_field_name_list, out_layer, in_poly=in_poly)
+
+
+def get_pld_table_cache(in_lakedb_filename, in_table_name, in_field_name_list, in_field_type_list):
+    """
+    Get the cache of the table in_table_name of PLD in_lakedb_filename; create it if it doesn't exist
+
+    :param in_lakedb_filename: full path of PLD
+    :type in_lakedb_filename: str
+    :param in_table_name: name of table to load from DB
+    :type in_table_name: str
+    :param in_field_name_list: list of fieldnames to load from table, first element is the identifier
+    :type in_field_name_list: list of str
+    :param in_field_type_list: list of type of each in_field_name_list
+    :type in_field_type_list: list of str
+
+    :return: cache of the table
+    :rtype: PldTableCache
+    """
+    key = (os.path.abspath(in_lakedb_filename), in_table_name, tuple(in_field_name_list))
+    if key not in PLD_CACHE:
+        PLD_CACHE[key] = PldTableCache(in_lakedb_filename, in_table_name, in_field_name_list, in_field_type_list)
+    return PLD_CACHE[key]
+
+
+def enable_pld_cache(in_flag=True):
+    """
+    Enable (or disable) the PLD cache for the tiles processed afterwards by the current process;
+    to be called only by drivers processing several tiles covering the same PLD subset.
+    Disabling the cache also releases its content.
+
+    :param in_flag: =True to enable the cache, =False to disable it
+    :type in_flag: boolean
+    """
+    if not in_flag:
+        clear_pld_cache()
+    THIS.flag_pld_cache = in_flag
+
+
+def preload_pld(in_lakedb_filename, in_poly):
+    """
+    Load in cache the subset of the PLD covering in_poly (ex: footprint of all the tiles of a pass),
+    so that the tiles processed afterwards by the current process don't read the database anymore.
+    The PLD cache is enabled if not already.
+    Only SQLite format (file or directory) is concerned.
+
+    :param in_lakedb_filename: full path of PLD (SQLite file or directory containing SQLite files)
+    :type in_lakedb_filename: str
+    :param in_poly: polygon to spatially select features from PLD
+    :type in_poly: ogr.Polygon
+    """
+    logger = logging.getLogger("lake_db")
+
+    obj_lake_db = None
+    if in_lakedb_filename.endswith(".sqlite"):
+        enable_pld_cache()
+        obj_lake_db = LakeDbSqlite(in_lakedb_filename, in_poly=in_poly)
+    elif os.path.isdir(in_lakedb_filename):
+        enable_pld_cache()
+        obj_lake_db = LakeDbDirectory(in_lakedb_filename, in_poly=in_poly)
+    else:
+        logger.debug("PLD %s not in SQLite format => no preloading" % in_lakedb_filename)
+
+    if obj_lake_db is not None:
+        obj_lake_db.close_db()
+
+
+def clear_pld_cache():
+    """
+    Release all the PLD subsets stored in cache
+    """
+    for cur_cache in PLD_CACHE.values():
+        cur_cache.data_source.Destroy()
+    PLD_CACHE.clear()
+
+
+def create_mem_layer(in_field_name_list, in_field_type_list):
+    """
+    Create an empty polygon layer in memory, in WGS84, with fields in_field_name_list
+
+    :param in_field_name_list: list of fieldnames
+    :type in_field_name_list: list of str
+    :param in_field_type_list: list of type of each in_field_name_list
+    :type in_field_type_list: list of str
+
+    :return: out_data_source = memory DataSource
+    :rtype: osgeo.ogr.DataSource
+    :return: out_layer = memory layer
+    :rtype: osgeo.ogr.Layer
+    """
+    # 1 - Open the memory DataSource with write access
+    mem_driver = ogr.GetDriverByName('MEMORY')  # Memory driver
+    out_data_source = mem_driver.CreateDataSource('memData')
+    # 2 - Set spatial projection
+    srs = ogr.osr.SpatialReference()
+    srs.ImportFromEPSG(4326)
+    # 3 - Create memory layer
+    out_layer = out_data_source.CreateLayer(str('layer'), srs=srs, geom_type=ogr.wkbPolygon)
+    # 4 - Create needed fields
+    for ind, field_type in enumerate(in_field_type_list):
+        out_layer.CreateField(ogr.FieldDefn(in_field_name_list[ind], my_var.FORMAT_OGR[field_type]))
+    return out_data_source, out_layer
+
+
+def open_spatialite_db(in_lakedb_filename):
+    """
+    Open SQLite database and load spatialite extension
+
+    :param in_lakedb_filename: full path of PLD
+    :type in_lakedb_filename: str
+
+    :return: connector to the database
+    :rtype: sqlite3.Connection
+    """
+    db_connector = sqlite3.connect(in_lakedb_filename, timeout=10)
+    db_connector.enable_load_extension(True)
+    db_connector.execute('SELECT load_extension("mod_spatialite")')
+    return db_connector
+
+
+def has_spatial_index(in_db_cursor, in_table_name):
+    """
+    Test if the geometry column of in_table_name has a spatialite R-tree index
+
+    :param in_db_cursor: cursor of the opened database
+    :type in_db_cursor: sqlite3.Cursor
+    :param in_table_name: name of the table
+    :type in_table_name: str
+
+    :return: True if the spatial index exists, False otherwise
+    :rtype: boolean
+    """
+    try:
+        cmd = "SELECT spatial_index_enabled FROM geometry_columns " \
+              "WHERE lower(f_table_name) = lower('%s') AND lower(f_geometry_column) = 'geometry';" % in_table_name
+        row = in_db_cursor.execute(cmd).fetchone()
+    except sqlite3.Error:
+        row = None
+    return (row is not None) and (row[0] == 1)
+
+
+def copy_db_features_to_layer(in_db_cursor, in_field_name_list, out_layer, in_list_id=None):
+    """
+    Copy features retrieved by a SQLite request to out_layer.
+    Each row of the request contains the values of in_field_name_list followed by the geometry in WKB.
+
+    :param in_db_cursor: cursor of the executed request
+    :type in_db_cursor: sqlite3.Cursor
+    :param in_field_name_list: list of fieldnames retrieved by the request, first element is the identifier
+    :type in_field_name_list: list of str
+    :param out_layer: layer in which features are added
+    :type out_layer: osgeo.ogr.Layer
+    :param in_list_id: identifiers of features already in out_layer, to skip; updated with added identifiers (=None to copy all features)
+    :type in_list_id: set
+
+    :return: number of added features
+    :rtype: int
+    """
+    lyr_defn = out_layer.GetLayerDefn()
+    out_nb_added = 0
+
+    for db_feature in in_db_cursor:
+
+        # 1 - Skip features already loaded
+        if in_list_id is not None:
+            if db_feature[0] in in_list_id:
+                continue
+            in_list_id.add(db_feature[0])
+
+        # 2 - Create empty feature
+        tmp_feat = ogr.Feature(lyr_defn)
+
+        # 3 - Fill feature with attributes and geometry from SQLite request
+        poly = ogr.CreateGeometryFromWkb(bytes(db_feature[-1]))
+        for ind, fieldname in enumerate(in_field_name_list):
+            tmp_feat.SetField(fieldname, str(db_feature[ind]))
+        tmp_feat.SetGeometry(poly)
+
+        # 4 - Add feature to output layer
+        out_layer.CreateFeature(tmp_feat)
+        out_nb_added += 1
+
+        # 5 - Close temporary feature
+        tmp_feat.Destroy()
+
+    return out_nb_added
+
+
+#######################################
+
+
+class LayerSpatialIndex(object):
+    """
+    This class stores the polygons of a layer in a bulk spatial index (STRtree), built once per tile,
+    to retrieve the features intersecting a polygon without setting a spatial filter on the layer for each polygon
+    """
+
+    def __init__(self, in_layer, in_id_name):
+        """
+        Constructor
+
+        :param in_layer: layer storing the polygons to index
+        :type in_layer: osgeo.ogr.Layer
+        :param in_id_name: fieldname of the identifier of the features
+        :type in_id_name: str
+
+        Variables of the object:
+        - list_id / list of str: identifier of each indexed feature
+        - dict_id_idx / dict: index of each indexed feature in list_id; key = identifier
+        - list_fid / list of int: FID of each indexed feature in in_layer
+        - list_geom / list of shapely geometries: geometry of each indexed feature, in geographic coordinates
+        - tree / shapely.strtree.STRtree: spatial index over list_geom (=None if in_layer is empty)
+        - dict_geom_idx / dict: index of each geometry of list_geom, key = id() of the geometry 
+                                (used with shapely < 1.8 whose STRtree.query returns geometries; =None otherwise)
+        - list_utm_epsg / list of str: EPSG code of the UTM zone of the centroid of each indexed feature (=None until first use)
+        - dict_geom_utm / dict: geometry of indexed features projected in a UTM zone; key = (EPSG code, index of the feature)
+        - dict_vertices_utm / dict: vertices of the boundary of indexed features projected in a UTM zone; 
+                                    key = (EPSG code, index of the feature)
+        - dict_vertices_tree / dict: K-d tree over the vertices of all indexed features projected in a UTM zone, 
+                                     and index of the feature of each vertex; key = EPSG code
+        NB: projected geometries are computed at first use, in the UTM zone asked by the caller (i.e. the one of the 
+        observed feature or PLD lake being processed), so that areas and distances are computed in a local frame
+        whatever the extent of the layer (tile or continental pass)
+        """
+        logger = logging.getLogger(self.__class__.__name__)
+
+        self.list_id = []
+        self.dict_id_idx = {}
+        self.list_fid = []
+        self.list_geom = []
+
+        # 1 - Load geometries from layer
+        in_layer.SetSpatialFilter(None)
+        in_layer.ResetReading()
+        for cur_feature in in_layer:
+            cur_id = str(cur_feature.GetField(in_id_name))
+            cur_geom = shapely.wkb.loads(bytes(cur_feature.GetGeometryRef().ExportToWkb()))
+            if not cur_geom.is_valid:
+                logger.warning("Layer %s contains an invalid geometry with identifier %s" % (in_layer.GetName(), cur_id))
+                cur_geom = cur_geom.buffer(0)
+            self.dict_id_idx[cur_id] = len(self.list_id)
+            self.list_id.append(cur_id)
+            self.list_fid.append(cur_feature.GetFID())
+            self.list_geom.append(cur_geom)
+        in_layer.ResetReading()
+
+        # 2 - Build spatial index
+        self.tree = None
+        self.dict_geom_idx = None
+        if self.list_geom:
+            self.tree = STRtree(self.list_geom)
+            # With shapely < 1.8, STRtree.query returns the indexed geometries themselves, not their indices
+            if (int(shapely.__version__.split(".")[0]) < 2) and (not hasattr(self.tree, "query_items")):
+                self.dict_geom_idx = {id(cur_geom): idx for (idx, cur_geom) in enumerate(self.list_geom)}
+        logger.debug("%d features of layer %s indexed" % (len(self.list_geom), in_layer.GetName()))
+
+        # 3 - Projected geometries, by UTM zone
+        self.list_utm_epsg = None
+        self.dict_geom_utm = {}
+        self.dict_vertices_utm = {}
+        self.dict_vertices_tree = {}
+
+    def query(self, in_geom):
+        """
+        Retrieve the indexed features intersecting in_geom
+
+        :param in_geom: geometry in geographic coordinates
+        :type in_geom: shapely geometry
+
+        :return: out_list_idx = indices (in list_id, list_fid and list_geom) of the features intersecting in_geom
+        :rtype: list of int
+        """
+        out_list_idx = []
+
+        if self.tree is not None:
+            # Candidates from bounding boxes
+            if hasattr(self.tree, "query_items"):
+                # shapely 1.8: indices of the geometries
+                list_candidates = self.tree.query_items(in_geom)
+            elif self.dict_geom_idx is not None:
+                # shapely < 1.8: geometries, converted to their indices
+                list_candidates = [self.dict_geom_idx[id(cur_geom)] for cur_geom in self.tree.query(in_geom)]
+            else:
+                # shapely >= 2.0: indices of the geometries
+                list_candidates = self.tree.query(in_geom)
+            # Exact intersection test
+            prep_geom = prep(in_geom)
+            out_list_idx = [int(idx) for idx in sorted(list_candidates) if prep_geom.intersects(self.list_geom[idx])]
+
+        return out_list_idx
+
+    def get_utm_epsg(self, in_idx):
+        """
+        Get the EPSG code of the UTM zone of the centroid of an indexed feature
+
+        :param in_idx: index of the feature (in list_id, list_fid and list_geom)
+        :type in_idx: int
+
+        :return: EPSG code of the UTM zone
+        :rtype: str
+        """
+        if self.list_utm_epsg is None:
+            self.list_utm_epsg = [None] * len(self.list_geom)
+        if self.list_utm_epsg[in_idx] is None:
+            self.list_utm_epsg[in_idx] = get_utm_epsg_of_geom(self.list_geom[in_idx])
+        return self.list_utm_epsg[in_idx]
+
+    def project(self, in_geom, in_utm_epsg):
+        """
+        Project a geometry in geographic coordinates into a UTM zone
+
+        :param in_geom: geometry in geographic coordinates
+        :type in_geom: shapely geometry
+        :param in_utm_epsg: EPSG code of the UTM zone
+        :type in_utm_epsg: str
+
+        :return: geometry projected in in_utm_epsg
+        :rtype: shapely geometry
+        """
+        return transform(my_tools.get_pyproj_transform(4326, in_utm_epsg), in_geom)
+
+    def get_geom_utm(self, in_idx, in_utm_epsg):
+        """
+        Get the geometry of an indexed feature projected in a UTM zone; it is projected only once per UTM zone
+
+        :param in_idx: index of the feature (in list_id, list_fid and list_geom)
+        :type in_idx: int
+        :param in_utm_epsg: EPSG code of the UTM zone
+        :type in_utm_epsg: str
+
+        :return: geometry projected in in_utm_epsg
+        :rtype: shapely geometry
+        """
+        key = (in_utm_epsg, in_idx)
+        if key not in self.dict_geom_utm:
+            self.dict_geom_utm[key] = self.project(self.list_geom[in_idx], in_utm_epsg)
+        return self.dict_geom_utm[key]
+
+    def get_vertices_utm(self, in_idx, in_utm_epsg):
+        """
+        Get the vertices of the boundary (exterior and interior rings) of an indexed feature projected in a UTM zone;
+        they are extracted and projected only once per UTM zone
+        
+        :param in_idx: index of the feature (in list_id, list_fid and list_geom)
+        :type in_idx: int
+        :param in_utm_epsg: EPSG code of the UTM zone
+        :type in_utm_epsg: str
+
+        :return: vertices projected in in_utm_epsg (1 row per vertex, closing vertex of each ring excluded)
+        :rtype: 2D-array of float
+        """
+        key = (in_utm_epsg, in_idx)
+        if key not in self.dict_vertices_utm:
+            # 1 - Retrieve vertices of all rings
+            cur_geom = self.list_geom[in_idx]
+            list_rings = []
+            for cur_poly in getattr(cur_geom, "geoms", [cur_geom]):
+                if cur_poly.is_empty:
+                    continue
+                for cur_ring in [cur_poly.exterior] + list(cur_poly.interiors):
+                    list_rings.append(np.asarray(cur_ring.coords)[:-1, :2])
+            if list_rings:
+                vertices = np.concatenate(list_rings)
+            else:
+                vertices = np.zeros((0, 2))
+            # 2 - Project them
+            x_utm, y_utm = my_tools.get_pyproj_transform(4326, in_utm_epsg)(vertices[:, 0], vertices[:, 1])
+            self.dict_vertices_utm[key] = np.column_stack((x_utm, y_utm))
+        return self.dict_vertices_utm[key]
+
+    def get_vertices_tree(self, in_utm_epsg):
+        """
+        Get the K-d tree over the vertices of all indexed features projected in a UTM zone; it is built only once per UTM zone
+
+        :param in_utm_epsg: EPSG code of the UTM zone
+        :type in_utm_epsg: str
+
+        :return: vertices_tree = K-d tree over the vertices
+        :rtype: scipy.spatial.KDTree
+        :return: vertices_feature_idx = index of the feature of each vertex
+        :rtype: 1D-array of int
+        """
+        if in_utm_epsg not in self.dict_vertices_tree:
+            list_vertices = [self.get_vertices_utm(idx, in_utm_epsg) for idx in range(len(self.list_geom))]
+            vertices_feature_idx = np.repeat(np.arange(len(list_vertices)), [vertices.shape[0] for vertices in list_vertices])
+            self.dict_vertices_tree[in_utm_epsg] = (KDTree(np.concatenate(list_vertices)), vertices_feature_idx)
+        return self.dict_vertices_tree[in_utm_epsg]
+
+
+def get_utm_epsg_of_geom(in_geom):
+    """
+    Get the EPSG code of the UTM zone of the centroid of a geometry (same UTM zone as used by my_tools.get_area)
+
+    :param in_geom: geometry in geographic coordinates
+    :type in_geom: shapely geometry
+
+    :return: EPSG code of the UTM zone
+    :rtype: str
+    """
+    centroid = in_geom.centroid
+    return my_tools.get_utm_epsg_code(centroid.x, centroid.y)
+
+
+#######################################
 
 
 def compute_continent_id_from_basin_code(in_basin_code):
@@ -1383,61 +1865,54 @@ class PriorLake(object):
             for item in in_obj_lakedb.pld_infos:
                 dict_pld_info[item] = None
             
-            # 1 - Select feature given its identifier
-            if in_obj_lakedb.lakedb_id_type == "String":
-                in_obj_lakedb.lake_layer.SetAttributeFilter("%s like '%s'" % (in_obj_lakedb.lakedb_id_name, str(in_lakeid)))
-            else :
-                in_obj_lakedb.lake_layer.SetAttributeFilter("%s = %s" % (in_obj_lakedb.lakedb_id_name, str(in_lakeid)))
-            pld_lake_feat = in_obj_lakedb.lake_layer.GetNextFeature()
+            # 1 - Retrieve feature given its identifier
+            pld_lake_feat = in_obj_lakedb.get_lake_feature(in_lakeid)
             
             # 2.1 - Retrieve geometry
             self.geom = pld_lake_feat.GetGeometryRef().Clone()
             # 2.2 - Retrieve information when exists
             for item in in_obj_lakedb.pld_infos:
                 dict_pld_info[item] = pld_lake_feat.GetField(item)
-
-            # 3 - Release filter
-            in_obj_lakedb.lake_layer.SetAttributeFilter(None)
             
-            # 4 - Format output
-            # 4.1 - List of names
+            # 3 - Format output
+            # 3.1 - List of names
             self.name = my_tools.get_value(dict_pld_info, in_obj_lakedb.pld_names)
             if (self.name is not None) and (self.name in ["", my_var.FV_STRING_SHP]):
                 self.name = None
-            # 4.2 - GRanD identifier
+            # 3.2 - GRanD identifier
             self.grand = my_tools.get_value(dict_pld_info, in_obj_lakedb.pld_grand)
             if (self.grand is not None) and (self.grand < 0):
                 self.grand = None
-            # 4.3 - Max water surface elevation
+            # 3.3 - Max water surface elevation
             self.max_wse = my_tools.get_value(dict_pld_info, in_obj_lakedb.pld_max_wse)
             if (self.max_wse is not None) and (self.max_wse < 0):
                 self.max_wse = None
-            # 4.4 - Uncertainty over max water surface elevation
+            # 3.4 - Uncertainty over max water surface elevation
             self.max_wse_u = my_tools.get_value(dict_pld_info, in_obj_lakedb.pld_max_wse_u)
             if (self.max_wse_u is not None) and (self.max_wse_u < 0):
                 self.max_wse_u = None
-            # 4.5 - Max area
+            # 3.5 - Max area
             self.max_area = my_tools.get_value(dict_pld_info, in_obj_lakedb.pld_max_area)
             if (self.max_area is not None) and (self.max_area < 0):
                 self.max_area = None
-            # 4.6 - Uncertainty over max area
+            # 3.6 - Uncertainty over max area
             self.max_area_u = my_tools.get_value(dict_pld_info, in_obj_lakedb.pld_max_area_u)
             if (self.max_area_u is not None) and (self.max_area_u < 0):
                 self.max_area_u = None
-            # 4.7 - Reference date
+            # 3.7 - Reference date
             self.ref_date = my_tools.get_value(dict_pld_info, in_obj_lakedb.pld_ref_date)
             if (self.ref_date is not None) and (self.ref_date in ["", my_var.FV_STRING_SHP]):
                 self.ref_date = None
-            # 4.8 - Reference data storage
+            # 3.8 - Reference data storage
             self.ref_ds = my_tools.get_value(dict_pld_info, in_obj_lakedb.pld_ref_ds)
             if (self.ref_ds is not None) and (self.ref_ds < -9e7):
                 self.ref_ds = None
-            # 4.9 - Absolute water storage
+            # 3.9 - Absolute water storage
             self.storage = my_tools.get_value(dict_pld_info, in_obj_lakedb.pld_storage)
             if (self.storage is not None) and (self.storage < 0):
                 self.storage = None
         
-        # 5 - Set flag to compute storage change if reference data are available
+        # 4 - Set flag to compute storage change if reference data are available
         self.ok_to_compute_stocc = False
         if (self.max_wse is not None) and (self.max_area is not None):
             self.ok_to_compute_stocc = True
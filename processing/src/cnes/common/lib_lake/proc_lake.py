@@ -28,9 +28,12 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
+import multiprocessing as mp
 import numpy as np
 import os
 from osgeo import ogr
+import shapely.wkb
+from shapely.ops import unary_union
 
 import cnes.common.service_config_file as service_config_file
 import cnes.common.service_error as service_error
@@ -76,6 +79,7 @@ class LakeProduct(object):
             - content_obs / LakeSPShpProduct: container of the lake "obs" product
             - content_prior / LakeSPShpProduct: container of the lake "prior" product
             - lakeid_uniq / set: list of uniq prior identifiers linked to all observed objects
+            - selected_obs_fid / list: FID of the features of the _Obs layer currently selected (i.e. linked to current PLD lake)
             - compare_stats / dict: store parameters for global comparison between _Obs and _Prior lake products
             - compare_stats_param / list: list of parameters to compare between _Obs and _Prior lake products
         """
@@ -108,6 +112,7 @@ class LakeProduct(object):
         
         # 3 - Other variables
         self.lakeid_uniq = set()  # List of uniq prior identifiers linked to all observed objects
+        self.selected_obs_fid = []  # FID of the _Obs features currently selected (see select_obs_features)
         # Dictionnary to store parameters for global comparison between _Obs and _Prior lake products
         self.compare_stats = {}
         self.compare_stats_params = ["area_total", "area_detct"]
@@ -175,13 +180,15 @@ class LakeProduct(object):
         # Init variables
         cpt_too_small = 0  # Counter of too small objects
         cpt_obj = 1  # Counter of processed objects
+        list_obs_to_add = []  # Observed features to add, as (obs_number, indices, classif, lon, lat), in processing order
+        list_hull_inputs = []  # Inputs of the boundary computation of each of these features, in the same order
         
         for indl, label in enumerate(in_list_labels):  # Loop on inside tile objects
 
             # ======================================================
             # 1 - Get pixels indices for associated to current label
             # ======================================================
-            pix_index = np.where(self.obj_pixc.labels == label)[0]
+            pix_index = self.obj_pixc.label_index.get_index(label)
             obj_nb_pix = pix_index.size
             if obj_nb_pix == 0:
                 logger.warning("[STRANGE...] label %s corresponds to 0 pixel..." % label)
@@ -256,14 +263,11 @@ class LakeProduct(object):
                     valid_lon = imp_lon[not_nan_index]
                     valid_lat = imp_lat[not_nan_index]
                     
-                # 5.3 - Add observed feature
-                obs_id, pixcvec_lakeid = self.add_obs_feature(obs_number, valid_pix_index, valid_classif, valid_lon, valid_lat)
-                
-                # 5.4 - Update PIXCVec obs_id and lake_id attributes
-                if obs_id is not None:
-                    self.update_pixcvec_with_ids(valid_pix_index, obs_id, pixcvec_lakeid)
+                # 5.3 - Store observed feature; its boundary is computed afterwards, with those of the other features
+                list_obs_to_add.append((obs_number, valid_pix_index, valid_classif, valid_lon, valid_lat))
+                list_hull_inputs.append(self.get_hull_inputs(valid_pix_index, valid_lon, valid_lat))
 
-                # 5.5 - Increase counter of processed objects
+                # 5.4 - Increase counter of processed objects
                 cpt_obj += 1
 
             else:
@@ -272,6 +276,19 @@ class LakeProduct(object):
                 cpt_too_small += 1  # Increase counter of too small objects
 
         logger.info("> %d objects not processed because too small" % cpt_too_small)
+        
+        # 5.5 - Compute boundaries of all observed features (independent from each other)
+        list_obs_geom = self.compute_obs_boundaries(list_hull_inputs)
+        
+        for (obs_number, valid_pix_index, valid_classif, valid_lon, valid_lat), obs_geom in zip(list_obs_to_add, list_obs_geom):
+            
+            # 5.6 - Add observed feature
+            obs_id, pixcvec_lakeid = self.add_obs_feature(obs_number, valid_pix_index, valid_classif, valid_lon, valid_lat,
+                                                          in_geom=obs_geom)
+            
+            # 5.7 - Update PIXCVec obs_id and lake_id attributes
+            if obs_id is not None:
+                self.update_pixcvec_with_ids(valid_pix_index, obs_id, pixcvec_lakeid)
 
         ##################################################################
         # Compute _p attributes and storage change for observed features #
@@ -291,6 +308,16 @@ class LakeProduct(object):
             logger.info("")
 
             logger.info("%d PLD lakes linked to observed lakes" % nb_prior)
+            
+            # Index PIXC of each PLD lake
+            # NB: use of selected_index to convert PIXCVec indices to PIXC indices reference
+            if self.product_type == "SP":
+                lakeid_index = my_tools.LabelIndex(self.obj_pixcvec.lake_id)
+            else:
+                lakeid_index = my_tools.LabelIndex(self.obj_pixcvec.lake_id[self.obj_pixc.selected_index])
+            
+            # Index _Obs features by PLD lake
+            dict_obs_fid_main, dict_obs_fid_all = self.index_obs_features_by_lakeid()
 
             for cur_lakeid in self.lakeid_uniq:
                 logger.info("===== Deal with PLD lake %s =====" %cur_lakeid)
@@ -309,18 +336,16 @@ class LakeProduct(object):
                 
                 # 6.2 - Update p_ attributes of observed features strongly connected to this PLD lake
                 # 6.2.1 - Select them
-                self.content_obs.layer.SetAttributeFilter("lake_id LIKE '{}%'".format(cur_lakeid))
-                nb_obslake = self.content_obs.layer.GetFeatureCount()
+                self.select_obs_features(dict_obs_fid_main.get(cur_lakeid))
+                nb_obslake = len(self.selected_obs_fid)
                 logger.debug("{} observed lake(s) are strongly connected to this PLD lake".format(nb_obslake))
                 # 6.2.2 - Set p_ attributes from PLD infos to all observed lakes having this PLD lake as main overlap
                 if nb_obslake > 0:
                     self.set_pld_attributes(pld_attributes)
-                # 6.2.3 - Reinit layer attribute filter
-                self.content_obs.layer.SetAttributeFilter(None)
                 
                 # 6.3 - Select all observed lakes overlapping the PLD lake
-                self.content_obs.layer.SetAttributeFilter("lake_id LIKE '%{}%'".format(cur_lakeid))
-                nb_obslake = self.content_obs.layer.GetFeatureCount()
+                self.select_obs_features(dict_obs_fid_all.get(cur_lakeid))
+                nb_obslake = len(self.selected_obs_fid)
                 logger.debug("{} observed lake(s) are connected to this PLD lake".format(nb_obslake))
                 
                 if nb_obslake == 0:
@@ -332,11 +357,7 @@ class LakeProduct(object):
                 else:
         
                     # 6.4 - Retrieve PIXCVec indices corresponding to prior feature
-                    # NB: use of selected_index to convert PIXCVec indices to PIXC indices reference
-                    if self.product_type == "SP":
-                        pixc_index = np.where(self.obj_pixcvec.lake_id == obj_plake.lake_id.encode())[0]
-                    else:
-                        pixc_index = np.where(self.obj_pixcvec.lake_id[self.obj_pixc.selected_index] == obj_plake.lake_id.encode())[0]
+                    pixc_index = lakeid_index.get_index(obj_plake.lake_id.encode())
                 
                     # 6.5 - Compute observed geometry and common attributes of PLD feature
                     prior_geom, prior_attributes = self.form_prior_feature(obj_plake, pixc_index)
@@ -358,8 +379,8 @@ class LakeProduct(object):
                         # 6.7 - Add prior feature to _Prior layer
                         self.content_prior.add_feature(prior_geom, {**prior_attributes, **pld_attributes})
                 
-                # 6.8 - Reinit layer attribute filter
-                self.content_obs.layer.SetAttributeFilter(None)
+                # 6.8 - Reinit selection of obs features
+                self.select_obs_features(None)
                 
         # 6.8 - Deal with PLD lakes which should have been observed by SWOT
         if self.product_type == "TILE":
@@ -472,7 +493,7 @@ class LakeProduct(object):
     # geometry + attributes) computation
     # ----------------------------------------
     
-    def add_obs_feature(self, in_number, in_indices, in_classif, in_lon, in_lat):
+    def add_obs_feature(self, in_number, in_indices, in_classif, in_lon, in_lat, in_geom=None):
         """
         Process valid PIXC related to current feature
         to build the observed feature boundary and associated attributes
@@ -488,6 +509,8 @@ class LakeProduct(object):
         :type in_lon: 1D-array of float
         :param in_lat: improved latitudes vector for PIXC of the feature
         :type in_lat: 1D-array of float
+        :param in_geom: boundary of the feature, if already computed (=None to compute it here)
+        :type in_geom: OGRPolygon
         
         :return: out_obs_id = obs_id identifier of the feature
         :rtype: out_obs_id = string
@@ -496,7 +519,10 @@ class LakeProduct(object):
         logger.debug("Deal with object number = {}".format(in_number))
         
         # 1 - Build feature boundary
-        feature_geom = self.build_obs_boundary(in_indices, in_lon, in_lat)
+        if in_geom is None:
+            feature_geom = self.build_obs_boundary(in_indices, in_lon, in_lat)
+        else:
+            feature_geom = in_geom
         
         # 2 - Compute common attributes
         feature_attributes = self.compute_common_attributes(feature_geom, in_indices, in_classif_dict=in_classif)
@@ -545,22 +571,65 @@ class LakeProduct(object):
         :return: out_geom = boundary of the feature
         :rtype: out_geom = OGRPolygon
         """
+        return my_hull.compute_lake_boundaries(*self.get_hull_inputs(in_indices, in_lon, in_lat))
+    
+    def get_hull_inputs(self, in_indices, in_lon, in_lat):
+        """
+        Gather the inputs of my_hull.compute_lake_boundaries for the PIXC defined by the input coordinates
         
+        :param in_indices: list of indices of the PIXC related to the feature
+        :type in_indices: 1D-array of int
+        :param in_lon: improved longitudes vector for PIXC of the feature
+        :type in_lon: 1D-array of float
+        :param in_lat: improved latitudes vector for PIXC of the feature
+        :type in_lat: 1D-array of float
+        
+        :return: longitudes, latitudes, range indices, azimuth indices, number of pixels in range
+        :rtype: tuple
+        """
         if self.product_type == 'SP':
-            out_geom = my_hull.compute_lake_boundaries(in_lon,
-                                                       in_lat,
-                                                       self.obj_pixc.get_range_of_lake(in_indices),
-                                                       self.obj_pixc.get_azimuth_of_lake(in_indices),
-                                                       self.obj_pixc.nb_pix_range)
+            out_range = self.obj_pixc.get_range_of_lake(in_indices)
+            out_azimuth = self.obj_pixc.get_azimuth_of_lake(in_indices)
+        else:
+            out_range = self.obj_pixc.range_index[in_indices]
+            out_azimuth = self.obj_pixc.azimuth_index[in_indices]
+            
+        return in_lon, in_lat, out_range, out_azimuth, self.obj_pixc.nb_pix_range
+    
+    def compute_obs_boundaries(self, in_list_hull_inputs):
+        """
+        Compute the boundaries of several observed features
+        They are computed in a pool of NB_PROC_HULL processes if this parameter is > 1,
+        the largest features first; geometries are sent back as WKB
+        
+        :param in_list_hull_inputs: inputs of the boundary computation of each feature (see get_hull_inputs)
+        :type in_list_hull_inputs: list of tuple
+        
+        :return: boundary of each feature, in the same order as the input list
+        :rtype: list of OGRPolygon
+        """
+        logger = logging.getLogger(self.__class__.__name__)
+        
+        nb_proc = min(self.cfg.getint("CONFIG_PARAMS", "NB_PROC_HULL", fallback=1), len(in_list_hull_inputs))
+        if (nb_proc > 1) and mp.current_process().daemon:
+            logger.debug("Already in a worker of a multiprocessing pool => boundaries computed sequentially")
+            nb_proc = 1
+        
+        if nb_proc <= 1:
+            retour = [my_hull.compute_lake_boundaries(*hull_inputs) for hull_inputs in in_list_hull_inputs]
             
         else:
-            out_geom = my_hull.compute_lake_boundaries(in_lon,
-                                                       in_lat,
-                                                       self.obj_pixc.range_index[in_indices],
-                                                       self.obj_pixc.azimuth_index[in_indices],
-                                                       self.obj_pixc.nb_pix_range)
+            logger.info("Compute boundaries of %d observed features with %d processes" % (len(in_list_hull_inputs), nb_proc))
+            # Largest features first, to balance the load between processes
+            list_order = sorted(range(len(in_list_hull_inputs)), key=lambda ind: -in_list_hull_inputs[ind][0].size)
+            # Inputs are inherited by the forked workers, only their index is sent to them
+            with mp.get_context("fork").Pool(nb_proc, initializer=init_hull_worker, initargs=(in_list_hull_inputs,)) as pool:
+                list_wkb = pool.map(compute_lake_boundaries_wkb, list_order, chunksize=1)
+            retour = [None] * len(in_list_hull_inputs)
+            for ind, geom_wkb in zip(list_order, list_wkb):
+                retour[ind] = ogr.CreateGeometryFromWkb(geom_wkb)
             
-        return out_geom
+        return retour
     
     def form_prior_feature(self, in_obj_plake, in_pixc_index):
         """
@@ -628,12 +697,24 @@ class LakeProduct(object):
         out_list_obs_id = []
         out_list_overlap = []
         
+        # PLD lake geometry and area in the UTM zone of its centroid, shared by all overlap computations
+        lake_index = self.obj_lake_db.get_lake_index()
+        pld_idx = lake_index.dict_id_idx.get(str(in_obj_plake.lake_id))
+        if pld_idx is None:
+            pld_geom = shapely.wkb.loads(bytes(in_obj_plake.geom.ExportToWkb()))
+            utm_epsg = lake_db.get_utm_epsg_of_geom(pld_geom)
+            pld_geom_utm = lake_index.project(pld_geom, utm_epsg)
+        else:
+            utm_epsg = lake_index.get_utm_epsg(pld_idx)
+            pld_geom_utm = lake_index.get_geom_utm(pld_idx, utm_epsg)
+        area_pld = pld_geom_utm.area
+        
         # Case with 1 obs <-> 1 or N PLD lake(s)
-        nb_obs_inter = self.content_obs.layer.GetFeatureCount()
+        nb_obs_inter = len(self.selected_obs_fid)
         if nb_obs_inter == 1:
             
             # Retrieve associated obs feature
-            cur_feature = self.content_obs.layer.GetNextFeature()
+            cur_feature = self.content_obs.layer.GetFeature(self.selected_obs_fid[0])
             cur_geom = cur_feature.GetGeometryRef()
             out_list_obs_id.append(cur_feature.GetField("obs_id"))
             logger.debug("obs_id = %s / lake_id = %s" % (out_list_obs_id[0], cur_feature.GetField("lake_id")))
@@ -661,21 +742,18 @@ class LakeProduct(object):
                     tmp_geom = cur_geom.Intersection(influence_area_poly)
         
             # Compute overlaping area
-            area_pld = my_tools.get_area(in_obj_plake.geom)
-            geom_inter = tmp_geom.Intersection(in_obj_plake.geom)
-            if geom_inter is not None:
-                area_inter = my_tools.get_area(geom_inter)
-                out_list_overlap.append(str(round(area_inter/area_pld*100.)))
-                logger.debug("PLD lake area = {} m2 - PLD/obs intersection area = {} m2 - overlap = {}%".format(area_pld, area_inter, \
-                             out_list_overlap[0]))
+            area_inter = self.compute_area_inter(tmp_geom, pld_geom_utm, lake_index, utm_epsg)
+            out_list_overlap.append(str(round(area_inter/area_pld*100.)))
+            logger.debug("PLD lake area = {} m2 - PLD/obs intersection area = {} m2 - overlap = {}%".format(area_pld, area_inter, \
+                         out_list_overlap[0]))
         
         # Case with N obs <-> 1 PLD lake
         else:
             
             logger.debug("%d obs features correspond to PLD lake" % nb_obs_inter)
             
-            # Init output geometry
-            tmp_geom = ogr.Geometry(ogr.wkbMultiPolygon)
+            # Init list of obs pieces forming output geometry
+            list_obs_poly = []
             
             # Get the influence area polygon
             influence_area_poly = self.obj_lake_db.get_influence_area_poly(in_obj_plake.lake_id)
@@ -683,7 +761,7 @@ class LakeProduct(object):
             tmp_list_obs_id = []
             tmp_list_overlap = []
             
-            for cur_feature in self.content_obs.layer:
+            for cur_feature in self.get_selected_obs_features():
                 
                 cur_geom = cur_feature.GetGeometryRef()
                 
@@ -713,19 +791,22 @@ class LakeProduct(object):
                         obs_poly = cur_geom.Intersection(influence_area_poly)
                 
                 # Compute overlaping area
-                area_pld = my_tools.get_area(in_obj_plake.geom)
-                geom_inter = obs_poly.Intersection(in_obj_plake.geom)
-                if geom_inter is not None:
-                    area_inter = my_tools.get_area(geom_inter)
-                    tmp_overlap = str(round(area_inter/area_pld*100.))
-                    tmp_list_overlap.append(tmp_overlap)
-                    logger.debug("PLD lake area = {} m2 - PLD/obs intersection area = {} m2 - overlap = {}%".format(area_pld, area_inter, \
-                                 tmp_overlap))
-                else :
+                obs_poly = shapely.wkb.loads(bytes(obs_poly.ExportToWkb()))
+                if not obs_poly.is_valid:
+                    obs_poly = obs_poly.buffer(0)
+                area_inter = self.compute_area_inter(obs_poly, pld_geom_utm, lake_index, utm_epsg)
+                tmp_overlap = str(round(area_inter/area_pld*100.))
+                tmp_list_overlap.append(tmp_overlap)
+                logger.debug("PLD lake area = {} m2 - PLD/obs intersection area = {} m2 - overlap = {}%".format(area_pld, area_inter, \
+                             tmp_overlap))
+                if area_inter == 0:
                     logger.warning("PLD lakeid %s geometrie do not intersects observed geometry %s " %(str(in_obj_plake.lake_id), \
                                                                                                        str(tmp_list_obs_id)))
-                # Add current geometry to output geometry
-                tmp_geom = tmp_geom.Union(obs_poly)
+                # Add current geometry to the list of obs pieces
+                list_obs_poly.append(obs_poly)
+                
+            # Build output geometry with a single union of all obs pieces
+            tmp_geom = ogr.CreateGeometryFromWkb(unary_union(list_obs_poly).wkb)
 
             # Sort obs_id and overlap fractions by decreasing area intersection
             sorted_idx = sorted(range(len(tmp_list_overlap)), key=lambda k: tmp_list_overlap[k], reverse=True)
@@ -736,6 +817,35 @@ class LakeProduct(object):
             out_geom = tmp_geom.Clone()
         
         return out_geom, out_list_obs_id, out_list_overlap
+    
+    def compute_area_inter(self, in_obs_geom, in_pld_geom_utm, in_lake_index, in_utm_epsg):
+        """
+        Compute the area of the intersection between an observed geometry and a PLD lake geometry,
+        in the UTM zone of the PLD lake
+        
+        :param in_obs_geom: observed geometry, in geographic coordinates
+        :type in_obs_geom: OGRPolygon or shapely geometry
+        :param in_pld_geom_utm: PLD lake geometry, projected in in_utm_epsg
+        :type in_pld_geom_utm: shapely geometry
+        :param in_lake_index: spatial index over PLD lakes
+        :type in_lake_index: lake_db.LayerSpatialIndex
+        :param in_utm_epsg: EPSG code of the UTM zone of the PLD lake
+        :type in_utm_epsg: str
+        
+        :return: out_area_inter = area of the intersection (in m2)
+        :rtype: out_area_inter = float
+        """
+        
+        # 1 - Convert observed geometry to shapely if needed
+        if isinstance(in_obs_geom, ogr.Geometry):
+            in_obs_geom = shapely.wkb.loads(bytes(in_obs_geom.ExportToWkb()))
+        if not in_obs_geom.is_valid:
+            in_obs_geom = in_obs_geom.buffer(0)
+            
+        # 2 - Compute area in the UTM zone of the PLD lake
+        out_area_inter = in_lake_index.project(in_obs_geom, in_utm_epsg).intersection(in_pld_geom_utm).area
+        
+        return out_area_inter
                 
     def compute_common_attributes(self, in_geom, in_pixc_index, in_classif_dict=None):
         """
@@ -908,6 +1018,51 @@ class LakeProduct(object):
             
         return out_lake_id, out_overlap, out_pixcvec_lakeid
     
+    def index_obs_features_by_lakeid(self):
+        """
+        Index features of the _Obs layer by the identifiers of the PLD lakes they are linked to
+        
+        :return: out_dict_fid_main = FID of obs features having the PLD lake as main overlap (=1st of lake_id list); key = lake_id
+        :rtype: out_dict_fid_main = dict
+        :return: out_dict_fid_all = FID of obs features overlapping the PLD lake (=anywhere in lake_id list); key = lake_id
+        :rtype: out_dict_fid_all = dict
+        """
+        out_dict_fid_main = {}
+        out_dict_fid_all = {}
+        
+        self.content_obs.layer.SetAttributeFilter("lake_id != 'no_data'")
+        for obs_lake in self.content_obs.layer:
+            list_lakeid = obs_lake.GetField("lake_id").split(";")
+            out_dict_fid_main.setdefault(list_lakeid[0], []).append(obs_lake.GetFID())
+            for cur_lakeid in set(list_lakeid):
+                out_dict_fid_all.setdefault(cur_lakeid, []).append(obs_lake.GetFID())
+        self.content_obs.layer.SetAttributeFilter(None)
+        
+        return out_dict_fid_main, out_dict_fid_all
+    
+    def select_obs_features(self, in_list_fid):
+        """
+        Select features of the _Obs layer given their FID
+        The selected features are then retrieved by FID with get_selected_obs_features, without scanning the layer
+        
+        :param in_list_fid: FID of the obs features to select (=None or empty to select none)
+        :type in_list_fid: list of int
+        """
+        if in_list_fid:
+            self.selected_obs_fid = list(in_list_fid)
+        else:
+            self.selected_obs_fid = []
+    
+    def get_selected_obs_features(self):
+        """
+        Iterate over the features of the _Obs layer selected with select_obs_features, in the order of their FID list
+        
+        :return: selected obs features
+        :rtype: generator of OGRFeature
+        """
+        for fid in self.selected_obs_fid:
+            yield self.content_obs.layer.GetFeature(fid)
+    
     def set_pld_attributes(self, in_pld_infos):
         """
         Set p_ attributes of all obs features linked to current PLD lake (i.e. currently selected in the _Obs layer)
@@ -919,7 +1074,7 @@ class LakeProduct(object):
         logger = logging.getLogger(self.__class__.__name__)
         logger.debug("- start -")
         
-        for obs_lake in self.content_obs.layer:
+        for obs_lake in self.get_selected_obs_features():
             # Set needed attributes related to PLD lake
             for key in my_var.PLD_FIELD_TO_KEEP_IN_OBS:
                 obs_lake.SetField(str(key), in_pld_infos[str(key)])
@@ -1065,7 +1220,7 @@ class LakeProduct(object):
         out_storage_values["ds1_q_u"] = my_var.FV_REAL
         
         # Nb of observed lakes related to in_obj_plake
-        nb_obs_lake = self.content_obs.layer.GetFeatureCount()
+        nb_obs_lake = len(self.selected_obs_fid)
         logger.debug("Case PLD lake -> %d obs lakes" % nb_obs_lake)
         
         # 1 - Build dictionary going in input of storage change function
@@ -1079,7 +1234,7 @@ class LakeProduct(object):
             prior_overlap[obs_id] = overlap / sum_tmp_prior_overlap
             
         list_obs = dict()
-        for obs_lake in self.content_obs.layer:
+        for obs_lake in self.get_selected_obs_features():
 
             # 1.1 - Retrieve lake feature ID and init dedicated dict
             obs_id = obs_lake.GetField(str("obs_id"))
@@ -1146,15 +1301,12 @@ class LakeProduct(object):
                                                                                                                key2, list_obs[obs_id][key2]))
                         list_obs[obs_id][key] = list_obs[obs_id][key2]
             
-        # Reset reading
-        self.content_obs.layer.ResetReading()
-            
         # 2 - Compute storage change for PLD lake
         out_storage_values["ds1_l"], out_storage_values["ds1_l_u"], out_storage_values["ds1_q"], out_storage_values["ds1_q_u"] = \
             in_obj_plake.run_stocc(list_obs)
                 
         # 3 - Compute storage change for observed features and set values
-        for obs_lake in self.content_obs.layer:
+        for obs_lake in self.get_selected_obs_features():
             
             # 3.1 - Retrieve lake feature ID and init dedicated dict
             obs_id = obs_lake.GetField(str("obs_id"))
@@ -1179,9 +1331,6 @@ class LakeProduct(object):
             
             # 3.3 - Rewrite feature with storage change values
             self.content_obs.layer.SetFeature(obs_lake)
-            
-        # Reset reading
-        self.content_obs.layer.ResetReading()
         
         return out_storage_values
     
@@ -1341,7 +1490,52 @@ class LakeProduct(object):
         
         # 4 - Remove filter over memory layer
         self.content_obs.layer.SetAttributeFilter(None)
-    
+
+    # ----------------------------------------
+    # Functions dedicated to processing in a worker process
+    # ----------------------------------------
+
+    def export_content(self):
+        """
+        Export the content of the lake product, so that it can be sent back from a worker process
+        Memory layers can not be pickled: their features are exported as (geometry as WKB, field values)
+
+        :return: features of the obs and prior layers, uniq prior identifiers and comparison stats
+        :rtype: dict
+        """
+        retour = {}
+        retour["lakeid_uniq"] = self.lakeid_uniq
+        retour["compare_stats"] = self.compare_stats
+        for key, cur_content in [("obs", self.content_obs), ("prior", self.content_prior)]:
+            retour[key] = []
+            for cur_feature in cur_content.layer:
+                cur_geom = cur_feature.GetGeometryRef()
+                retour[key].append((None if cur_geom is None else cur_geom.ExportToWkb(), cur_feature.items()))
+            cur_content.layer.ResetReading()
+        return retour
+
+    def import_content(self, in_content):
+        """
+        Import the content of the lake product exported by export_content in a worker process
+        Features are added to the obs and prior layers, in the same order
+
+        :param in_content: content exported by export_content
+        :type in_content: dict
+        """
+        self.lakeid_uniq = in_content["lakeid_uniq"]
+        self.compare_stats = in_content["compare_stats"]
+        for key, cur_content in [("obs", self.content_obs), ("prior", self.content_prior)]:
+            layer_defn = cur_content.layer.GetLayerDefn()
+            for geom_wkb, dict_fields in in_content[key]:
+                cur_feature = ogr.Feature(layer_defn)
+                if geom_wkb is not None:
+                    cur_feature.SetGeometry(ogr.CreateGeometryFromWkb(geom_wkb))
+                for name, value in dict_fields.items():
+                    if value is not None:
+                        cur_feature.SetField(str(name), value)
+                cur_content.layer.CreateFeature(cur_feature)
+                cur_feature = None
+
 
 #######################################
 
@@ -1583,52 +1777,21 @@ class LakeSPProduct(object):
         logger = logging.getLogger(self.__class__.__name__)
         logger.info("- start -")
         
-        # 1 - Select water features for each swath
-        self.swath_r.content_obs.layer.SetAttributeFilter("lake_id != 'no_data'")
-        self.swath_l.content_obs.layer.SetAttributeFilter("lake_id != 'no_data'")
-        
-        # 2 - Merge right and left swath SP layers into 1 single layer
-        data_source_sp1, layer_sp = my_shp.merge_2_layers(self.swath_r.content_obs.layer, 
-                                                          self.swath_l.content_obs.layer, 
-                                                          in_continent_id=self.continent_id)
-        
-        # 3 - Merge obtained layer with LakeTile_Obs shapefiles
-        data_source_sp2, layer_sp = my_shp.merge_mem_layer_with_shp(in_list_laketile_obs_files, 
-                                                                    layer_sp, 
-                                                                    in_continent_id=self.continent_id)
-        
-        # 4 - Write the obtained layer in the output shapefile
-        my_shp.write_mem_layer_as_shp(layer_sp, in_filename)
-        
-        # 5 - Estimate time_coverage_start and time_coverage_end
-        layer_sp.ResetReading()
-        time_utc_values = []
-        for feature in layer_sp:
-            time_utc_feat = feature.GetField("time")
-            if time_utc_feat > 0.0:
-                time_utc_values.append(time_utc_feat)
-        layer_sp.ResetReading()
-        time_str_dict = dict()
-        if len(time_utc_values) > 0:
-            time_str_dict["time_coverage_start"] = my_tools.convert_utc_to_str(min(time_utc_values), in_format=2)
-            time_str_dict["time_coverage_end"] = my_tools.convert_utc_to_str(max(time_utc_values), in_format=2)
-        else:
-            time_str_dict["time_coverage_start"] = "None"
-            time_str_dict["time_coverage_end"] = "None"
-        
-        # 6 - Write XML metadatafile for shapefile
+        # 1 - Write water features of each swath related to at least one PLD lake, then LakeTile_Obs features, in the output shapefile
+        #     and estimate time_coverage_start and time_coverage_end at the same time
+        time_min, time_max = my_shp.stream_layers_to_shp([self.swath_r.content_obs.layer, self.swath_l.content_obs.layer],
+                                                         in_list_laketile_obs_files,
+                                                         self.swath_r.content_obs.layer.GetLayerDefn(),
+                                                         in_filename,
+                                                         in_continent_id=self.continent_id,
+                                                         in_layers_filter="lake_id != 'no_data'")
+        time_str_dict = compute_time_coverage(time_min, time_max)
+        
+        # 2 - Write XML metadatafile for shapefile
         logger.debug("Writing associated metadata file = %s.xml" % in_filename)
         self.swath_r.content_obs.update_and_write_metadata("%s.xml" % in_filename, 
                                                            in_inprod_metadata=in_pixc_metadata,
                                                            in_proc_metadata={**in_proc_metadata, **time_str_dict})
-        
-        # 7 - Remove filter over memory layer
-        self.swath_r.content_obs.layer.SetAttributeFilter(None)
-        self.swath_l.content_obs.layer.SetAttributeFilter(None)
-
-        # 8 - Close temporary dataSources
-        data_source_sp1.Destroy()
-        data_source_sp2.Destroy()
     
     def write_prior_file(self, in_filename, in_pixc_metadata, in_proc_metadata, in_list_laketile_prior_files):
         """
@@ -1647,46 +1810,21 @@ class LakeSPProduct(object):
         logger = logging.getLogger(self.__class__.__name__)
         logger.info("- start -")
         
-        # 1 - Merge right and left swath SP layers into 1 single layer
-        data_source_sp1, layer_sp = my_shp.merge_2_layers(self.swath_r.content_prior.layer, 
-                                                          self.swath_l.content_prior.layer, 
-                                                          in_continent_id=self.continent_id,
-                                                          flag_add_nogeom_feat=True)
-        
-        # 2 - Merge obtained layer with LakeTile_Prior shapefiles
-        data_source_sp2, layer_sp = my_shp.merge_mem_layer_with_shp(in_list_laketile_prior_files, 
-                                                                    layer_sp, 
-                                                                    in_continent_id=self.continent_id,
-                                                                    flag_add_nogeom_feat=True)
-        
-        # 3 - Write the obtained layer in the output shapefile
-        my_shp.write_mem_layer_as_shp(layer_sp, in_filename)
-        
-        # 4 - Estimate time_coverage_start and time_coverage_end
-        layer_sp.ResetReading()
-        time_utc_values = []
-        for feature in layer_sp:
-            time_utc_feat = feature.GetField("time")
-            if time_utc_feat > 0.0:
-                time_utc_values.append(time_utc_feat)
-        layer_sp.ResetReading()
-        time_str_dict = dict()
-        if len(time_utc_values) > 0:
-            time_str_dict["time_coverage_start"] = my_tools.convert_utc_to_str(min(time_utc_values), in_format=2)
-            time_str_dict["time_coverage_end"] = my_tools.convert_utc_to_str(max(time_utc_values), in_format=2)
-        else:
-            time_str_dict["time_coverage_start"] = "None"
-            time_str_dict["time_coverage_end"] = "None"
-        
-        # 5 - Write XML metadatafile for shapefile
+        # 1 - Write PLD lakes of each swath, then LakeTile_Prior features, in the output shapefile
+        #     and estimate time_coverage_start and time_coverage_end at the same time
+        time_min, time_max = my_shp.stream_layers_to_shp([self.swath_r.content_prior.layer, self.swath_l.content_prior.layer],
+                                                         in_list_laketile_prior_files,
+                                                         self.swath_r.content_prior.layer.GetLayerDefn(),
+                                                         in_filename,
+                                                         in_continent_id=self.continent_id,
+                                                         flag_add_nogeom_feat=True)
+        time_str_dict = compute_time_coverage(time_min, time_max)
+        
+        # 2 - Write XML metadatafile for shapefile
         logger.debug("Writing associated metadata file = %s.xml" % in_filename)
         self.swath_r.content_prior.update_and_write_metadata("%s.xml" % in_filename,
                                                              in_inprod_metadata=in_pixc_metadata,
                                                              in_proc_metadata={**in_proc_metadata, **time_str_dict})
-
-        # 6 - Close temporary dataSources
-        data_source_sp1.Destroy()
-        data_source_sp2.Destroy()
     
     def write_unknown_file(self, in_filename, in_pixc_metadata, in_proc_metadata, in_list_laketile_unknown_files):
         """
@@ -1704,69 +1842,63 @@ class LakeSPProduct(object):
         logger = logging.getLogger(self.__class__.__name__)
         logger.info("- start -")
         
-        # 1 - Init layer
+        # 1 - Init empty layer, giving the attributes and metadata of the output file
         tmp_content_unknown = shp_file.LakeSPUnassignedProduct(os.path.basename(in_filename))
         
-        # 2 - Select water features for each swath
-        self.swath_r.content_obs.layer.SetAttributeFilter("lake_id = 'no_data'")
-        self.swath_l.content_obs.layer.SetAttributeFilter("lake_id = 'no_data'")
+        # 2 - Write unassigned water features of each swath, then LakeTile_Unassigned features, in the output shapefile
+        #     and estimate time_coverage_start and time_coverage_end at the same time
+        time_min, time_max = my_shp.stream_layers_to_shp([self.swath_r.content_obs.layer, self.swath_l.content_obs.layer],
+                                                         in_list_laketile_unknown_files,
+                                                         tmp_content_unknown.layer.GetLayerDefn(),
+                                                         in_filename,
+                                                         in_continent_id=self.continent_id,
+                                                         in_layers_filter="lake_id = 'no_data'")
+        time_str_dict = compute_time_coverage(time_min, time_max)
         
-        # 3 - Write them in the output shapefile
-        # 3.1 - Right swath
-        for cur_feature in self.swath_r.content_obs.layer:
-            cur_att = {}
-            for att_name in tmp_content_unknown.attribute_metadata.keys():
-                cur_att[att_name] = cur_feature.GetField(str(att_name))
-            tmp_content_unknown.add_feature(cur_feature.GetGeometryRef(), cur_att)
-        # 3.2 - Left swath
-        for cur_feature in self.swath_l.content_obs.layer:
-            cur_att = {}
-            for att_name in tmp_content_unknown.attribute_metadata.keys():
-                cur_att[att_name] = cur_feature.GetField(str(att_name))
-            tmp_content_unknown.add_feature(cur_feature.GetGeometryRef(), cur_att)
-        
-        # 4 - Merge obtained layer with LakeTile_Unassigned shapefiles
-        data_source_sp2, layer_sp = my_shp.merge_mem_layer_with_shp(in_list_laketile_unknown_files, 
-                                                                    tmp_content_unknown.layer, 
-                                                                    in_continent_id=self.continent_id)
-        
-        # 5 - Write the obtained layer in the output shapefile
-        my_shp.write_mem_layer_as_shp(layer_sp, in_filename)
-        
-        # 6 - Estimate time_coverage_start and time_coverage_end
-        layer_sp.ResetReading()
-        time_utc_values = []
-        for feature in layer_sp:
-            time_utc_feat = feature.GetField("time")
-            if time_utc_feat > 0.0:
-                time_utc_values.append(time_utc_feat)
-        layer_sp.ResetReading()
-        time_str_dict = dict()
-        if len(time_utc_values) > 0:
-            time_str_dict["time_coverage_start"] = my_tools.convert_utc_to_str(min(time_utc_values), in_format=2)
-            time_str_dict["time_coverage_end"] = my_tools.convert_utc_to_str(max(time_utc_values), in_format=2)
-        else:
-            time_str_dict["time_coverage_start"] = "None"
-            time_str_dict["time_coverage_end"] = "None"
-        
-        # 7 - Write XML metadatafile for shapefile
+        # 3 - Write XML metadatafile for shapefile
         logger.debug("Writing associated metadata file = %s.xml" % in_filename)
         tmp_content_unknown.update_and_write_metadata("%s.xml" % in_filename, 
                                                       in_inprod_metadata=in_pixc_metadata,
                                                       in_proc_metadata={**in_proc_metadata, **time_str_dict})
         
-        # 8 - Remove filter over memory layer
-        self.swath_r.content_obs.layer.SetAttributeFilter(None)
-        self.swath_l.content_obs.layer.SetAttributeFilter(None)
-        
-        # 9 - Close temporary dataSources
+        # 4 - Close temporary dataSource
         tmp_content_unknown.free()
-        data_source_sp2.Destroy()
     
 
 #######################################
 
 
+# Context of the current worker process of the pool computing boundaries
+# - hull_inputs / list of tuple: inputs of the boundary computation of each feature
+HULL_WORKER_CONTEXT = {}
+
+
+def init_hull_worker(in_list_hull_inputs):
+    """
+    Initialize a worker process of the pool computing boundaries (called once per worker)
+    
+    :param in_list_hull_inputs: inputs of the boundary computation of each feature (see LakeProduct.get_hull_inputs)
+    :type in_list_hull_inputs: list of tuple
+    """
+    HULL_WORKER_CONTEXT["hull_inputs"] = in_list_hull_inputs
+
+
+def compute_lake_boundaries_wkb(in_ind):
+    """
+    Compute the boundary of a feature, within a worker process of the pool computing boundaries
+    
+    :param in_ind: index of the feature in the list of inputs of the worker
+    :type in_ind: int
+    
+    :return: boundary of the feature, as WKB
+    :rtype: bytes
+    """
+    return my_hull.compute_lake_boundaries(*HULL_WORKER_CONTEXT["hull_inputs"][in_ind]).ExportToWkb()
+
+
+#######################################
+
+
 def select_water_dark_pixels(in_classif_dict, in_flag_water=False, in_flag_dark=False):
     """
     Merge vectors of indices of classification dictionary wrt to kind of flags wanted
@@ -1863,3 +1995,28 @@ def value_or_none(in_value):
             out_value = None
             
     return out_value
+
+
+def compute_time_coverage(in_time_min, in_time_max):
+    """
+    Compute time_coverage_start and time_coverage_end metadata from min and max UTC times
+    
+    :param in_time_min: min UTC time (None if no value)
+    :type in_time_min: float
+    :param in_time_max: max UTC time (None if no value)
+    :type in_time_max: float
+    
+    :return: out_time_str_dict = time_coverage_start and time_coverage_end as strings ("None" if no value)
+    :rtype: out_time_str_dict = dict
+    """
+    
+    out_time_str_dict = dict()
+    
+    if (in_time_min is not None) and (in_time_max is not None):
+        out_time_str_dict["time_coverage_start"] = my_tools.convert_utc_to_str(in_time_min, in_format=2)
+        out_time_str_dict["time_coverage_end"] = my_tools.convert_utc_to_str(in_time_max, in_format=2)
+    else:
+        out_time_str_dict["time_coverage_start"] = "None"
+        out_time_str_dict["time_coverage_end"] = "None"
+            
+    return out_time_str_dict
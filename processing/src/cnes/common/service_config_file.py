@@ -33,6 +33,8 @@ THIS = sys.modules[__name__]
 # declaration of path_conf and cfg variables
 THIS.path_conf = None
 THIS.cfg = None
+# content of configuration files already parsed, by path (kept between 2 clear_config, see preload_config)
+THIS.preloaded_content = {}
 
 # method to clear the config
 def clear_config():
@@ -44,6 +46,21 @@ def clear_config():
         THIS.path_conf = None
         THIS.cfg = None
 
+# method to parse a configuration file once for all the next instances of ServiceConfigFile
+def preload_config(path_conf):
+    """
+        This function parses the configuration file and keeps its content,
+        so that the next instances of ServiceConfigFile on the same file don't read it again
+        (typically a parameter file shared by all the tasks of a worker process)
+
+        :param path_conf: string path of the config file
+        :type path_conf: string
+    """
+    parser = RawConfigParser()
+    parser.optionxform = str  # Content is stored as read, options are transformed when loaded in ServiceConfigFile
+    parser.read(path_conf)
+    THIS.preloaded_content[path_conf] = {section: dict(parser.items(section, raw=True)) for section in parser.sections()}
+
 # method to get instance of ServiceConfigFile
 def get_instance():
     """
@@ -70,7 +87,10 @@ class ServiceConfigFile(RawConfigParser):
             THIS.path_conf = path_conf
             # we call the constructor of mother class
             RawConfigParser.__init__(self)
-            if path_conf is not None:
+            if path_conf in THIS.preloaded_content:
+                # we load the configuration file already parsed
+                self.read_dict(THIS.preloaded_content[path_conf])
+            elif path_conf is not None:
                 # we load the configuration file
                 self.read(path_conf)
             # we save instance of class
@@ -26,9 +26,8 @@ from __future__ import print_function
 from __future__ import division
 
 import numpy 
-import scipy.optimize as opt
-import pyproj as pyproj
 import logging
+from cnes.common.lib.my_tools import get_pyproj_transform
 from cnes.common.lib.my_variables import GEN_RAD_EARTH_EQ, GEN_RAD_EARTH_POLE
 
 
@@ -120,9 +119,9 @@ def project_array(coordinates, srcp='geocent', dstp='latlon'):
     :rtype: float
 
     """
-    input_proj = pyproj.Proj(proj=srcp, datum='WGS84')
-    output_proj = pyproj.Proj(proj=dstp, datum='WGS84')
-    fx, fy, fz = pyproj.transform(input_proj, output_proj, coordinates[:, 0], coordinates[:, 1], coordinates[:, 2])
+    # Transformation is built once per (srcp, dstp) pair and cached
+    proj_transform = get_pyproj_transform("+proj=%s +datum=WGS84" % srcp, "+proj=%s +datum=WGS84" % dstp)
+    fx, fy, fz = proj_transform(coordinates[:, 0], coordinates[:, 1], coordinates[:, 2])
     # Re-create (n,3) coordinates
     # Inversion of lat and lon !
     return numpy.dstack([fy, fx, fz])[0]
@@ -254,6 +253,163 @@ def herror2ofx(x, dmu_max, mu_0, s, w_hat, u_hat, v_hat, r_eq, delta, h_target):
     return h_error_square_mu
 
 
+def h_of_mu_vect(mu, s, r_eq, delta, u_hat, v_hat, w_hat):
+    """
+    Compute the p points, and the heights associated (vectorized version of h_of_mu)
+    Return the heights of computed points and these points
+
+    :param mu: mu angles of analytic problem
+    :type mu: numpy 1D-array of float;size (nb_points)
+    :param s: position of the sensor in cartesian coordinates
+    :type s: numpy 2D-array of float; size (3=x/y/z, nb_points)
+    :param r_eq: range of problem
+    :type r_eq: numpy 1D-array of float;size (nb_points)
+    :param delta: correction factor of v in (u,v,w)basis problem
+    :type delta: numpy 1D-array of float;size (nb_points)
+    :param u_hat: u basis vector of (u,v,w)basis problem
+    :type u_hat: numpy 2D-array of float; size (3=x/y/z, nb_points)
+    :param v_hat: v basis vector of (u,v,w)basis problem
+    :type u_hat: numpy 2D-array of float; size (3=x/y/z, nb_points)
+    :param w_hat: w basis vector of (u,v,w)basis problem
+    :type u_hat: numpy 2D-array of float; size (3=x/y/z, nb_points)
+    :return: heights of p points, p points
+    :rtype:  numpy 1D-array of float;size (nb_points); numpy 2D-array of float;size (3=x/y/z, nb_points)
+    """
+    p_mu = p_of_mu_vect(mu, s, r_eq, delta, u_hat, v_hat, w_hat)[0]
+    h_mu = height_fast(p_mu.T)
+    return h_mu, p_mu
+
+
+def minimize_herror2_vect(dmu_max, mu_0, s, w_hat, u_hat, v_hat, r_eq, delta, h_target, xatol, max_nfev=500):
+    """
+    Minimize the cost function herror2ofx over x in [-1, 1] for all points at once
+    This is a vectorized version of the Brent's bounded method of scipy.optimize.minimize_scalar(method='bounded'),
+    i.e. golden section search with parabolic interpolation steps, applied independently to each point
+    Return the x solution of each point and the maximum number of cost function evaluations
+
+    :param dmu_max: mu derivative
+    :type dmu_max: numpy 1D-array of float;size (nb_points)
+    :param mu_0: initial guess for mu angle
+    :type mu_0: numpy 1D-array of float;size (nb_points)
+    :param s: position of the sensor in cartesian coordinates
+    :type s: numpy 2D-array of float; size (3=x/y/z, nb_points)
+    :param w_hat: w basis vector of (u,v,w)basis problem
+    :type w_hat: numpy 2D-array of float; size (3=x/y/z, nb_points)
+    :param u_hat: u basis vector of (u,v,w)basis problem
+    :type u_hat: numpy 2D-array of float; size (3=x/y/z, nb_points)
+    :param v_hat: v basis vector of (u,v,w)basis problem
+    :type v_hat: numpy 2D-array of float; size (3=x/y/z, nb_points)
+    :param r_eq: range of problem
+    :type r_eq: numpy 1D-array of float;size (nb_points)
+    :param delta: correction factor of v in (u,v,w)basis problem
+    :type delta: numpy 1D-array of float;size (nb_points)
+    :param h_target: height targeted to re-geolocate pixel without noise
+    :type h_target: numpy 1D-array of float;size (nb_points)
+    :param xatol: absolute tolerance on x for each point
+    :type xatol: numpy 1D-array of float;size (nb_points)
+    :param max_nfev: maximum number of cost function evaluations for each point
+    :type max_nfev: integer
+
+    :return: x solution, number of cost function evaluations
+    :rtype: numpy 1D-array of float;size (nb_points); integer
+    """
+
+    def cost(x, ind):
+        # vectorized herror2ofx for points ind
+        mu = mu_0[ind] + x * dmu_max[ind]
+        h_mu = h_of_mu_vect(mu, s[ind], r_eq[ind], delta[ind], u_hat[ind], v_hat[ind], w_hat[ind])[0]
+        return (h_mu - h_target[ind]) ** 2
+
+    sqrt_eps = numpy.sqrt(2.2e-16)
+    golden_mean = 0.5 * (3.0 - numpy.sqrt(5.0))
+    nb_points = mu_0.size
+
+    # 1 - init: bracket [a, b] = [-1, 1], xf = best point, nfc = second best point, fulc = previous value of nfc
+    a = -numpy.ones(nb_points)
+    b = numpy.ones(nb_points)
+    xf = a + golden_mean * (b - a)
+    nfc = numpy.copy(xf)
+    fulc = numpy.copy(xf)
+    fx = cost(xf, numpy.arange(nb_points))
+    fnfc = numpy.copy(fx)
+    ffulc = numpy.copy(fx)
+    rat = numpy.zeros(nb_points)
+    e = numpy.zeros(nb_points)
+    nfev = 1
+
+    xm = 0.5 * (a + b)
+    tol1 = sqrt_eps * numpy.abs(xf) + xatol / 3.0
+    tol2 = 2.0 * tol1
+    ind = numpy.where(numpy.abs(xf - xm) > (tol2 - 0.5 * (b - a)))[0]
+
+    # 2 - iterate on points not converged
+    while (ind.size > 0) and (nfev < max_nfev):
+        a_i, b_i, xf_i, fx_i = a[ind], b[ind], xf[ind], fx[ind]
+        nfc_i, fnfc_i, fulc_i, ffulc_i = nfc[ind], fnfc[ind], fulc[ind], ffulc[ind]
+        xm_i, tol1_i, tol2_i = xm[ind], tol1[ind], tol2[ind]
+        e_i, rat_i = e[ind], rat[ind]
+
+        # 2.1 - parabolic fit where the previous step is large enough
+        flag_golden = numpy.ones(ind.size, dtype=bool)
+        flag_para = numpy.abs(e_i) > tol1_i
+        r = (xf_i - nfc_i) * (fx_i - ffulc_i)
+        q = (xf_i - fulc_i) * (fx_i - fnfc_i)
+        p = (xf_i - fulc_i) * q - (xf_i - nfc_i) * r
+        q = 2.0 * (q - r)
+        p = numpy.where(q > 0.0, -p, p)
+        q = numpy.abs(q)
+        r = numpy.where(flag_para, e_i, 0.)
+        e_i = numpy.where(flag_para, rat_i, e_i)
+        # acceptability of parabola
+        flag_ok = flag_para & (numpy.abs(p) < numpy.abs(0.5 * q * r)) & (p > q * (a_i - xf_i)) & (p < q * (b_i - xf_i))
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            rat_para = numpy.where(flag_ok, p / numpy.where(flag_ok, q, 1.), 0.)
+        x_para = xf_i + rat_para
+        si = numpy.sign(xm_i - xf_i) + ((xm_i - xf_i) == 0)
+        rat_para = numpy.where(((x_para - a_i) < tol2_i) | ((b_i - x_para) < tol2_i), tol1_i * si, rat_para)
+        rat_i = numpy.where(flag_ok, rat_para, rat_i)
+        flag_golden[flag_ok] = False
+
+        # 2.2 - golden section step elsewhere
+        e_golden = numpy.where(xf_i >= xm_i, a_i - xf_i, b_i - xf_i)
+        e_i = numpy.where(flag_golden, e_golden, e_i)
+        rat_i = numpy.where(flag_golden, golden_mean * e_golden, rat_i)
+
+        # 2.3 - evaluate new point
+        si = numpy.sign(rat_i) + (rat_i == 0)
+        x = xf_i + si * numpy.maximum(numpy.abs(rat_i), tol1_i)
+        fu = cost(x, ind)
+        nfev += 1
+
+        # 2.4 - update bracket and best points
+        flag_better = fu <= fx_i
+        # new point is the best one
+        a_new = numpy.where(flag_better, numpy.where(x >= xf_i, xf_i, a_i), numpy.where(x < xf_i, x, a_i))
+        b_new = numpy.where(flag_better, numpy.where(x >= xf_i, b_i, xf_i), numpy.where(x < xf_i, b_i, x))
+        # new point is not the best one
+        flag_nfc = (~flag_better) & ((fu <= fnfc_i) | (nfc_i == xf_i))
+        flag_fulc = (~flag_better) & (~flag_nfc) & ((fu <= ffulc_i) | (fulc_i == xf_i) | (fulc_i == nfc_i))
+        flag_shift = flag_better | flag_nfc
+        fulc[ind] = numpy.where(flag_shift, nfc_i, numpy.where(flag_fulc, x, fulc_i))
+        ffulc[ind] = numpy.where(flag_shift, fnfc_i, numpy.where(flag_fulc, fu, ffulc_i))
+        nfc[ind] = numpy.where(flag_better, xf_i, numpy.where(flag_nfc, x, nfc_i))
+        fnfc[ind] = numpy.where(flag_better, fx_i, numpy.where(flag_nfc, fu, fnfc_i))
+        xf[ind] = numpy.where(flag_better, x, xf_i)
+        fx[ind] = numpy.where(flag_better, fu, fx_i)
+        a[ind] = a_new
+        b[ind] = b_new
+        e[ind] = e_i
+        rat[ind] = rat_i
+
+        # 2.5 - convergence test
+        xm[ind] = 0.5 * (a[ind] + b[ind])
+        tol1[ind] = sqrt_eps * numpy.abs(xf[ind]) + xatol[ind] / 3.0
+        tol2[ind] = 2.0 * tol1[ind]
+        ind = ind[numpy.abs(xf[ind] - xm[ind]) > (tol2[ind] - 0.5 * (b[ind] - a[ind]))]
+
+    return xf, nfev
+
+
 def pointcloud_height_geoloc_vect(p_noisy, h_noisy, s, vs, range_target, h_target,
                                   recompute_doppler=False,
                                   recompute_range=False,
@@ -398,26 +554,19 @@ def pointcloud_height_geoloc_vect(p_noisy, h_noisy, s, vs, range_target, h_targe
         iter_grad += 1
 
     nfev_minimize_scalar = 0  # to store the number of function evaluations during the numerical optimization
-    indices = numpy.where(h_error_mu > height_goal)
-    for i in indices[0]:
-        dh_max = 2 * h_error_mu_0[i]
-        dmu_max = numpy.abs(fact_sph[i] * dh_max / r_eq[i] / numpy.sin(mu_0[i]))
-
+    indices = numpy.where(h_error_mu > height_goal)[0]
+    if indices.size > 0:
+        # bounded minimization of the height error around mu_0, for all the points not converged at once
+        dh_max = 2 * h_error_mu_0[indices]
+        dmu_max = numpy.abs(fact_sph[indices] * dh_max / r_eq[indices] / numpy.sin(mu_0[indices]))
+        sol_x, nfev_minimize_scalar = minimize_herror2_vect(dmu_max, mu_0[indices], s[indices], w_hat[indices], u_hat[indices],
+                                                            v_hat[indices], r_eq[indices], delta[indices], h_target[indices],
+                                                            height_goal / dh_max)
         if verbose:
-            i_verbose = 3
-        else:
-            i_verbose = 0
-
-        sol = opt.minimize_scalar(
-            lambda x: herror2ofx(x, dmu_max, mu_0[i], s[i], w_hat[i], u_hat[i], v_hat[i], r_eq[i], delta[i],
-                                 h_target[i]), bounds=(-1., 1.), method='bounded',
-            options={'xatol': height_goal / dh_max, 'disp': i_verbose})
-        mu_sol = mu_0[i] + dmu_max * sol.x
-        h_mu[i], p_mu[i] = h_of_mu(mu_sol, s[i], r_eq[i], delta[i], u_hat[i], v_hat[i],
-                                   w_hat[i])  # a bit of a waste of computation here for the sake of readability
-
-        # we could just recompute p_mu and extract h from sol (but we then need to be careful about the sign etc...)
-        nfev_minimize_scalar = sol.nfev
+            logger.debug("%d points solved by numerical optimization with %d cost function evaluations" % (indices.size, nfev_minimize_scalar))
+        mu_sol = mu_0[indices] + dmu_max * sol_x
+        h_mu[indices], p_mu[indices] = h_of_mu_vect(mu_sol, s[indices], r_eq[indices], delta[indices], u_hat[indices],
+                                                    v_hat[indices], w_hat[indices])
 
     # projection of geocentric coordinates into geographic coordinates
     p_final_llh = project_array(p_mu)
@@ -31,15 +31,18 @@ import datetime
 from dateutil import parser
 import logging
 import numpy as np
+import time
 from osgeo import ogr
 
 import cnes.common.lib.my_netcdf_file as my_nc
 import cnes.common.lib.my_tools as my_tools
 import cnes.common.lib.my_segmentation as my_segmentation
+import cnes.common.lib.my_timer as my_timer
 import cnes.common.lib.my_variables as my_var
 import cnes.common.lib_lake.lake_db as lake_db
 
 import cnes.common.service_config_file as service_config_file
+import cnes.common.service_error as service_error
 
 import jpl.modules.aggregate as jpl_aggregate
 
@@ -305,11 +308,17 @@ class PixCEdgeSwath(object):
             - nb_pixels / int: total number of pixels
             - pixc_metadata / dict: processing metadata
             - tile_poly / ogr.Polygon: polygon of the PixC tile
+            - list_tile_poly / list of ogr.Polygon: polygon of each loaded tile, merged into tile_poly
+            - loaded_data / dict: values loaded from each LakeTile_edge file (list of 1D-arrays) for each variable name, before concatenation
+            - load_time / dict: loading time (s) of each LakeTile_edge file
 
         - Variables specific to processing:
             - tile_num / list of int: List of tile number to process ex: [76, 77, 78]
             - tile_index /list of int: Tile_num reference of each pixel ex: [0, 0, 0, 1, 2, 2, 2, 2]
             - labels / 1D-array of int: arrays of new labels
+            - label_index / my_tools.LabelIndex: index of pixels of each label
+            - lake_tile_label / dict: LakeTile_edge label involving the max number of pixels, for each label (computed when needed)
+            - edge_label_tile_ref / dict: tile containing the max number of pixels, for each LakeTile_edge label (computed when needed)
             - is_boundary_pix / list of bool: if pixel belong to the first / last azimuth of single pass
             - near_range / list of float: store the near range of each tiles
             - slant_range_spacing / list of int: store the slant range samplig of each tiles (supposed to be 0.75)
@@ -492,9 +501,15 @@ class PixCEdgeSwath(object):
         self.nb_pix_range = 0  # Number of pixels in range
         self.nb_pixels = 0  # Number of pixels to process
         self.tile_poly = ogr.Geometry(ogr.wkbMultiPolygon)  # Tiles polygon union
+        self.list_tile_poly = []  # Polygon of each loaded tile
+        self.loaded_data = {}  # Values loaded from each LakeTile_edge file, for each attribute, before concatenation
+        self.load_time = {}  # Loading time (s) of each LakeTile_edge file
         self.tile_num = []  # List of tile number to process ex: [76, 77, 78]
         self.tile_index = []  # Tile reference of each pixel
         self.labels = np.array(()).astype('int')  # Init labels to 0
+        self.label_index = None  # Index of pixels of each entity label (my_tools.LabelIndex)
+        self.lake_tile_label = None  # LakeTile_edge label involving the max number of pixels, for each label
+        self.edge_label_tile_ref = None  # Tile containing the max number of pixels, for each LakeTile_edge label
         self.is_boundary_pix = []  # If pixel belongs to the first / last azimuth of single pass
         self.near_range = []
         self.slant_range_spacing = []
@@ -523,8 +538,9 @@ class PixCEdgeSwath(object):
             logger.info("Loading L2_HR_LakeTile edge file = %s" % lake_tile_edge_path)
 
             # Load data
-            nb_pix_loaded, current_tile_number, current_nb_pix_azimuth, current_near_range, current_slant_range_spacing = \
-                 self.load_laketile_edge_data(lake_tile_edge_path)
+            with my_timer.stage("LakeSP.load_laketile_edge_data"):
+                nb_pix_loaded, current_tile_number, current_nb_pix_azimuth, current_near_range, current_slant_range_spacing = \
+                     self.load_laketile_edge_data(lake_tile_edge_path)
 
             if not current_tile_number:
                 continue
@@ -557,6 +573,16 @@ class PixCEdgeSwath(object):
             self.near_range.append(current_near_range)
             self.slant_range_spacing.append(current_slant_range_spacing)
 
+        # Concatenate the variables loaded from all files
+        self.concatenate_loaded_data()
+        
+        # Compute the polygon of all tiles with a single union
+        if self.list_tile_poly:
+            multi_tile_poly = ogr.Geometry(ogr.wkbMultiPolygon)
+            for tile_poly in self.list_tile_poly:
+                multi_tile_poly.AddGeometry(tile_poly)
+            self.tile_poly = multi_tile_poly.UnionCascaded()
+        
         # Convert list to numpy array
         self.tile_index = np.array(self.tile_index)
         self.labels = np.zeros((self.nb_pixels))
@@ -571,12 +597,15 @@ class PixCEdgeSwath(object):
         self.is_boundary_pix = np.logical_or(full_path_azimuth == 0, full_path_azimuth == np.sum(nb_pix_azimuth_list)-1)
 
         logger.info("%d PixC loaded for current swath" % self.nb_pixels)
+        logger.info("%d LakeTile_edge files loaded in %.3f s" % (len(self.load_time), sum(self.load_time.values())))
 
     # ----------------------------------------
 
     def load_laketile_edge_data(self, in_laketile_edge_filename):
         """
         This function loads NetCDF information.
+        Global attributes, then variables, are read in a single pass each; variables are stored with add_loaded_data
+        and only concatenated by concatenate_loaded_data once all files are loaded.
         
         :param in_laketile_edge_filename: full path of the NetCDF file to load
         :type in_laketile_edge_filename: string
@@ -587,58 +616,61 @@ class PixCEdgeSwath(object):
         :rtype: out_tile_ref = string
         """
         logger = logging.getLogger(self.__class__.__name__)
+        start_time = time.time()
         
-        # 1 - Open input NetCDF file in reading mode
+        # 1 - Open input NetCDF file in reading mode and get all global attributes at once
         pixc_edge_reader = my_nc.MyNcReader(in_laketile_edge_filename)
+        dict_att = pixc_edge_reader.get_dict_att()
 
         # 2 - Get and check tile references (cycle, pass, swath)
-        out_tile_number = int(pixc_edge_reader.get_att_value("tile_number"))
+        out_tile_number = int(dict_att["tile_number"])
 
-        current_cycle_num = int(pixc_edge_reader.get_att_value("cycle_number"))
+        current_cycle_num = int(dict_att["cycle_number"])
         if current_cycle_num != self.cycle_num:
             logger.error("Cycle of tile %d do not match with SP product %d" %(current_cycle_num, self.cycle_num))
 
-        current_pass_number = int(pixc_edge_reader.get_att_value("pass_number"))
+        current_pass_number = int(dict_att["pass_number"])
         if current_pass_number != self.pass_num:
             logger.error("Pass of tile %d do not match with SP product %d" %(current_pass_number, self.pass_num))
 
-        current_swath_side = str(pixc_edge_reader.get_att_value("swath_side"))
+        current_swath_side = str(dict_att["swath_side"])
         if current_swath_side != self.swath_side:
             logger.error("Swath of tile %s do not match with PixCEdgeSwath %s" %(current_swath_side, self.swath_side))
-        current_date = parser.parse(pixc_edge_reader.get_att_value("time_granule_start"))
+        current_date = parser.parse(dict_att["time_granule_start"])
         if not self.date:
             self.date = current_date
         # Stop the process if acquisition dates delta > 24h
         if (current_date - self.date) > datetime.timedelta(days=1) :
             logger.error("Input LakeTile_Edge file do not correspond to the same aquisition date")
 
-        current_continent_id = str(pixc_edge_reader.get_att_value("continent_id"))
+        current_continent_id = str(dict_att["continent_id"])
         if not self.continent_id in current_continent_id:
             # If cur_continent_id do not belong to the EDGE SP product, do not add pixc info
             logger.error("Input LakeTile_Edge %s file do not correspond to the same continent %s" % (in_laketile_edge_filename, self.continent_id))
+            pixc_edge_reader.close()
             retour = None, None, None, None, None
 
         else:
     
-            # 4 - Update tile_poly with new tile
+            # 4 - Store the polygon of the new tile (tile_poly is computed from all of them by set_pixc_edge_swath_from_laketile_edge_file)
             ring = ogr.Geometry(ogr.wkbLinearRing)
-            ring.AddPoint(float(pixc_edge_reader.get_att_value("inner_first_longitude")),
-                          float(pixc_edge_reader.get_att_value("inner_first_latitude")))
-            ring.AddPoint(float(pixc_edge_reader.get_att_value("outer_first_longitude")),
-                          float(pixc_edge_reader.get_att_value("outer_first_latitude")))
-            ring.AddPoint(float(pixc_edge_reader.get_att_value("outer_last_longitude")),
-                          float(pixc_edge_reader.get_att_value("outer_last_latitude")))
-            ring.AddPoint(float(pixc_edge_reader.get_att_value("inner_last_longitude")),
-                          float(pixc_edge_reader.get_att_value("inner_last_latitude")))
-            ring.AddPoint(float(pixc_edge_reader.get_att_value("inner_first_longitude")),
-                          float(pixc_edge_reader.get_att_value("inner_first_latitude")))
+            ring.AddPoint(float(dict_att["inner_first_longitude"]),
+                          float(dict_att["inner_first_latitude"]))
+            ring.AddPoint(float(dict_att["outer_first_longitude"]),
+                          float(dict_att["outer_first_latitude"]))
+            ring.AddPoint(float(dict_att["outer_last_longitude"]),
+                          float(dict_att["outer_last_latitude"]))
+            ring.AddPoint(float(dict_att["inner_last_longitude"]),
+                          float(dict_att["inner_last_latitude"]))
+            ring.AddPoint(float(dict_att["inner_first_longitude"]),
+                          float(dict_att["inner_first_latitude"]))
             current_tile_poly = ogr.Geometry(ogr.wkbPolygon)
             current_tile_poly.AddGeometry(ring)
 
             if not current_tile_poly.IsValid():
                 logger.warning("Polygon tile of file %s is not valid" % in_laketile_edge_filename)
             else:
-                self.tile_poly = self.tile_poly.Union(current_tile_poly)
+                self.list_tile_poly.append(current_tile_poly)
     
             # 3 - Initialization of object variables if not already done
             if not self.tile_num:
@@ -646,243 +678,243 @@ class PixCEdgeSwath(object):
                 # 3.1 - Values for metadata
                 self.pixc_metadata["cycle_number"] = self.cycle_num
                 self.pixc_metadata["pass_number"] = self.pass_num
-                self.pixc_metadata["time_granule_start"] = str(pixc_edge_reader.get_att_value("time_granule_start"))
-                self.pixc_metadata["time_granule_end"] = str(pixc_edge_reader.get_att_value("time_granule_end"))
-                self.pixc_metadata["time_coverage_start"] = str(pixc_edge_reader.get_att_value("time_coverage_start"))
-                self.pixc_metadata["time_coverage_end"] = str(pixc_edge_reader.get_att_value("time_coverage_end"))
-                self.pixc_metadata["geospatial_lon_min"] = np.double(pixc_edge_reader.get_att_value("geospatial_lon_min"))
-                self.pixc_metadata["geospatial_lon_max"] = np.double(pixc_edge_reader.get_att_value("geospatial_lon_max"))
-                self.pixc_metadata["geospatial_lat_min"] = np.double(pixc_edge_reader.get_att_value("geospatial_lat_min"))
-                self.pixc_metadata["geospatial_lat_max"] = np.double(pixc_edge_reader.get_att_value("geospatial_lat_max"))
+                self.pixc_metadata["time_granule_start"] = str(dict_att["time_granule_start"])
+                self.pixc_metadata["time_granule_end"] = str(dict_att["time_granule_end"])
+                self.pixc_metadata["time_coverage_start"] = str(dict_att["time_coverage_start"])
+                self.pixc_metadata["time_coverage_end"] = str(dict_att["time_coverage_end"])
+                self.pixc_metadata["geospatial_lon_min"] = np.double(dict_att["geospatial_lon_min"])
+                self.pixc_metadata["geospatial_lon_max"] = np.double(dict_att["geospatial_lon_max"])
+                self.pixc_metadata["geospatial_lat_min"] = np.double(dict_att["geospatial_lat_min"])
+                self.pixc_metadata["geospatial_lat_max"] = np.double(dict_att["geospatial_lat_max"])
                 if self.swath_side == "L":
-                    self.pixc_metadata["left_first_longitude"] = np.double(pixc_edge_reader.get_att_value("outer_first_longitude"))
-                    self.pixc_metadata["left_first_latitude"] = np.double(pixc_edge_reader.get_att_value("outer_first_latitude"))
-                    self.pixc_metadata["left_last_longitude"] = np.double(pixc_edge_reader.get_att_value("outer_last_longitude"))
-                    self.pixc_metadata["left_last_latitude"] = np.double(pixc_edge_reader.get_att_value("outer_last_latitude"))
-                    self.pixc_metadata["right_first_longitude"] = np.double(pixc_edge_reader.get_att_value("inner_first_longitude"))
-                    self.pixc_metadata["right_first_latitude"] = np.double(pixc_edge_reader.get_att_value("inner_first_latitude"))
-                    self.pixc_metadata["right_last_longitude"] = np.double(pixc_edge_reader.get_att_value("inner_last_longitude"))
-                    self.pixc_metadata["right_last_latitude"] = np.double(pixc_edge_reader.get_att_value("inner_last_latitude"))
+                    self.pixc_metadata["left_first_longitude"] = np.double(dict_att["outer_first_longitude"])
+                    self.pixc_metadata["left_first_latitude"] = np.double(dict_att["outer_first_latitude"])
+                    self.pixc_metadata["left_last_longitude"] = np.double(dict_att["outer_last_longitude"])
+                    self.pixc_metadata["left_last_latitude"] = np.double(dict_att["outer_last_latitude"])
+                    self.pixc_metadata["right_first_longitude"] = np.double(dict_att["inner_first_longitude"])
+                    self.pixc_metadata["right_first_latitude"] = np.double(dict_att["inner_first_latitude"])
+                    self.pixc_metadata["right_last_longitude"] = np.double(dict_att["inner_last_longitude"])
+                    self.pixc_metadata["right_last_latitude"] = np.double(dict_att["inner_last_latitude"])
                 else:
-                    self.pixc_metadata["left_first_longitude"] = np.double(pixc_edge_reader.get_att_value("inner_first_longitude"))
-                    self.pixc_metadata["left_first_latitude"] = np.double(pixc_edge_reader.get_att_value("inner_first_latitude"))
-                    self.pixc_metadata["left_last_longitude"] = np.double(pixc_edge_reader.get_att_value("inner_last_longitude"))
-                    self.pixc_metadata["left_last_latitude"] = np.double(pixc_edge_reader.get_att_value("inner_last_latitude"))
-                    self.pixc_metadata["right_first_longitude"] = np.double(pixc_edge_reader.get_att_value("outer_first_longitude"))
-                    self.pixc_metadata["right_first_latitude"] = np.double(pixc_edge_reader.get_att_value("outer_first_latitude"))
-                    self.pixc_metadata["right_last_longitude"] = np.double(pixc_edge_reader.get_att_value("outer_last_longitude"))
-                    self.pixc_metadata["right_last_latitude"] = np.double(pixc_edge_reader.get_att_value("outer_last_latitude"))
+                    self.pixc_metadata["left_first_longitude"] = np.double(dict_att["inner_first_longitude"])
+                    self.pixc_metadata["left_first_latitude"] = np.double(dict_att["inner_first_latitude"])
+                    self.pixc_metadata["left_last_longitude"] = np.double(dict_att["inner_last_longitude"])
+                    self.pixc_metadata["left_last_latitude"] = np.double(dict_att["inner_last_latitude"])
+                    self.pixc_metadata["right_first_longitude"] = np.double(dict_att["outer_first_longitude"])
+                    self.pixc_metadata["right_first_latitude"] = np.double(dict_att["outer_first_latitude"])
+                    self.pixc_metadata["right_last_longitude"] = np.double(dict_att["outer_last_longitude"])
+                    self.pixc_metadata["right_last_latitude"] = np.double(dict_att["outer_last_latitude"])
                 self.pixc_metadata["continent_id"] = self.continent_id
                 self.pixc_metadata["continent_code"] = self.continent_code
-                self.pixc_metadata["ellipsoid_semi_major_axis"] = str(pixc_edge_reader.get_att_value("ellipsoid_semi_major_axis"))
-                self.pixc_metadata["ellipsoid_flattening"] = str(pixc_edge_reader.get_att_value("ellipsoid_flattening"))
+                self.pixc_metadata["ellipsoid_semi_major_axis"] = str(dict_att["ellipsoid_semi_major_axis"])
+                self.pixc_metadata["ellipsoid_flattening"] = str(dict_att["ellipsoid_flattening"])
                 
                 # 3.2 - Other variables
-                self.nb_pix_range = int(pixc_edge_reader.get_att_value("interferogram_size_range"))
-                self.wavelength = np.float(pixc_edge_reader.get_att_value("wavelength"))  # Wavelength
+                self.nb_pix_range = int(dict_att["interferogram_size_range"])
+                self.wavelength = np.float(dict_att["wavelength"])  # Wavelength
                 # Ratio between the number of actual samples and the effective number of independent samples
-                self.looks_to_efflooks = np.float(pixc_edge_reader.get_att_value("looks_to_efflooks"))  
+                self.looks_to_efflooks = np.float(dict_att["looks_to_efflooks"])  
     
             # 5 - Get number of pixels
             out_nb_pix = pixc_edge_reader.get_dim_value('points')
-            out_nb_pix_azimuth = pixc_edge_reader.get_att_value("interferogram_size_azimuth")
-            out_near_range = pixc_edge_reader.get_att_value("near_range")
-            out_slant_range_spacing = pixc_edge_reader.get_att_value("nominal_slant_range_spacing")
+            out_nb_pix_azimuth = dict_att["interferogram_size_azimuth"]
+            out_near_range = dict_att["near_range"]
+            out_slant_range_spacing = dict_att["nominal_slant_range_spacing"]
             
             # 6 - Update metadata from PixC info
             self.pixc_metadata["time_coverage_start"] = min(self.pixc_metadata["time_coverage_start"], 
-                                                            str(pixc_edge_reader.get_att_value("time_coverage_start")))
+                                                            str(dict_att["time_coverage_start"]))
             self.pixc_metadata["time_coverage_end"] = max(self.pixc_metadata["time_coverage_end"], 
-                                                          str(pixc_edge_reader.get_att_value("time_coverage_end")))
+                                                          str(dict_att["time_coverage_end"]))
             self.pixc_metadata["geospatial_lon_min"] = min(self.pixc_metadata["geospatial_lon_min"], 
-                                                           np.double(pixc_edge_reader.get_att_value("geospatial_lon_min")))
+                                                           np.double(dict_att["geospatial_lon_min"]))
             self.pixc_metadata["geospatial_lon_max"] = max(self.pixc_metadata["geospatial_lon_max"], 
-                                                           np.double(pixc_edge_reader.get_att_value("geospatial_lon_max")))
+                                                           np.double(dict_att["geospatial_lon_max"]))
             self.pixc_metadata["geospatial_lat_min"] = min(self.pixc_metadata["geospatial_lat_min"], 
-                                                           np.double(pixc_edge_reader.get_att_value("geospatial_lat_min")))
+                                                           np.double(dict_att["geospatial_lat_min"]))
             self.pixc_metadata["geospatial_lat_max"] = max(self.pixc_metadata["geospatial_lat_max"], 
-                                                           np.double(pixc_edge_reader.get_att_value("geospatial_lat_max")))
+                                                           np.double(dict_att["geospatial_lat_max"]))
             if self.swath_side == "L":
                 if self.pass_num%2 == 1:
                     self.pixc_metadata["left_first_longitude"] = min(self.pixc_metadata["left_first_longitude"], 
-                                                                     np.double(pixc_edge_reader.get_att_value("outer_first_longitude")))
+                                                                     np.double(dict_att["outer_first_longitude"]))
                     self.pixc_metadata["left_first_latitude"] = min(self.pixc_metadata["left_first_latitude"], 
-                                                                    np.double(pixc_edge_reader.get_att_value("outer_first_latitude")))
+                                                                    np.double(dict_att["outer_first_latitude"]))
                     self.pixc_metadata["left_last_longitude"] = max(self.pixc_metadata["left_last_longitude"], 
-                                                                    np.double(pixc_edge_reader.get_att_value("outer_last_longitude")))
+                                                                    np.double(dict_att["outer_last_longitude"]))
                     self.pixc_metadata["left_last_latitude"] = max(self.pixc_metadata["left_last_latitude"], 
-                                                                   np.double(pixc_edge_reader.get_att_value("outer_last_latitude")))
+                                                                   np.double(dict_att["outer_last_latitude"]))
                     self.pixc_metadata["right_first_longitude"] = min(self.pixc_metadata["right_first_longitude"], 
-                                                                      np.double(pixc_edge_reader.get_att_value("inner_first_longitude")))
+                                                                      np.double(dict_att["inner_first_longitude"]))
                     self.pixc_metadata["right_first_latitude"] = min(self.pixc_metadata["right_first_latitude"], 
-                                                                     np.double(pixc_edge_reader.get_att_value("inner_first_latitude")))
+                                                                     np.double(dict_att["inner_first_latitude"]))
                     self.pixc_metadata["right_last_longitude"] = max(self.pixc_metadata["right_last_longitude"], 
-                                                                     np.double(pixc_edge_reader.get_att_value("inner_last_longitude")))
+                                                                     np.double(dict_att["inner_last_longitude"]))
                     self.pixc_metadata["right_last_latitude"] = max(self.pixc_metadata["right_last_latitude"], 
-                                                                    np.double(pixc_edge_reader.get_att_value("inner_last_latitude")))
+                                                                    np.double(dict_att["inner_last_latitude"]))
                 else:
                     self.pixc_metadata["left_first_longitude"] = min(self.pixc_metadata["left_first_longitude"], 
-                                                                     np.double(pixc_edge_reader.get_att_value("outer_first_longitude")))
+                                                                     np.double(dict_att["outer_first_longitude"]))
                     self.pixc_metadata["left_first_latitude"] = max(self.pixc_metadata["left_first_latitude"], 
-                                                                    np.double(pixc_edge_reader.get_att_value("outer_first_latitude")))
+                                                                    np.double(dict_att["outer_first_latitude"]))
                     self.pixc_metadata["left_last_longitude"] = max(self.pixc_metadata["left_last_longitude"], 
-                                                                    np.double(pixc_edge_reader.get_att_value("outer_last_longitude")))
+                                                                    np.double(dict_att["outer_last_longitude"]))
                     self.pixc_metadata["left_last_latitude"] = min(self.pixc_metadata["left_last_latitude"], 
-                                                                   np.double(pixc_edge_reader.get_att_value("outer_last_latitude")))
+                                                                   np.double(dict_att["outer_last_latitude"]))
                     self.pixc_metadata["right_first_longitude"] = min(self.pixc_metadata["right_first_longitude"], 
-                                                                      np.double(pixc_edge_reader.get_att_value("inner_first_longitude")))
+                                                                      np.double(dict_att["inner_first_longitude"]))
                     self.pixc_metadata["right_first_latitude"] = max(self.pixc_metadata["right_first_latitude"], 
-                                                                     np.double(pixc_edge_reader.get_att_value("inner_first_latitude")))
+                                                                     np.double(dict_att["inner_first_latitude"]))
                     self.pixc_metadata["right_last_longitude"] = max(self.pixc_metadata["right_last_longitude"], 
-                                                                     np.double(pixc_edge_reader.get_att_value("inner_last_longitude")))
+                                                                     np.double(dict_att["inner_last_longitude"]))
                     self.pixc_metadata["right_last_latitude"] = min(self.pixc_metadata["right_last_latitude"], 
-                                                                    np.double(pixc_edge_reader.get_att_value("inner_last_latitude")))
+                                                                    np.double(dict_att["inner_last_latitude"]))
             else:
                 if self.pass_num%2 == 1:
                     self.pixc_metadata["left_first_longitude"] = min(self.pixc_metadata["left_first_longitude"], 
-                                                                     np.double(pixc_edge_reader.get_att_value("inner_first_longitude")))
+                                                                     np.double(dict_att["inner_first_longitude"]))
                     self.pixc_metadata["left_first_latitude"] = min(self.pixc_metadata["left_first_latitude"], 
-                                                                    np.double(pixc_edge_reader.get_att_value("inner_first_latitude")))
+                                                                    np.double(dict_att["inner_first_latitude"]))
                     self.pixc_metadata["left_last_longitude"] = max(self.pixc_metadata["left_last_longitude"], 
-                                                                    np.double(pixc_edge_reader.get_att_value("inner_last_longitude")))
+                                                                    np.double(dict_att["inner_last_longitude"]))
                     self.pixc_metadata["left_last_latitude"] = max(self.pixc_metadata["left_last_latitude"], 
-                                                                   np.double(pixc_edge_reader.get_att_value("inner_last_latitude")))
+                                                                   np.double(dict_att["inner_last_latitude"]))
                     self.pixc_metadata["right_first_longitude"] = min(self.pixc_metadata["right_first_longitude"], 
-                                                                      np.double(pixc_edge_reader.get_att_value("outer_first_longitude")))
+                                                                      np.double(dict_att["outer_first_longitude"]))
                     self.pixc_metadata["right_first_latitude"] = min(self.pixc_metadata["right_first_latitude"], 
-                                                                     np.double(pixc_edge_reader.get_att_value("outer_first_latitude")))
+                                                                     np.double(dict_att["outer_first_latitude"]))
                     self.pixc_metadata["right_last_longitude"] = max(self.pixc_metadata["right_last_longitude"], 
-                                                                     np.double(pixc_edge_reader.get_att_value("outer_last_longitude")))
+                                                                     np.double(dict_att["outer_last_longitude"]))
                     self.pixc_metadata["right_last_latitude"] = max(self.pixc_metadata["right_last_latitude"], 
-                                                                    np.double(pixc_edge_reader.get_att_value("outer_last_latitude")))
+                                                                    np.double(dict_att["outer_last_latitude"]))
                 else:
                     self.pixc_metadata["left_first_longitude"] = min(self.pixc_metadata["left_first_longitude"], 
-                                                                     np.double(pixc_edge_reader.get_att_value("inner_first_longitude")))
+                                                                     np.double(dict_att["inner_first_longitude"]))
                     self.pixc_metadata["left_first_latitude"] = max(self.pixc_metadata["left_first_latitude"], 
-                                                                    np.double(pixc_edge_reader.get_att_value("inner_first_latitude")))
+                                                                    np.double(dict_att["inner_first_latitude"]))
                     self.pixc_metadata["left_last_longitude"] = max(self.pixc_metadata["left_last_longitude"], 
-                                                                    np.double(pixc_edge_reader.get_att_value("inner_last_longitude")))
+                                                                    np.double(dict_att["inner_last_longitude"]))
                     self.pixc_metadata["left_last_latitude"] = min(self.pixc_metadata["left_last_latitude"], 
-                                                                   np.double(pixc_edge_reader.get_att_value("inner_last_latitude")))
+                                                                   np.double(dict_att["inner_last_latitude"]))
                     self.pixc_metadata["right_first_longitude"] = min(self.pixc_metadata["right_first_longitude"], 
-                                                                      np.double(pixc_edge_reader.get_att_value("outer_first_longitude")))
+                                                                      np.double(dict_att["outer_first_longitude"]))
                     self.pixc_metadata["right_first_latitude"] = max(self.pixc_metadata["right_first_latitude"], 
-                                                                     np.double(pixc_edge_reader.get_att_value("outer_first_latitude")))
+                                                                     np.double(dict_att["outer_first_latitude"]))
                     self.pixc_metadata["right_last_longitude"] = max(self.pixc_metadata["right_last_longitude"], 
-                                                                     np.double(pixc_edge_reader.get_att_value("outer_last_longitude")))
+                                                                     np.double(dict_att["outer_last_longitude"]))
                     self.pixc_metadata["right_last_latitude"] = min(self.pixc_metadata["right_last_latitude"], 
-                                                                    np.double(pixc_edge_reader.get_att_value("outer_last_latitude")))
+                                                                    np.double(dict_att["outer_last_latitude"]))
             
             # 7 - Update vectors if there are pixels in the current LakeTile_edge file
             if out_nb_pix > 0:
+                
+                # 7.0 - Get all variables at once
+                dict_var = pixc_edge_reader.get_dict_var()
     
                 # 7.1 - Add edge objects info
-                self.edge_label = np.concatenate((self.edge_label, pixc_edge_reader.get_var_value("edge_label")))
-                self.edge_index = np.concatenate((self.edge_index, pixc_edge_reader.get_var_value("edge_index")))
-                self.edge_loc = np.concatenate((self.edge_loc, pixc_edge_reader.get_var_value("edge_loc")))
+                self.add_loaded_data("edge_label", dict_var["edge_label"])
+                self.add_loaded_data("edge_index", dict_var["edge_index"])
+                self.add_loaded_data("edge_loc", dict_var["edge_loc"])
     
                 # 7.2 - Add variables from PIXC/pixel_cloud
-                tmp_classif = pixc_edge_reader.get_var_value("classification")
-                self.classif = np.concatenate((self.classif, tmp_classif))
+                tmp_classif = dict_var["classification"]
+                self.add_loaded_data("classif", tmp_classif)
                 # Simulate classification of edge + full water pixels
                 # All PIXC are set to INTERIOR_WATER
                 # LAND_EDGE + WATER_EDGE PIXC are set to WATER_EDGE
                 tmp_classif_full_water = np.zeros(out_nb_pix) + my_var.CLASSIF_INTERIOR_WATER
                 tmp_classif_full_water[tmp_classif == my_var.CLASSIF_LAND_EDGE] = my_var.CLASSIF_WATER_EDGE
                 tmp_classif_full_water[tmp_classif == my_var.CLASSIF_WATER_EDGE] = my_var.CLASSIF_WATER_EDGE
-                self.classif_full_water = np.concatenate((self.classif_full_water, tmp_classif_full_water))
+                self.add_loaded_data("classif_full_water", tmp_classif_full_water)
                 # Keep only classification of water pixels (ie remove dark water flags)
                 tmp_classif_without_dw = np.copy(tmp_classif)
                 tmp_classif_without_dw[tmp_classif == my_var.CLASSIF_LAND_NEAR_DARK_WATER] = 0
                 tmp_classif_without_dw[tmp_classif == my_var.CLASSIF_DARK_EDGE] = 0
                 tmp_classif_without_dw[tmp_classif == my_var.CLASSIF_DARK] = 0
-                self.classif_without_dw = np.concatenate((self.classif_without_dw, tmp_classif_without_dw))
+                self.add_loaded_data("classif_without_dw", tmp_classif_without_dw)
                 
-                self.range_index = np.concatenate((self.range_index, pixc_edge_reader.get_var_value("range_index")))
-                self.azimuth_index = np.concatenate((self.azimuth_index, pixc_edge_reader.get_var_value("azimuth_index")))
+                self.add_loaded_data("range_index", dict_var["range_index"])
+                self.add_loaded_data("azimuth_index", dict_var["azimuth_index"])
                 
-                interferogram_value = pixc_edge_reader.get_var_value("interferogram")
+                interferogram_value = dict_var["interferogram"]
                 tmp_interferogram = interferogram_value[:,0] + 1j*interferogram_value[:,1]
-                self.interferogram = np.concatenate((self.interferogram, tmp_interferogram))
+                self.add_loaded_data("interferogram", tmp_interferogram)
                 tmp_interferogram_flattened = 0 * tmp_interferogram
-                self.interferogram_flattened = np.concatenate((self.interferogram_flattened, tmp_interferogram_flattened))
-                self.power_plus_y = np.concatenate((self.power_plus_y, pixc_edge_reader.get_var_value("power_plus_y")))
-                self.power_minus_y = np.concatenate((self.power_minus_y, pixc_edge_reader.get_var_value("power_minus_y")))
+                self.add_loaded_data("interferogram_flattened", tmp_interferogram_flattened)
+                self.add_loaded_data("power_plus_y", dict_var["power_plus_y"])
+                self.add_loaded_data("power_minus_y", dict_var["power_minus_y"])
                 
-                tmp_water_frac = pixc_edge_reader.get_var_value("water_frac")
-                self.water_frac = np.concatenate((self.water_frac, tmp_water_frac))
-                self.water_frac_uncert = np.concatenate((self.water_frac_uncert, pixc_edge_reader.get_var_value("water_frac_uncert")))
-                self.false_detection_rate = np.concatenate((self.false_detection_rate, pixc_edge_reader.get_var_value("false_detection_rate")))
-                self.missed_detection_rate = np.concatenate((self.missed_detection_rate, pixc_edge_reader.get_var_value("missed_detection_rate")))
-                self.bright_land_flag = np.concatenate((self.bright_land_flag, pixc_edge_reader.get_var_value("bright_land_flag")))
-                self.layover_impact = np.concatenate((self.layover_impact, pixc_edge_reader.get_var_value("layover_impact")))
-                self.eff_num_rare_looks = np.concatenate((self.eff_num_rare_looks, pixc_edge_reader.get_var_value("eff_num_rare_looks")))
+                tmp_water_frac = dict_var["water_frac"]
+                self.add_loaded_data("water_frac", tmp_water_frac)
+                self.add_loaded_data("water_frac_uncert", dict_var["water_frac_uncert"])
+                self.add_loaded_data("false_detection_rate", dict_var["false_detection_rate"])
+                self.add_loaded_data("missed_detection_rate", dict_var["missed_detection_rate"])
+                self.add_loaded_data("bright_land_flag", dict_var["bright_land_flag"])
+                self.add_loaded_data("layover_impact", dict_var["layover_impact"])
+                self.add_loaded_data("eff_num_rare_looks", dict_var["eff_num_rare_looks"])
                 
-                self.latitude = np.concatenate((self.latitude, pixc_edge_reader.get_var_value("latitude")))
-                self.longitude = np.concatenate((self.longitude, pixc_edge_reader.get_var_value("longitude")))
-                tmp_height = pixc_edge_reader.get_var_value("height")
-                self.height = np.concatenate((self.height, tmp_height))
+                self.add_loaded_data("latitude", dict_var["latitude"])
+                self.add_loaded_data("longitude", dict_var["longitude"])
+                tmp_height = dict_var["height"]
+                self.add_loaded_data("height", tmp_height)
                 
-                self.cross_track = np.concatenate((self.cross_track, pixc_edge_reader.get_var_value("cross_track")))
-                tmp_pixel_area = pixc_edge_reader.get_var_value("pixel_area")
-                self.pixel_area = np.concatenate((self.pixel_area, tmp_pixel_area))
+                self.add_loaded_data("cross_track", dict_var["cross_track"])
+                tmp_pixel_area = dict_var["pixel_area"]
+                self.add_loaded_data("pixel_area", tmp_pixel_area)
                 tmp_inundated_area = np.copy(tmp_pixel_area)
                 ind_ok = np.where(tmp_water_frac < my_var.FV_FLOAT)
                 if len(ind_ok) > 0:
                     tmp_inundated_area[ind_ok] = tmp_pixel_area[ind_ok] * tmp_water_frac[ind_ok]
-                self.inundated_area = np.concatenate((self.inundated_area, tmp_inundated_area))
+                self.add_loaded_data("inundated_area", tmp_inundated_area)
                 
-                self.inc = np.concatenate((self.inc, pixc_edge_reader.get_var_value("inc")))
-                tmp_phase_noise_std = pixc_edge_reader.get_var_value("phase_noise_std")
-                self.phase_noise_std = np.concatenate((self.phase_noise_std, tmp_phase_noise_std))
-                self.dlatitude_dphase = np.concatenate((self.dlatitude_dphase, pixc_edge_reader.get_var_value("dlatitude_dphase")))
-                self.dlongitude_dphase = np.concatenate((self.dlongitude_dphase, pixc_edge_reader.get_var_value("dlongitude_dphase")))
-                tmp_dheight_dphase = pixc_edge_reader.get_var_value("dheight_dphase")
-                self.dheight_dphase = np.concatenate((self.dheight_dphase, tmp_dheight_dphase))
-                self.dheight_drange = np.concatenate((self.dheight_drange, pixc_edge_reader.get_var_value("dheight_drange")))
-                self.darea_dheight = np.concatenate((self.darea_dheight, pixc_edge_reader.get_var_value("darea_dheight")))
-                self.eff_num_medium_looks = np.concatenate((self.eff_num_medium_looks, pixc_edge_reader.get_var_value("eff_num_medium_looks")))
+                self.add_loaded_data("inc", dict_var["inc"])
+                tmp_phase_noise_std = dict_var["phase_noise_std"]
+                self.add_loaded_data("phase_noise_std", tmp_phase_noise_std)
+                self.add_loaded_data("dlatitude_dphase", dict_var["dlatitude_dphase"])
+                self.add_loaded_data("dlongitude_dphase", dict_var["dlongitude_dphase"])
+                tmp_dheight_dphase = dict_var["dheight_dphase"]
+                self.add_loaded_data("dheight_dphase", tmp_dheight_dphase)
+                self.add_loaded_data("dheight_drange", dict_var["dheight_drange"])
+                self.add_loaded_data("darea_dheight", dict_var["darea_dheight"])
+                self.add_loaded_data("eff_num_medium_looks", dict_var["eff_num_medium_looks"])
                 
-                self.model_dry_tropo_cor = np.concatenate((self.model_dry_tropo_cor, pixc_edge_reader.get_var_value("model_dry_tropo_cor")))
-                self.model_wet_tropo_cor = np.concatenate((self.model_wet_tropo_cor, pixc_edge_reader.get_var_value("model_wet_tropo_cor")))
-                self.iono_cor_gim_ka = np.concatenate((self.iono_cor_gim_ka, pixc_edge_reader.get_var_value("iono_cor_gim_ka")))
-                self.height_cor_xover = np.concatenate((self.height_cor_xover, pixc_edge_reader.get_var_value("height_cor_xover")))
+                self.add_loaded_data("model_dry_tropo_cor", dict_var["model_dry_tropo_cor"])
+                self.add_loaded_data("model_wet_tropo_cor", dict_var["model_wet_tropo_cor"])
+                self.add_loaded_data("iono_cor_gim_ka", dict_var["iono_cor_gim_ka"])
+                self.add_loaded_data("height_cor_xover", dict_var["height_cor_xover"])
                 
-                tmp_geoid = pixc_edge_reader.get_var_value("geoid")
-                self.geoid = np.concatenate((self.geoid, tmp_geoid))
-                tmp_solid_earth_tide = pixc_edge_reader.get_var_value("solid_earth_tide")
-                self.solid_earth_tide = np.concatenate((self.solid_earth_tide, tmp_solid_earth_tide))
-                tmp_load_tide_fes = pixc_edge_reader.get_var_value("load_tide_fes")
-                self.load_tide_fes = np.concatenate((self.load_tide_fes, tmp_load_tide_fes))
-                tmp_load_tide_got = pixc_edge_reader.get_var_value("load_tide_got")
-                self.load_tide_got = np.concatenate((self.load_tide_got, tmp_load_tide_got))
-                tmp_pole_tide = pixc_edge_reader.get_var_value("pole_tide")
-                self.pole_tide = np.concatenate((self.pole_tide, tmp_pole_tide))
+                tmp_geoid = dict_var["geoid"]
+                self.add_loaded_data("geoid", tmp_geoid)
+                tmp_solid_earth_tide = dict_var["solid_earth_tide"]
+                self.add_loaded_data("solid_earth_tide", tmp_solid_earth_tide)
+                tmp_load_tide_fes = dict_var["load_tide_fes"]
+                self.add_loaded_data("load_tide_fes", tmp_load_tide_fes)
+                tmp_load_tide_got = dict_var["load_tide_got"]
+                self.add_loaded_data("load_tide_got", tmp_load_tide_got)
+                tmp_pole_tide = dict_var["pole_tide"]
+                self.add_loaded_data("pole_tide", tmp_pole_tide)
                 
-                self.classification_qual = np.concatenate((self.classification_qual, pixc_edge_reader.get_var_value("classification_qual")))
+                self.add_loaded_data("classification_qual", dict_var["classification_qual"])
     
                 # 7.3 - Info of the nadir point associated to the PixC
-                self.nadir_time = np.concatenate((self.nadir_time, pixc_edge_reader.get_var_value("nadir_time")))
-                self.nadir_time_tai = np.concatenate((self.nadir_time, pixc_edge_reader.get_var_value("nadir_time_tai")))
-                self.nadir_longitude = np.concatenate((self.nadir_longitude, pixc_edge_reader.get_var_value("nadir_longitude")))
-                self.nadir_latitude = np.concatenate((self.nadir_latitude, pixc_edge_reader.get_var_value("nadir_latitude")))
-                self.nadir_x = np.concatenate((self.nadir_x, pixc_edge_reader.get_var_value("nadir_x")))
-                self.nadir_y = np.concatenate((self.nadir_y, pixc_edge_reader.get_var_value("nadir_y")))
-                self.nadir_z = np.concatenate((self.nadir_z, pixc_edge_reader.get_var_value("nadir_z")))
-                self.nadir_vx = np.concatenate((self.nadir_vx, pixc_edge_reader.get_var_value("nadir_vx")))
-                self.nadir_vy = np.concatenate((self.nadir_vy, pixc_edge_reader.get_var_value("nadir_vy")))
-                self.nadir_vz = np.concatenate((self.nadir_vz, pixc_edge_reader.get_var_value("nadir_vz")))
-                self.nadir_plus_y_antenna_x = np.concatenate((self.nadir_plus_y_antenna_x, pixc_edge_reader.get_var_value("nadir_plus_y_antenna_x")))
-                self.nadir_plus_y_antenna_y = np.concatenate((self.nadir_plus_y_antenna_y, pixc_edge_reader.get_var_value("nadir_plus_y_antenna_y")))
-                self.nadir_plus_y_antenna_z = np.concatenate((self.nadir_plus_y_antenna_z, pixc_edge_reader.get_var_value("nadir_plus_y_antenna_z")))
-                self.nadir_minus_y_antenna_x = np.concatenate((self.nadir_minus_y_antenna_x, \
-                                                               pixc_edge_reader.get_var_value("nadir_minus_y_antenna_x")))
-                self.nadir_minus_y_antenna_y = np.concatenate((self.nadir_minus_y_antenna_y, \
-                                                               pixc_edge_reader.get_var_value("nadir_minus_y_antenna_y")))
-                self.nadir_minus_y_antenna_z = np.concatenate((self.nadir_minus_y_antenna_z, \
-                                                               pixc_edge_reader.get_var_value("nadir_minus_y_antenna_z")))
-                self.nadir_sc_event_flag = np.concatenate((self.nadir_sc_event_flag, pixc_edge_reader.get_var_value("nadir_sc_event_flag")))
-                self.nadir_tvp_qual = np.concatenate((self.nadir_tvp_qual, pixc_edge_reader.get_var_value("nadir_tvp_qual")))
+                self.add_loaded_data("nadir_time", dict_var["nadir_time"])
+                self.add_loaded_data("nadir_time_tai", dict_var["nadir_time_tai"])
+                self.add_loaded_data("nadir_longitude", dict_var["nadir_longitude"])
+                self.add_loaded_data("nadir_latitude", dict_var["nadir_latitude"])
+                self.add_loaded_data("nadir_x", dict_var["nadir_x"])
+                self.add_loaded_data("nadir_y", dict_var["nadir_y"])
+                self.add_loaded_data("nadir_z", dict_var["nadir_z"])
+                self.add_loaded_data("nadir_vx", dict_var["nadir_vx"])
+                self.add_loaded_data("nadir_vy", dict_var["nadir_vy"])
+                self.add_loaded_data("nadir_vz", dict_var["nadir_vz"])
+                self.add_loaded_data("nadir_plus_y_antenna_x", dict_var["nadir_plus_y_antenna_x"])
+                self.add_loaded_data("nadir_plus_y_antenna_y", dict_var["nadir_plus_y_antenna_y"])
+                self.add_loaded_data("nadir_plus_y_antenna_z", dict_var["nadir_plus_y_antenna_z"])
+                self.add_loaded_data("nadir_minus_y_antenna_x", dict_var["nadir_minus_y_antenna_x"])
+                self.add_loaded_data("nadir_minus_y_antenna_y", dict_var["nadir_minus_y_antenna_y"])
+                self.add_loaded_data("nadir_minus_y_antenna_z", dict_var["nadir_minus_y_antenna_z"])
+                self.add_loaded_data("nadir_sc_event_flag", dict_var["nadir_sc_event_flag"])
+                self.add_loaded_data("nadir_tvp_qual", dict_var["nadir_tvp_qual"])
                 
                 # 7.4 - Set bad PIXC height std to high number to deweight 
                 # instead of giving infs/nans
@@ -891,7 +923,7 @@ class PixCEdgeSwath(object):
                 tmp_height_std_pix[tmp_height_std_pix<=0] = bad_num
                 tmp_height_std_pix[np.isinf(tmp_height_std_pix)] = bad_num
                 tmp_height_std_pix[np.isnan(tmp_height_std_pix)] = bad_num
-                self.height_std_pix = np.concatenate((self.height_std_pix, tmp_height_std_pix))
+                self.add_loaded_data("height_std_pix", tmp_height_std_pix)
             
                 # 7.5 - Compute height wrt the geoid and apply tide corrections
                 # Compute indices of PIXC for which corrections are all valid
@@ -909,14 +941,38 @@ class PixCEdgeSwath(object):
                                                        - tmp_solid_earth_tide[ind_valid_corr] \
                                                        - tmp_pole_tide[ind_valid_corr] \
                                                        - tmp_load_tide_fes[ind_valid_corr]
-                self.corrected_height = np.concatenate((self.corrected_height, tmp_corrected_height))
+                self.add_loaded_data("corrected_height", tmp_corrected_height)
     
             # 8 - Close file
             pixc_edge_reader.close()
 
             retour = out_nb_pix, out_tile_number, out_nb_pix_azimuth, out_near_range, out_slant_range_spacing
 
+        # 9 - Record loading time of the file
+        self.load_time[in_laketile_edge_filename] = time.time() - start_time
+        logger.debug("File %s loaded in %.3f s" % (in_laketile_edge_filename, self.load_time[in_laketile_edge_filename]))
+
         return retour
+    
+    def add_loaded_data(self, in_name, in_value):
+        """
+        Store the values of a variable loaded from a LakeTile_edge file, to be appended to the attribute in_name
+        by concatenate_loaded_data
+        
+        :param in_name: name of the attribute of the object
+        :type in_name: string
+        :param in_value: values loaded from the current LakeTile_edge file
+        :type in_value: 1D-array
+        """
+        self.loaded_data.setdefault(in_name, []).append(in_value)
+    
+    def concatenate_loaded_data(self):
+        """
+        Append the values stored by add_loaded_data to the corresponding attributes, with a single concatenation per attribute
+        """
+        for name, list_values in self.loaded_data.items():
+            setattr(self, name, np.concatenate([getattr(self, name)] + list_values))
+        self.loaded_data = {}
         
     # ----------------------------------------
 
@@ -990,10 +1046,10 @@ class PixCEdgeSwath(object):
         else:
 
             labels_tmp = np.zeros(self.labels.shape, dtype=self.labels.dtype)
-            labels, count = np.unique(self.labels, return_counts=True)
+            label_index = my_tools.LabelIndex(self.labels)
 
-            for i, label in enumerate(labels):
-                idx = np.where(self.labels == label)
+            for label in label_index.labels:
+                idx = label_index.get_index(label)
                 subset_pixel_area = self.pixel_area[idx]
 
                 if np.sum(subset_pixel_area) > min_object_size:
@@ -1007,11 +1063,15 @@ class PixCEdgeSwath(object):
                                                                                          subset_height, subset_pixel_area,
                                                                                          min_object_size, seg_method)
 
-                    labels_tmp[self.labels == label] = np.max(labels_tmp) + relabel_obj
+                    labels_tmp[idx] = np.max(labels_tmp) + relabel_obj
                 else:
-                    labels_tmp[self.labels == label] = np.max(labels_tmp) + 1
+                    labels_tmp[idx] = np.max(labels_tmp) + 1
 
             self.labels = labels_tmp
+            
+        # 5 - Index pixels of each label, shared by all the per-object processings
+        self.label_index = my_tools.LabelIndex(self.labels)
+        self.lake_tile_label = None
 
 
     # ----------------------------------------
@@ -1155,6 +1215,8 @@ class PixCEdgeSwath(object):
         # it contains the labels of all pixels within the subset defined the azimuth buffer
 
         in_new_labels_subset_unique = np.unique(in_new_labels_subset)
+        new_labels_index1 = my_tools.LabelIndex(in_new_labels_subset1)
+        new_labels_index2 = my_tools.LabelIndex(in_new_labels_subset2)
 
         # correspondance contains a list of tuples. Each tuple will correspond to a new entity and will contains the old labels of tiles 1 and 2
         correspondance = []
@@ -1162,8 +1224,8 @@ class PixCEdgeSwath(object):
         # Matching the labels of the subset of tile 1 and 2
         for new_l in in_new_labels_subset_unique:
             # get old labels (lake tile labels) of tiles 1 et 2
-            old_l1 = np.unique(old_labels_subset1[np.where(in_new_labels_subset1 == new_l)])
-            old_l2 = np.unique(old_labels_subset2[np.where(in_new_labels_subset2 == new_l)])
+            old_l1 = np.unique(old_labels_subset1[new_labels_index1.get_index(new_l)])
+            old_l2 = np.unique(old_labels_subset2[new_labels_index2.get_index(new_l)])
 
             # Most current case: at one label of tile1 corresponds one label of tile 2
             if old_l1.size == 1 and old_l2.size == 1:
@@ -1205,49 +1267,41 @@ class PixCEdgeSwath(object):
         unique_label = np.arange(len(label_matched)).astype('int') + max(self.labels) + 1
         # local labels from half edge tiles 1 and 2 are moved into new labels global only for Lake_sp processings
         # Ex: label_matched: [([a, b],[r,s,t]),([c,d],[u])]
-        # The for loop iterates over entities at current tile edge
-        for idx, (label_tile_1, label_tile_2) in enumerate(label_matched):
-            # l contains the tuple corresponding to the idx^th entity
-            # Ex: l: ([a, b], [r, s, t])
-
-            # new_labels[idx] contains a label specefic for lake_SP processings
-            new_label = unique_label[idx]
-            if label_tile_1:
-                for old_l1 in label_tile_1:
-                    # At one label of tile 2 do not corresponds a label of tile 1. The case happens when the lake is entierly located at
-                    # the boundary of on tile bot does not cross the border.
-                    # In this case, old_l1 is setted to None, then, it is not processed.
-                    if old_l1:
-                        # Get label of entity already computed in the case of a lake covering more than two tiles
-                        labels_concerned = np.unique(self.labels[in_tile_idx1][np.where(np.logical_and(self.edge_label[in_tile_idx1] == old_l1,
-                                                                                                       self.edge_loc[in_tile_idx1] == 2))])
-                        # Deleting label = 0 as those label are not already computed
-                        labels_concerned = np.delete(labels_concerned, np.where(labels_concerned == 0))
-                        # For each already processed and more than two tile lake, update the global labels
-                        for label_to_relabel in labels_concerned:
-                            self.labels[np.where(self.labels == label_to_relabel)] = new_label
-
-                        # Set global label
-                        self.labels[in_tile_idx1[np.where(self.edge_label[in_tile_idx1] == old_l1)]] = new_label
-
-            if label_tile_2:
-                for old_l2 in label_tile_2:
-                    # At one label of tile 1 do not corresponds a label of tile 2. The case happens when the lake is entierly 
-                    # located at the boundary of on tile bot does not cross the border.
-                    # In this case, old_l2 is setted to None, then, it is not processed.
-                    if old_l2:
-                        # Get label of entity already computed in the case of a lake covering more than two tiles
-                        labels_concerned = (np.unique(self.labels[in_tile_idx2][np.where(np.logical_and(self.edge_label[in_tile_idx2] == old_l2,
-                                                                                                        self.edge_loc[in_tile_idx2] == 2))]))
-                        # Deleting label = 0 as those label are not already computed
-                        labels_concerned = np.delete(labels_concerned, np.where(labels_concerned == 0))
-
-                        # For each already processed and more than two tile lake, update the global labels
-                        for label_to_relabel in labels_concerned:
-                            self.labels[np.where(self.labels == label_to_relabel)] = new_label
-
-                        # Set global label
-                        self.labels[in_tile_idx2[np.where(self.edge_label[in_tile_idx2] == old_l2)]] = new_label
+        # Entity index of each pixel of tiles 1 and 2 (-1 if the pixel doesn't belong to an entity at current tile edge)
+        # NB: None (i.e. no correspondance in the other tile) and 0 labels are not processed
+        entity_idx1 = get_entity_index(self.edge_label[in_tile_idx1], [label_tile_1 for (label_tile_1, _) in label_matched])
+        entity_idx2 = get_entity_index(self.edge_label[in_tile_idx2], [label_tile_2 for (_, label_tile_2) in label_matched])
+        
+        # Global labels already computed in the case of a lake covering more than two tiles (edge_loc = 2),
+        # linked to the entities at current tile edge; label = 0 is not already computed
+        tile_idx = np.concatenate((in_tile_idx1, in_tile_idx2))
+        entity_idx = np.concatenate((entity_idx1, entity_idx2))
+        flag_concerned = (entity_idx >= 0) & (self.edge_loc[tile_idx] == 2) & (self.labels[tile_idx] != 0)
+        entity_label_pairs = np.unique(np.stack((entity_idx[flag_concerned], 
+                                                 self.labels[tile_idx][flag_concerned].astype(np.int64)), axis=1), axis=0)
+        
+        # Entities linked through already computed global labels are gathered, and get the new label of the last of them
+        entity_set = my_tools.DisjointSet()
+        for (idx, label_concerned) in entity_label_pairs:
+            entity_set.union((0, idx), (1, label_concerned))
+        group_label = {}
+        for group in entity_set.get_groups():
+            new_label = unique_label[max([idx for (node_type, idx) in group if node_type == 0])]
+            for node in group:
+                group_label[node] = new_label
+        
+        # Update the global labels already computed, in one lookup over the whole swath
+        if entity_label_pairs.size > 0:
+            labels_concerned = np.unique(entity_label_pairs[:, 1])
+            labels_concerned_new = np.array([group_label[(1, label)] for label in labels_concerned])
+            pos = np.clip(np.searchsorted(labels_concerned, self.labels), 0, labels_concerned.size - 1)
+            flag_relabel = labels_concerned[pos] == self.labels
+            self.labels[flag_relabel] = labels_concerned_new[pos[flag_relabel]]
+        
+        # Set global label of the pixels of the entities at current tile edge
+        entity_new_label = np.array([group_label.get((0, idx), unique_label[idx]) for idx in range(len(label_matched))])
+        flag_entity = entity_idx >= 0
+        self.labels[tile_idx[flag_entity]] = entity_new_label[entity_idx[flag_entity]]
 
         nb_edge_entities = np.unique(np.concatenate((self.labels[in_tile_idx1], self.labels[in_tile_idx2]))).size
 
@@ -1317,16 +1371,18 @@ class PixCEdgeSwath(object):
         :return: recomputed azimuth_idx of the lake
         :rtype: 1D-array of int
         """
-
-        tiles = np.unique(self.tile_index[in_indices])
-        lake_tile_idx = self.tile_index[in_indices]
+        
+        # 1 - Group pixels of the lake by tile
         lake_azimuth_idx = self.azimuth_index[in_indices]
+        concerned_tiles, tile_pos = np.unique(self.tile_index[in_indices], return_inverse=True)
+        
+        # 2 - Pixels of a tile are shifted by the number of azimuth lines (max azimuth + 1) of the lake in all previous tiles
+        max_azimuth = np.full(concerned_tiles.size, -1, dtype=lake_azimuth_idx.dtype)
+        np.maximum.at(max_azimuth, tile_pos, lake_azimuth_idx)
+        shift = np.zeros(concerned_tiles.size, dtype=lake_azimuth_idx.dtype)
+        shift[1:] = np.cumsum(max_azimuth[:-1] + 1)
 
-        for tile in tiles:
-            lake_azimuth_idx[np.where(lake_tile_idx > tile)] = lake_azimuth_idx[np.where(lake_tile_idx > tile)] +\
-                                                               max(self.azimuth_index[in_indices][np.where(lake_tile_idx == tile)]) + 1
-
-        return lake_azimuth_idx
+        return lake_azimuth_idx + shift[tile_pos]
 
     # ----------------------------------------
 
@@ -1340,28 +1396,24 @@ class PixCEdgeSwath(object):
         :return: recomputed range_idx of the lake
         :rtype: 1D-array of int
         """
-
-        out_range = []
-        range_tmp = self.range_index[in_indices]
-        tile_index_tmp = self.tile_index[in_indices]
-        concerned_tiles, counts = np.unique(tile_index_tmp, return_counts=True)
-        d_rg = 0
-        for i, tile_num in enumerate(concerned_tiles):
-
-            if i == 0:
-                out_range += list(range_tmp[np.where(tile_index_tmp == tile_num)])
-            else:
-                d_rg += self.compute_range_variation_between_tiles(concerned_tiles[i-1], concerned_tiles[i])
-                out_range += list(range_tmp[np.where(tile_index_tmp == tile_num)] - d_rg)
-        if min(out_range) != 0:
+        
+        # 1 - Group pixels of the lake by tile
+        concerned_tiles, tile_pos = np.unique(self.tile_index[in_indices], return_inverse=True)
+        
+        # 2 - Pixels of a tile are shifted by the cumulated variation of near range since the first tile of the lake
+        d_rg = np.zeros(concerned_tiles.size, dtype=int)
+        d_rg[1:] = np.cumsum(self.compute_range_variation_between_tiles(concerned_tiles[:-1], concerned_tiles[1:]))
+        out_range = self.range_index[in_indices] - d_rg[tile_pos]
+        if out_range.size > 0 and min(out_range) != 0:
             out_range = out_range + min(out_range)
 
-        return np.array(out_range)
+        return out_range
 
 
     def get_majority_pixels_tile_ref(self, in_lake_tile_label):
         """
         This fuction returns the tile reference of the tile containing the larger number of pixels with the given label.
+        The tile containing the larger number of pixels is computed once for all LakeTile_edge labels.
             
         :param in_lake_tile_label: labels of lake to process
         :type in_lake_tile_label: int
@@ -1370,11 +1422,12 @@ class PixCEdgeSwath(object):
         :rtype: string
         """
         
-        # 1 - Get unique values and counts of tiles for pixels with edge_label in_lake_tile_label
-        unique, counts = np.unique(self.tile_index[np.where(self.edge_label == in_lake_tile_label)], return_counts = True)
+        # 1 - Compute, for each LakeTile_edge label, the tile containing the max number of pixels, if not already done
+        if self.edge_label_tile_ref is None:
+            self.edge_label_tile_ref = my_tools.LabelIndex(self.edge_label).get_mode(self.tile_index)
 
         # 2 - Get tile ref corresponding to the max number of pixels
-        out_tile_max_pix = str(unique[np.where(counts == max(counts))][0]).rjust(3, str('0')) + self.swath_side
+        out_tile_max_pix = str(self.edge_label_tile_ref[in_lake_tile_label]).rjust(3, str('0')) + self.swath_side
 
         return out_tile_max_pix
         
@@ -1385,6 +1438,7 @@ class PixCEdgeSwath(object):
         This function is designed to retrieve old labels of PGE_LakeTile. 
         The given new label corresponds to a global label, corresponding to several old labels.
         The old label involving the largest number of pixels is return.
+        The old label involving the largest number of pixels is computed once for all new labels.
             
         :param in_new_label: global new label
         :type in_new_label: int
@@ -1392,54 +1446,40 @@ class PixCEdgeSwath(object):
         :return: LakeTile_edge label involving the largest number of pixels
         :rtype: string
         """
+        
+        # 1 - Compute, for each new label, the LakeTile_edge label involving the max number of pixels, if not already done
+        if self.lake_tile_label is None:
+            if self.label_index is None:
+                self.label_index = my_tools.LabelIndex(self.labels)
+            self.lake_tile_label = self.label_index.get_mode(self.edge_label)
 
-        # 1 - Get tiles concerned by the current new label
-        tiles_concerned = np.unique(self.tile_index[np.where(self.labels == in_new_label)])
-
-        nb_max_pix = 0
-        out_final_label = 0
-
-        for tile in tiles_concerned:
-
-            # 2 - Get indices of in_new_label pixels in tile
-            label_idx = np.where(self.labels == in_new_label)
-
-            # 3 - Get lake_tile label value and number of pixels
-            # unique, count = np.unique(self.edge_label[tile_idx], return_counts=True)
-            unique, idx = np.unique(self.edge_label[label_idx], return_inverse=True)
-            count = np.bincount(idx)
-            np_max_pix_tmp = np.max(count)
-            label_max_pix_tmp = unique[np.where(count == np_max_pix_tmp)][0]
-
-            if np_max_pix_tmp > nb_max_pix:
-                nb_max_pix = np_max_pix_tmp
-                out_final_label = label_max_pix_tmp
-
-        # 4 - Returns the lake tile label involving the largest number of pixels
-        return str(out_final_label)
+        # 2 - Returns the lake tile label involving the largest number of pixels
+        return str(self.lake_tile_label.get(in_new_label, 0))
 
     # ----------------------------------------
 
     def compute_range_variation_between_tiles(self, tile_num1, tile_num2):
         """
         This function is designed to compute the variation of the first pixels in range between tiles 1 and 2.
+        Tile numbers may also be given as arrays, to compute the variations between several pairs of tiles at once.
 
         :param tile_num1: number of tile 1
-        :type tile_num1: int
+        :type tile_num1: int or 1D-array of int
         :param tile_num2: number of tile 2
-        :type tile_num2: int
+        :type tile_num2: int or 1D-array of int
 
         :return: variation of near range in pixels.
-        :rtype: int
+        :rtype: int or 1D-array of int
         """
-        idx1 = self.tile_num.index(tile_num1)
-        idx2 = self.tile_num.index(tile_num2)
-        near_range1 = self.near_range[idx1]
-        near_range2 = self.near_range[idx2]
-        slant_range_spacing = self.slant_range_spacing[idx1]
+        idx1 = self.get_tile_position(tile_num1)
+        idx2 = self.get_tile_position(tile_num2)
+        near_range = np.asarray(self.near_range)
+        slant_range_spacing = np.asarray(self.slant_range_spacing)
 
-        delta_near_range = np.rint((near_range1-near_range2)/slant_range_spacing)
-        return int(delta_near_range)
+        delta_near_range = np.rint((near_range[idx1]-near_range[idx2])/slant_range_spacing[idx1]).astype(int)
+        if np.ndim(delta_near_range) == 0:
+            delta_near_range = int(delta_near_range)
+        return delta_near_range
 
     # ----------------------------------------
 
@@ -1453,14 +1493,40 @@ class PixCEdgeSwath(object):
         :return: near rang of tiles covering indices of pixels of lales
         :rtype: 1D-array of float
         """
-        near_range = []
-        concerned_tiles, counts = np.unique(self.tile_index[in_indices], return_counts=True)
-        for i, tile_num in enumerate(concerned_tiles):
-            idx = self.tile_num.index(tile_num)
-            near_range_tmp = self.near_range[idx]
-            near_range += [near_range_tmp] * counts[i]
+        return np.asarray(self.near_range, dtype=float)[self.get_tile_position(self.tile_index[in_indices])]
+
+    # ----------------------------------------
+
+    def get_tile_position(self, in_tile_num):
+        """
+        This function returns the position of tiles in the list of tile numbers (as tile_num.index(tile) would do)
 
-        return np.array(near_range)
+        :param in_tile_num: tile number(s)
+        :type in_tile_num: int or 1D-array of int
+
+        :return: position of each tile in tile_num
+        :rtype: int or 1D-array of int
+        """
+        logger = logging.getLogger(self.__class__.__name__)
+        
+        # 1 - Insertion position of each tile in the sorted list of tile numbers
+        tile_num = np.asarray(self.tile_num)
+        order = np.argsort(tile_num, kind="mergesort")
+        sorted_tile_num = tile_num[order]
+        list_tile_num = np.atleast_1d(in_tile_num)
+        pos = np.searchsorted(sorted_tile_num, list_tile_num)
+        
+        # 2 - Check that each tile is in the list (searchsorted gives a position even for missing tiles)
+        flag_found = pos < sorted_tile_num.size
+        flag_found[flag_found] = (sorted_tile_num[pos[flag_found]] == list_tile_num[flag_found])
+        if not flag_found.all():
+            message = "Tile(s) %s not in the list of tile numbers %s" % (np.unique(list_tile_num[~flag_found]), tile_num)
+            raise service_error.ProcessingError(message, logger)
+        
+        out_pos = order[pos]
+        if np.ndim(in_tile_num) == 0:
+            out_pos = out_pos[0]
+        return out_pos
 
     # ----------------------------------------
     
@@ -1590,100 +1656,96 @@ class PixCEdgeSwath(object):
 #######################################
 
 
-def match_labels(in_liste):
+def get_entity_index(in_labels, in_list_entities):
     """
-    This function reorganise labels in order to group labels by entities
-        
-    :param IN_liste: ex: [(a, r), (a, s), (b, s), (b, t), (c, u), (d, u)]. Labels a, b and r, s, t belong to the same entity, labels c, d, u belong to a separate entity.
+    Retrieve the entity of each label, in one lookup
     
-    :return: labels gathered by entities
-             ex: [(set([a, b]), set([r, s, t])), (set([c, d]), set([u]))] <=> [([a, b], [r, s, t]), ([c, d], [u])]
-    """
-    labels_list = group_by_second(group_by_first(in_liste))
-    labels_match_out = []
-    for (set_label_tile1, set_label_tile2) in labels_list:
-
-        if set_label_tile1 == set([None]):
-            for label in set_label_tile2:
-                labels_match_out.append((set_label_tile1, set([label])))
-        elif set_label_tile2 == set([None]):
-            for label in set_label_tile1:
-                labels_match_out.append((set([label]), None))
-        else:
-            set_label_tile1.discard(None)
-            set_label_tile2.discard(None)
-            labels_match_out.append((set_label_tile1, set_label_tile2))
-
-    return labels_match_out
-
-
-def group_by_first(in_liste):
-    """
-    This function take a list of tuples. The list is grouped by the first element of tuple and returned as a dictionary.
-        
-    :param IN_liste: la list of tuple. Ex: [ (a, r), (b, r),  (c, s), (c, t)]
+    :param in_labels: labels of the pixels
+    :type in_labels: 1D-array of int
+    :param in_list_entities: labels gathered by entities, as given by match_labels for one tile; None and 0 labels are ignored
+    :type in_list_entities: list of set
     
-    :return out_dico: ex: {a: set([r]), b: set([r]), c: set([t]}
+    :return: out_entity_idx = index in in_list_entities of the entity of each pixel (-1 if the label belongs to no entity)
+    :rtype: out_entity_idx = 1D-array of int
     """
-
-    out_dico = {}
     
-    for (ind_i, ind_j) in in_liste:
-        if ind_i not in out_dico:
-            out_dico[ind_i] = set()
-        out_dico[ind_i].add(ind_j)
-
-    return out_dico
-
-
-def group_by_second(in_dict):
-    """
-    This function take a dictionary. The dictionary is grouped by second elements and returned as a list of tuple of set.
-        
-    :param in_dict: result of group by first function: {a: set([r]), b: set([r]), c: set([t]}
+    # 1 - Label of tile -> entity index
+    list_labels = []
+    list_idx = []
+    for (idx, set_labels) in enumerate(in_list_entities):
+        for label in set_labels:
+            if label:
+                list_labels.append(label)
+                list_idx.append(idx)
     
-    :return: a list of tuple of set. ex: [(set([a, b]), set([r])), (set([c]), set([s, t]))]
-    """
-    
-    # Init
-    out_results = []
+    # 2 - Lookup of pixels labels
+    out_entity_idx = np.full(in_labels.shape, -1, dtype=np.int64)
+    if list_labels:
+        entity_labels = np.array(list_labels)
+        entity_idx = np.array(list_idx, dtype=np.int64)
+        sorter = np.argsort(entity_labels)
+        entity_labels = entity_labels[sorter]
+        entity_idx = entity_idx[sorter]
+        pos = np.clip(np.searchsorted(entity_labels, in_labels), 0, entity_labels.size - 1)
+        flag_found = entity_labels[pos] == in_labels
+        out_entity_idx[flag_found] = entity_idx[pos[flag_found]]
     
-    for key, value in list(in_dict.items()):
-        
-        has_been_found = False
-        
-        for ind, result in enumerate(out_results):
-            if checklist_inter(value, result):
-                has_been_found = True
-                out_results[ind] = merge(result, key, value)
-
-        if not has_been_found:
-            out_results.append((set([key]), value))
-            
-    return out_results
+    return out_entity_idx
 
 
-def checklist_inter(in_value, in_result):
+def match_labels(in_liste):
     """
-    Check if an element of value is contained in result
+    This function reorganise labels in order to group labels by entities
+    Labels of tile 1 and tile 2 linked by a tuple are gathered using a disjoint-set (union-find) structure
         
-    :param in_value: a set of elements ex: set([r])
-    :param in_result: a tuple of set ex: (set([a]), set([r]))
+    :param IN_liste: ex: [(a, r), (a, s), (b, s), (b, t), (c, u), (d, u)]. Labels a, b and r, s, t belong to the same entity, labels c, d, u belong to a separate entity.
+                     None is used when a label of a tile has no correspondance in the other tile, ex: (e, None) or (None, v)
     
-    :return: set([r])
-    """
-    return in_result[1].intersection(in_value)
-
-
-def merge(in_result, in_key, in_value):
+    :return: labels gathered by entities, ordered by first appearance of the label of tile 1 (None included) in IN_liste
+             ex: [(set([a, b]), set([r, s, t])), (set([c, d]), set([u]))] <=> [([a, b], [r, s, t]), ([c, d], [u])]
+             a label without correspondance is alone in its entity, with an empty set for the other tile
+             ex: (set([e]), set()) or (set(), set([v]))
+             
+    NB: contrary to the former grouping (group_by_first + group_by_second), None is not considered as a label:
+        - labels are not gathered because they both have no correspondance in the other tile, 
+          ex: [(a, r), (a, None), (b, None)] gives [({a}, {r}), ({b}, set())] instead of [({a, b}, {r})]
+        - entities are gathered transitively, a label linked to 2 entities merges them instead of being copied in both,
+          ex: [(a, r), (b, s), (c, r), (c, s)] gives [({a, b, c}, {r, s})] instead of [({a, c}, {r, s}), ({b, c}, {r, s})]
     """
-    Merge value with element of tuple key in result.
-        
-    :param in_result: a tuple of set ex: (set([a]), set([r]))
-    :param in_key: key of first element of tuple. ex: b
-    :param in_value: set to merge ex: set([r])
     
-    :return: merged tuple of set. ex:set([a, b]), set([r])
-    """
-    return (in_result[0].union(set([in_key])), in_result[1].union(in_value))
+    # 1 - Group labels of tile 2 by label of tile 1, in order of first appearance
+    dict_first = {}
+    for (label1, label2) in in_liste:
+        dict_first.setdefault(label1, []).append(label2)
+    
+    # 2 - Gather linked labels; labels are identified by their tile number (1 or 2) to avoid mixing both tiles
+    # NB: labels without correspondance in the other tile are added all together, when the first of them is met,
+    #     in order to keep the order of entities of the former grouping
+    list_alone1 = []
+    for label1, list_label2 in dict_first.items():
+        if label1 is not None and set(list_label2) == set([None]):
+            list_alone1.append(label1)
+    label_set = my_tools.DisjointSet()
+    for label1, list_label2 in dict_first.items():
+        if label1 is None:
+            for label2 in set(list_label2):
+                label_set.add((2, label2))
+        elif set(list_label2) == set([None]):
+            # All labels without correspondance are added when the first of them is met, next ones are already added
+            for label_alone1 in list_alone1:
+                label_set.add((1, label_alone1))
+            list_alone1 = []
+        else:
+            label_set.add((1, label1))
+            for label2 in list_label2:
+                if label2 is not None:
+                    label_set.union((1, label1), (2, label2))
+    
+    # 3 - Format output
+    labels_match_out = []
+    for group in label_set.get_groups():
+        set_label_tile1 = set([label for (tile, label) in group if tile == 1])
+        set_label_tile2 = set([label for (tile, label) in group if tile == 2])
+        labels_match_out.append((set_label_tile1, set_label_tile2))
 
+    return labels_match_out
@@ -32,6 +32,7 @@ import logging
 import numpy as np
 import os
 
+import cnes.common.lib.my_netcdf_file as my_nc
 import cnes.common.lib.my_tools as my_tools
 import cnes.common.lib_lake.locnes_filenames as my_names
 import cnes.common.lib_lake.proc_pixc_vec as proc_pixc_vec
@@ -134,6 +135,8 @@ class PixCVecSwath(object):
         """
         This function updates PIXCVec netcdf files obtained in output of PGE_LakeTile with improved longitude, latitude, 
         height and lake_tile_id or prior_id if exists.
+        Edge pixels are indexed by tile once, then files are processed one at a time.
+        Files of tiles whose major continent is not the current continent are not written, so they are not loaded.
         
         :param in_output_dir: full path of the output directory
         :type in_output_dir: string
@@ -144,8 +147,21 @@ class PixCVecSwath(object):
         """
         logger = logging.getLogger(self.__class__.__name__)
         
+        # 0 - Index edge pixels by tile, once for all LakeTile_PIXCVec files
+        tile_label_index = my_tools.LabelIndex(self.obj_pixc_edge_sp.tile_index)
+        
         # Loop over LakeTile_PIXCVec input files
         for lake_tile_pixcvec_file in self.lake_tile_pixcvec_file_list:
+            
+            # 0.1 - Get list of continent identifiers of current LakeTile_PIXCVec
+            pixcvec_reader = my_nc.MyNcReader(lake_tile_pixcvec_file)
+            list_continent_id = str(pixcvec_reader.get_dict_att().get("continent_id", "")).split(";")
+            pixcvec_reader.close()
+            # 0.2 - PIXCVec file is written only if major continent of tile corresponds to current continent processed
+            if list_continent_id[0] != self.continent_id:
+                logger.info("File %s not updated: major continent %s is not the current continent" % (lake_tile_pixcvec_file, list_continent_id[0]))
+                continue
+            
             logger.info("Updating file %s" % lake_tile_pixcvec_file)
             
             # 1.1 - Compute output PIXCVec file full path
@@ -161,34 +177,31 @@ class PixCVecSwath(object):
             obj_pixcvec = proc_pixc_vec.PixelCloudVec("SP")
             obj_pixcvec.set_from_pixcvec_file(lake_tile_pixcvec_file)
 
-            # 4 - Get list of continent identifiers of current LakeTile_PIXCVec
-            list_continent_id = obj_pixcvec.pixcvec_metadata["continent_id"].split(";")
+            # 4 - Get corresponding obj_pixc_edge_sp tile_idx
+            pixc_sp_idx = tile_label_index.get_index(tile_number)
 
-            # 5 - Get corresponding obj_pixc_edge_sp tile_idx
-            pixc_sp_idx = np.where(self.obj_pixc_edge_sp.tile_index == tile_number)[0]
-
-            # 6 - Update PIXCVec info
-            if pixc_sp_idx.any():  # Only when pixels need to be updated
+            # 5 - Update PIXCVec info
+            if pixc_sp_idx.size > 0:  # Only when pixels need to be updated
                 logger.debug("Updating %d pixels of LakeTile_PIXCVec file" % pixc_sp_idx.size)
 
-                # 6.1 - Retrieve corresponding indices in original PIXC
+                # 5.1 - Retrieve corresponding indices in original PIXC
                 pixc_tile_idx = self.obj_pixc_edge_sp.edge_index[pixc_sp_idx]
 
-                # 6.2 - Update geolocation information if computed
+                # 5.2 - Update geolocation information if computed
                 if self.cfg.getboolean('CONFIG_PARAMS', 'IMP_GEOLOC'):
                     obj_pixcvec.longitude_vectorproc[pixc_tile_idx] = self.longitude_vectorproc[pixc_sp_idx]
                     obj_pixcvec.latitude_vectorproc[pixc_tile_idx] = self.latitude_vectorproc[pixc_sp_idx]
                     obj_pixcvec.height_vectorproc[pixc_tile_idx] = self.height_vectorproc[pixc_sp_idx]
 
-                # 6.3 - Update identifiers
+                # 5.3 - Update identifiers
                 obj_pixcvec.lake_id[pixc_tile_idx] = self.lake_id[pixc_sp_idx]
                 obj_pixcvec.obs_id[pixc_tile_idx] = self.obs_id[pixc_sp_idx]
                 
-                # 6.4 - Update ice flags
+                # 5.4 - Update ice flags
                 obj_pixcvec.ice_clim_f[pixc_tile_idx] = self.ice_clim_f[pixc_sp_idx]
                 obj_pixcvec.ice_dyn_f[pixc_tile_idx] = self.ice_dyn_f[pixc_sp_idx]
                 
-                # 6.5 - Update time_coverage_start and _end global attributes
+                # 5.5 - Update time_coverage_start and _end global attributes
                 tmp_nadir_time = self.obj_pixc_edge_sp.nadir_time[pixc_sp_idx]
                 tmp_min = my_tools.convert_utc_to_str(min(tmp_nadir_time))
                 if tmp_min < obj_pixcvec.pixcvec_metadata["time_coverage_start"]:
@@ -200,12 +213,12 @@ class PixCVecSwath(object):
             else :
                 logger.debug("Updating 0 pixel of LakeTile_PIXCVec file")
 
-            # 7 - Write PIXCVec file only if major continent of tile corresponds to current continent processed
-            if list_continent_id[0] == self.continent_id:
-                
-                # 7.1 - Write PIXCVec file
-                obj_pixcvec.write_file(pixcvec_file, None)
+            # 6 - Write PIXCVec file
+            obj_pixcvec.write_file(pixcvec_file, None)
 
-                # 7.2 - Write associated shapefile if asked
-                if in_write_to_shp:
-                    obj_pixcvec.write_file_as_shp(pixcvec_file.replace('.nc', '.shp'), self.obj_pixc_edge_sp)
+            # 7 - Write associated shapefile if asked
+            if in_write_to_shp:
+                obj_pixcvec.write_file_as_shp(pixcvec_file.replace('.nc', '.shp'), self.obj_pixc_edge_sp)
+                
+            # 8 - Release the PIXCVec of the tile before loading the next one
+            del obj_pixcvec
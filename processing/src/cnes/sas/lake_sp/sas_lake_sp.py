@@ -29,11 +29,22 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
+import multiprocessing as mp
 import cnes.common.lib.my_timer as my_timer
+import cnes.common.lib.my_tools as my_tools
+import cnes.common.service_config_file as service_config_file
 import cnes.common.service_error as service_error
 import numpy as np
 
 
+# Name of each swath side
+SWATH_NAME = {"L": "Left", "R": "Right"}
+# Variables of PixCEdgeSwath updated by the processing of a swath, sent back from a worker process
+LIST_PIXC_VAR_UPDATED = ["labels", "interferogram_flattened"]
+# Variables of PixCVecSwath updated by the processing of a swath, sent back from a worker process
+LIST_PIXCVEC_VAR_UPDATED = ["longitude_vectorproc", "latitude_vectorproc", "height_vectorproc", "obs_id", "lake_id"]
+
+
 class SASLakeSP(object):
     """
     Class handling LakeSP SAS
@@ -56,6 +67,9 @@ class SASLakeSP(object):
         logger = logging.getLogger(self.__class__.__name__)
         logger.info("")
 
+        # Get instance of service config file
+        self.cfg = service_config_file.get_instance()
+
         # Objects
         self.obj_lake_db = in_obj_lake_db  # Lake DB object
         self.obj_pixc_sp = in_obj_pixc_sp  # LakeTile_edge object
@@ -77,6 +91,8 @@ class SASLakeSP(object):
     def run_processing(self):
         """
         Process SAS_L2_HR_LakeSP
+        Both swaths are independent: if the "Parallel swaths" option is set, they are processed in 2 worker processes
+        and their results are merged back into the objects of the current process
         """
         logger = logging.getLogger(self.__class__.__name__)
         logger.sigmsg("")
@@ -89,49 +105,109 @@ class SASLakeSP(object):
 
         try :
             
-            # 1 - Processing left swath if there are pixels
-            logger.info("***** Processing Left Swath ******")
+            # 1 - List swaths with pixels to process
+            list_swath_side = []
+            for swath_side in ["L", "R"]:
+                if self.get_swath_objects(swath_side)[0].nb_pixels > 0:
+                    list_swath_side.append(swath_side)
+                else:
+                    logger.info("***** No pixel to process for %s swath ******" % SWATH_NAME[swath_side])
             
-            if self.obj_pixc_sp.pixc_edge_l.nb_pixels > 0:
-
-                # 1.1 - Gather edge pixels in separate entities for all the tiles of this swath
-                logger.info("1 - Gathering edge pixels in separate entities for all the tiles of this swath...")
-                self.obj_pixc_sp.pixc_edge_l.swath_global_relabeling()
-                logger.info("" + timer_proc.info(0))
-                logger.info("")
-
-                # 1.2 - Compute LakeSP product for this swath
-                logger.info("2 - Computing LakeSP features for this swath...")
-                self.obj_lake.swath_l.compute_lake_features(np.unique(self.obj_pixc_sp.pixc_edge_l.labels))
-                logger.info("" + timer_proc.info(0))
-                logger.info("")
-
-            else:
-                logger.info("No pixel to process for this swath")
-
-            # 2 - Processing right swath if there are pixels
-            logger.info("***** Processing Right Swath ******")
+            # 2 - Process swaths
+            flag_parallel = self.cfg.getboolean("OPTIONS", "Parallel swaths", fallback=False) and (len(list_swath_side) > 1)
+            if flag_parallel and mp.current_process().daemon:
+                logger.debug("Already in a worker of a multiprocessing pool => swaths processed sequentially")
+                flag_parallel = False
             
-            if self.obj_pixc_sp.pixc_edge_r.nb_pixels > 0:
-
-                # 2.1 - Gather edge pixels in separate entities for all the tiles of this swath
-                logger.info("1 - Gathering edge pixels in separate entities for all the tiles of this swath...")
-                self.obj_pixc_sp.pixc_edge_r.swath_global_relabeling()
+            if flag_parallel:
+                logger.info("***** Processing Left and Right Swaths in parallel ******")
+                # Objects are inherited by the forked workers, only the swath side is sent to them
+                with mp.get_context("fork").Pool(len(list_swath_side), initializer=init_swath_worker, initargs=(self,)) as pool:
+                    list_results = pool.map(process_swath_in_worker, list_swath_side, chunksize=1)
+                for swath_side, swath_results in zip(list_swath_side, list_results):
+                    self.set_swath_results(swath_side, swath_results)
                 logger.info("" + timer_proc.info(0))
                 logger.info("")
-
-                # 2.2 - Compute LakeSP product for this swath
-                logger.info("2 - Computing LakeSP features for this swath...")
-                self.obj_lake.swath_r.compute_lake_features(np.unique(self.obj_pixc_sp.pixc_edge_r.labels))
-                logger.info("" + timer_proc.info(0))
-                logger.info("")
-
+                
             else:
-                logger.info("No pixel to process for this swath")
+                for swath_side in list_swath_side:
+                    logger.info("***** Processing %s Swath ******" % SWATH_NAME[swath_side])
+                    self.process_swath(swath_side)
+                    logger.info("" + timer_proc.info(0))
+                    logger.info("")
 
         except:
             message = "Something wrong happened in run_processing"
             raise service_error.SASLakeSpError(message, logger)
+            
+    def get_swath_objects(self, in_swath_side):
+        """
+        Get the objects related to a swath
+        
+        :param in_swath_side: R=Right L=Left swath side
+        :type in_swath_side: string
+        
+        :return: PixCEdgeSwath, PixCVecSwath and LakeProduct objects of the swath
+        :rtype: tuple
+        """
+        if in_swath_side == "L":
+            retour = self.obj_pixc_sp.pixc_edge_l, self.obj_pixcvec_sp.pixcvec_l, self.obj_lake.swath_l
+        else:
+            retour = self.obj_pixc_sp.pixc_edge_r, self.obj_pixcvec_sp.pixcvec_r, self.obj_lake.swath_r
+        return retour
+            
+    def process_swath(self, in_swath_side):
+        """
+        Process a swath: gather edge pixels in entities and compute the related LakeSP features
+        
+        :param in_swath_side: R=Right L=Left swath side
+        :type in_swath_side: string
+        """
+        logger = logging.getLogger(self.__class__.__name__)
+        obj_pixc_edge, _, obj_swath = self.get_swath_objects(in_swath_side)
+
+        # 1 - Gather edge pixels in separate entities for all the tiles of this swath
+        logger.info("1 - Gathering edge pixels in separate entities for all the tiles of %s swath..." % SWATH_NAME[in_swath_side])
+        obj_pixc_edge.swath_global_relabeling()
+
+        # 2 - Compute LakeSP product for this swath
+        logger.info("2 - Computing LakeSP features for %s swath..." % SWATH_NAME[in_swath_side])
+        obj_swath.compute_lake_features(np.unique(obj_pixc_edge.labels))
+            
+    def get_swath_results(self, in_swath_side):
+        """
+        Get the results of the processing of a swath, to send them back from a worker process
+        
+        :param in_swath_side: R=Right L=Left swath side
+        :type in_swath_side: string
+        
+        :return: variables of PixCEdgeSwath and PixCVecSwath objects updated by the processing, and content of the LakeProduct object
+        :rtype: dict
+        """
+        obj_pixc_edge, obj_pixcvec, obj_swath = self.get_swath_objects(in_swath_side)
+        retour = {}
+        retour["pixc"] = {name: getattr(obj_pixc_edge, name) for name in LIST_PIXC_VAR_UPDATED}
+        retour["pixcvec"] = {name: getattr(obj_pixcvec, name) for name in LIST_PIXCVEC_VAR_UPDATED}
+        retour["lake"] = obj_swath.export_content()
+        return retour
+            
+    def set_swath_results(self, in_swath_side, in_results):
+        """
+        Set the results of the processing of a swath, computed in a worker process
+        
+        :param in_swath_side: R=Right L=Left swath side
+        :type in_swath_side: string
+        :param in_results: results of the processing (see get_swath_results)
+        :type in_results: dict
+        """
+        obj_pixc_edge, obj_pixcvec, obj_swath = self.get_swath_objects(in_swath_side)
+        for name, value in in_results["pixc"].items():
+            setattr(obj_pixc_edge, name, value)
+        obj_pixc_edge.label_index = my_tools.LabelIndex(obj_pixc_edge.labels)
+        obj_pixc_edge.lake_tile_label = None
+        for name, value in in_results["pixcvec"].items():
+            setattr(obj_pixcvec, name, value)
+        obj_swath.import_content(in_results["lake"])
 
     def run_postprocessing(self):
         """
@@ -144,3 +220,35 @@ class SASLakeSP(object):
         logger.sigmsg("===========================")
         logger.sigmsg("")
         logger.info("NOTHING TO DO")
+
+
+#######################################
+
+
+# Context of the current worker process of the pool processing swaths
+# - sas_lake_sp / SASLakeSP: SASLakeSP object inherited from the parent process
+SWATH_WORKER_CONTEXT = {}
+
+
+def init_swath_worker(in_sas_lake_sp):
+    """
+    Initialize a worker process of the pool processing swaths (called once per worker)
+    
+    :param in_sas_lake_sp: SASLakeSP object
+    :type in_sas_lake_sp: SASLakeSP
+    """
+    SWATH_WORKER_CONTEXT["sas_lake_sp"] = in_sas_lake_sp
+
+
+def process_swath_in_worker(in_swath_side):
+    """
+    Process a swath, within a worker process of the pool processing swaths
+    
+    :param in_swath_side: R=Right L=Left swath side
+    :type in_swath_side: string
+    
+    :return: results of the processing of the swath (see SASLakeSP.get_swath_results)
+    :rtype: dict
+    """
+    SWATH_WORKER_CONTEXT["sas_lake_sp"].process_swath(in_swath_side)
+    return SWATH_WORKER_CONTEXT["sas_lake_sp"].get_swath_results(in_swath_side)
@@ -269,6 +269,7 @@ class PixelCloud(object):
         self.inundated_area = None  # Area of pixel where water
         self.height_std_pix = None  # Height std
         self.labels = None  # Vector of entity labels associated to each pixel
+        self.label_index = None  # Index of pixels of each entity label (my_tools.LabelIndex)
         self.nb_obj = None  # Number of separate entities
         self.labels_inside = None  # Labels of entities entirely inside the tile
         self.nb_obj_inside = None  # Number of entities inside the tile
@@ -332,19 +333,7 @@ class PixelCloud(object):
         self.looks_to_efflooks = np.float(self.pixc_metadata["looks_to_efflooks"])  
 
         # 3 - Create polygon of tile from global attributes
-        ring = ogr.Geometry(ogr.wkbLinearRing)
-        ring.AddPoint(my_tools.convert_to_m180_180(float(pixc_reader.get_att_value("inner_first_longitude"))),
-                                                   float(pixc_reader.get_att_value("inner_first_latitude")))
-        ring.AddPoint(my_tools.convert_to_m180_180(float(pixc_reader.get_att_value("outer_first_longitude"))),
-                                                   float(pixc_reader.get_att_value("outer_first_latitude")))
-        ring.AddPoint(my_tools.convert_to_m180_180(float(pixc_reader.get_att_value("outer_last_longitude"))), 
-                                                   float(pixc_reader.get_att_value("outer_last_latitude")))
-        ring.AddPoint(my_tools.convert_to_m180_180(float(pixc_reader.get_att_value("inner_last_longitude"))),
-                                                   float(pixc_reader.get_att_value("inner_last_latitude")))
-        ring.AddPoint(my_tools.convert_to_m180_180(float(pixc_reader.get_att_value("inner_first_longitude"))),
-                                                   float(pixc_reader.get_att_value("inner_first_latitude")))
-        self.tile_poly = ogr.Geometry(ogr.wkbPolygon)
-        self.tile_poly.AddGeometry(ring)
+        self.tile_poly = compute_tile_poly(pixc_reader)
 
         # Build line with azimuth = 0
         self.az_0_line = ogr.Geometry(ogr.wkbLineString)
@@ -360,7 +349,8 @@ class PixelCloud(object):
         self.az_max_line.AddPoint(my_tools.convert_to_m180_180(float(pixc_reader.get_att_value("outer_last_longitude"))),
                                                    float(pixc_reader.get_att_value("outer_last_latitude")))
 
-        # 4 - Retrieve high level variables
+        # 4 - Retrieve high level variables, needed at full size to select pixels
+        # Other variables are read hereafter only for selected pixels, by chunks (see my_nc.MyNcReader.get_var_value)
         # 4.1 - Classification flag
         self.origin_classif = pixc_reader.get_var_value("classification", in_group=pixc_group)
         # 4.2 - Range indices of water pixels
@@ -393,12 +383,14 @@ class PixelCloud(object):
         vars_to_look_for_nans["longitude"] = origin_longitude
         vars_to_look_for_nans["latitude"] = origin_latitude
         vars_to_look_for_nans["height"] = origin_height
+        flag_nan = np.zeros(tmp_classif.shape, dtype=bool)
         for var_name, var_value in vars_to_look_for_nans.items():
-            nan_idx = np.argwhere(np.isnan(var_value))
-            nb_nan = len(nan_idx)
+            cur_flag_nan = np.isnan(var_value)
+            nb_nan = np.count_nonzero(cur_flag_nan)
             if nb_nan != 0:
                 logger.info("%d pixels have NaN in %s variable => will be rejected" % (nb_nan, var_name))
-                tmp_classif[nan_idx] = 100 
+                flag_nan |= cur_flag_nan
+        tmp_classif[flag_nan] = 100
             
         # 5.3 - Build list of classification flags to keep
         list_classif_flags = set()
@@ -450,28 +442,28 @@ class PixelCloud(object):
             self.azimuth_index = self.origin_azimuth_index[self.selected_index]
             
             # Interferogram
-            interferogram = pixc_reader.get_var_value("interferogram", in_group=pixc_group)[self.selected_index]
+            interferogram = pixc_reader.get_var_value("interferogram", in_group=pixc_group, in_index=self.selected_index)
             self.interferogram = interferogram[:,0] + 1j*interferogram[:,1]
             self.interferogram_flattened = 0 * self.interferogram 
             # Sensitivity of height estimate to interferogram phase
-            self.power_plus_y = pixc_reader.get_var_value("power_plus_y", in_group=pixc_group)[self.selected_index]            
+            self.power_plus_y = pixc_reader.get_var_value("power_plus_y", in_group=pixc_group, in_index=self.selected_index)            
             # Sensitivity of height estimate to interferogram phase
-            self.power_minus_y = pixc_reader.get_var_value("power_minus_y", in_group=pixc_group)[self.selected_index]   
+            self.power_minus_y = pixc_reader.get_var_value("power_minus_y", in_group=pixc_group, in_index=self.selected_index)   
             
             # Water fraction
-            self.water_frac = pixc_reader.get_var_value("water_frac", in_group=pixc_group)[self.selected_index]
+            self.water_frac = pixc_reader.get_var_value("water_frac", in_group=pixc_group, in_index=self.selected_index)
             # Water fraction uncertainty
-            self.water_frac_uncert = pixc_reader.get_var_value("water_frac_uncert", in_group=pixc_group)[self.selected_index]
+            self.water_frac_uncert = pixc_reader.get_var_value("water_frac_uncert", in_group=pixc_group, in_index=self.selected_index)
             # False detection rate
-            self.false_detection_rate = pixc_reader.get_var_value("false_detection_rate", in_group=pixc_group)[self.selected_index]
+            self.false_detection_rate = pixc_reader.get_var_value("false_detection_rate", in_group=pixc_group, in_index=self.selected_index)
             # Missed detection rate
-            self.missed_detection_rate = pixc_reader.get_var_value("missed_detection_rate", in_group=pixc_group)[self.selected_index]
+            self.missed_detection_rate = pixc_reader.get_var_value("missed_detection_rate", in_group=pixc_group, in_index=self.selected_index)
             # Bright land flag
-            self.bright_land_flag = pixc_reader.get_var_value("bright_land_flag", in_group=pixc_group)[self.selected_index]
+            self.bright_land_flag = pixc_reader.get_var_value("bright_land_flag", in_group=pixc_group, in_index=self.selected_index)
             # Layover impact
-            self.layover_impact = pixc_reader.get_var_value("layover_impact", in_group=pixc_group)[self.selected_index]
+            self.layover_impact = pixc_reader.get_var_value("layover_impact", in_group=pixc_group, in_index=self.selected_index)
             # Number of rare looks
-            self.eff_num_rare_looks = pixc_reader.get_var_value("eff_num_rare_looks", in_group=pixc_group)[self.selected_index]
+            self.eff_num_rare_looks = pixc_reader.get_var_value("eff_num_rare_looks", in_group=pixc_group, in_index=self.selected_index)
             
             # Latitude
             self.latitude = origin_latitude[self.selected_index]
@@ -481,9 +473,9 @@ class PixelCloud(object):
             self.height = origin_height[self.selected_index]
             
             # Cross-track distance
-            self.cross_track = pixc_reader.get_var_value("cross_track", in_group=pixc_group)[self.selected_index]
+            self.cross_track = pixc_reader.get_var_value("cross_track", in_group=pixc_group, in_index=self.selected_index)
             # Pixel area
-            self.pixel_area = pixc_reader.get_var_value("pixel_area", in_group=pixc_group)[self.selected_index]
+            self.pixel_area = pixc_reader.get_var_value("pixel_area", in_group=pixc_group, in_index=self.selected_index)
             # Inundated area
             fractional_inundation = use_fractional_inundation.split(";")
             self.inundated_area = np.copy(self.pixel_area)
@@ -494,57 +486,57 @@ class PixelCloud(object):
                         logger.info("=> Use water fraction to compute pixel area for flag %d" % int(k))
                         self.inundated_area[ind_ok] = self.pixel_area[ind_ok] * self.water_frac[ind_ok]
             # Incidence angle
-            self.inc = pixc_reader.get_var_value("inc", in_group=pixc_group)[self.selected_index]
+            self.inc = pixc_reader.get_var_value("inc", in_group=pixc_group, in_index=self.selected_index)
             # Phase noise standard deviation
-            self.phase_noise_std = pixc_reader.get_var_value("phase_noise_std", in_group=pixc_group)[self.selected_index]
+            self.phase_noise_std = pixc_reader.get_var_value("phase_noise_std", in_group=pixc_group, in_index=self.selected_index)
             # Sensitivity of latitude estimate to interferogram phase
-            self.dlatitude_dphase = pixc_reader.get_var_value("dlatitude_dphase", in_group=pixc_group)[self.selected_index]
+            self.dlatitude_dphase = pixc_reader.get_var_value("dlatitude_dphase", in_group=pixc_group, in_index=self.selected_index)
             # Sensitivity of longitude estimate to interferogram phase
-            self.dlongitude_dphase = pixc_reader.get_var_value("dlongitude_dphase", in_group=pixc_group)[self.selected_index]
+            self.dlongitude_dphase = pixc_reader.get_var_value("dlongitude_dphase", in_group=pixc_group, in_index=self.selected_index)
             # Sensitivity of height estimate to interferogram phase
-            self.dheight_dphase = pixc_reader.get_var_value("dheight_dphase", in_group=pixc_group)[self.selected_index]
+            self.dheight_dphase = pixc_reader.get_var_value("dheight_dphase", in_group=pixc_group, in_index=self.selected_index)
             # Sensitivity of height estimate to range
-            self.dheight_drange = pixc_reader.get_var_value("dheight_drange", in_group=pixc_group)[self.selected_index]
+            self.dheight_drange = pixc_reader.get_var_value("dheight_drange", in_group=pixc_group, in_index=self.selected_index)
             # Sensitivity of pixel area to reference height
-            self.darea_dheight = pixc_reader.get_var_value("darea_dheight", in_group=pixc_group)[self.selected_index]
+            self.darea_dheight = pixc_reader.get_var_value("darea_dheight", in_group=pixc_group, in_index=self.selected_index)
             
             # Time of illumination of each pixel
             illumination_time = origin_illumination_time[self.selected_index]
             # Number of medium looks
-            self.eff_num_medium_looks = pixc_reader.get_var_value("eff_num_medium_looks", in_group=pixc_group)[self.selected_index]
+            self.eff_num_medium_looks = pixc_reader.get_var_value("eff_num_medium_looks", in_group=pixc_group, in_index=self.selected_index)
             
             # Dry troposphere vertical correction
-            self.model_dry_tropo_cor = pixc_reader.get_var_value("model_dry_tropo_cor", in_group=pixc_group)[self.selected_index]
+            self.model_dry_tropo_cor = pixc_reader.get_var_value("model_dry_tropo_cor", in_group=pixc_group, in_index=self.selected_index)
             # Wet troposphere vertical correction
-            self.model_wet_tropo_cor = pixc_reader.get_var_value("model_wet_tropo_cor", in_group=pixc_group)[self.selected_index]
+            self.model_wet_tropo_cor = pixc_reader.get_var_value("model_wet_tropo_cor", in_group=pixc_group, in_index=self.selected_index)
             # Ionosphere vertical correction
-            self.iono_cor_gim_ka = pixc_reader.get_var_value("iono_cor_gim_ka", in_group=pixc_group)[self.selected_index]
+            self.iono_cor_gim_ka = pixc_reader.get_var_value("iono_cor_gim_ka", in_group=pixc_group, in_index=self.selected_index)
             # Crossover calibration height correction
-            self.height_cor_xover = pixc_reader.get_var_value("height_cor_xover", in_group=pixc_group)[self.selected_index]
+            self.height_cor_xover = pixc_reader.get_var_value("height_cor_xover", in_group=pixc_group, in_index=self.selected_index)
             # Geoid
-            self.geoid = pixc_reader.get_var_value("geoid", in_group=pixc_group)[self.selected_index]
+            self.geoid = pixc_reader.get_var_value("geoid", in_group=pixc_group, in_index=self.selected_index)
             # Solid earth tide
-            self.solid_earth_tide = pixc_reader.get_var_value("solid_earth_tide", in_group=pixc_group)[self.selected_index]
+            self.solid_earth_tide = pixc_reader.get_var_value("solid_earth_tide", in_group=pixc_group, in_index=self.selected_index)
             # Load tide height (FES2014)
             try:
-                self.load_tide_fes = pixc_reader.get_var_value("load_tide_fes", in_group=pixc_group)[self.selected_index]
+                self.load_tide_fes = pixc_reader.get_var_value("load_tide_fes", in_group=pixc_group, in_index=self.selected_index)
             except:
-                self.load_tide_fes = pixc_reader.get_var_value("load_tide_sol1", in_group=pixc_group)[self.selected_index]
+                self.load_tide_fes = pixc_reader.get_var_value("load_tide_sol1", in_group=pixc_group, in_index=self.selected_index)
             # Load tide height (GOT4.10)
             try:
-                self.load_tide_got = pixc_reader.get_var_value("load_tide_got", in_group=pixc_group)[self.selected_index]
+                self.load_tide_got = pixc_reader.get_var_value("load_tide_got", in_group=pixc_group, in_index=self.selected_index)
             except:
-                self.load_tide_got = pixc_reader.get_var_value("load_tide_sol2", in_group=pixc_group)[self.selected_index]
+                self.load_tide_got = pixc_reader.get_var_value("load_tide_sol2", in_group=pixc_group, in_index=self.selected_index)
             # Pole tide height
-            self.pole_tide = pixc_reader.get_var_value("pole_tide", in_group=pixc_group)[self.selected_index]
+            self.pole_tide = pixc_reader.get_var_value("pole_tide", in_group=pixc_group, in_index=self.selected_index)
             
             # Quality flag
             # TODO: remove the try/except syntax where pixc_qual replaced by classification_qual in all simulators
             try:
-                self.classification_qual = pixc_reader.get_var_value("classification_qual", in_group=pixc_group)[self.selected_index]
+                self.classification_qual = pixc_reader.get_var_value("classification_qual", in_group=pixc_group, in_index=self.selected_index)
             except:
                 logger.warning("Remaining use of pixc_qual instead of classification_qual variable in PIXC product")
-                self.classification_qual = pixc_reader.get_var_value("pixc_qual", in_group=pixc_group)[self.selected_index]
+                self.classification_qual = pixc_reader.get_var_value("pixc_qual", in_group=pixc_group, in_index=self.selected_index)
 
             # 6.2 - In TVP group
             
@@ -664,28 +656,49 @@ class PixelCloud(object):
         else :
 
             labels_tmp = np.zeros(self.labels.shape, dtype=self.labels.dtype)
-            labels, count = np.unique(self.labels, return_counts=True)
-
-            for i, label in enumerate(labels):
-                idx = np.where(self.labels == label)
-                subset_pixel_area = self.pixel_area[idx]
-
-                if np.sum(subset_pixel_area) > min_object_size:
-                    min_rg = min(self.range_index[idx])
-                    min_az = min(self.azimuth_index[idx])
-                    subset_range = self.range_index[idx] - min_rg
-                    subset_azimuth = self.azimuth_index[idx] - min_az
-                    subset_corrected_height = self.corrected_height[idx]
-
-                    relabel_obj = my_segmentation.relabel_lake_using_segmentation_heigth(subset_range, subset_azimuth, subset_corrected_height,
-                                                                                         subset_pixel_area, min_object_size, seg_method)
-
-                    labels_tmp[self.labels == label] = np.max(labels_tmp) + relabel_obj
-                else :
-                    labels_tmp[self.labels == label] = np.max(labels_tmp) + 1
+            label_index = my_tools.LabelIndex(self.labels)
+            
+            if label_index.labels.size > 0:
+            
+                # 4.1.1 - Group pixel variables by label once; the subset of each label is then a slice
+                sorted_index = label_index.sorted_index
+                sorted_range = self.range_index[sorted_index]
+                sorted_azimuth = self.azimuth_index[sorted_index]
+                sorted_corrected_height = self.corrected_height[sorted_index]
+                sorted_pixel_area = self.pixel_area[sorted_index]
+                
+                # 4.1.2 - Select labels large enough to be segmented
+                label_area = np.add.reduceat(sorted_pixel_area, label_index.bounds[:-1])
+                ind_to_segment = np.where(label_area > min_object_size)[0]
+                logger.info("%d objects to segment following height" % ind_to_segment.size)
+                
+                # 4.1.3 - Segment them; other labels are kept as they are
+                nb_new_labels = np.ones(label_index.labels.size, dtype=int)  # Number of labels after segmentation
+                list_relabel_obj = []
+                for ind in ind_to_segment:
+                    first, last = label_index.bounds[ind], label_index.bounds[ind+1]
+                    subset_range = sorted_range[first:last] - np.min(sorted_range[first:last])
+                    subset_azimuth = sorted_azimuth[first:last] - np.min(sorted_azimuth[first:last])
+                    
+                    relabel_obj = my_segmentation.relabel_lake_using_segmentation_heigth(subset_range, subset_azimuth, 
+                                                                                         sorted_corrected_height[first:last],
+                                                                                         sorted_pixel_area[first:last], 
+                                                                                         min_object_size, seg_method)
+                    nb_new_labels[ind] = max(np.max(relabel_obj), 0)
+                    list_relabel_obj.append(relabel_obj)
+                
+                # 4.1.4 - Compute new labels: labels of each object follow those of the previous objects
+                label_offset = np.cumsum(nb_new_labels) - nb_new_labels
+                labels_tmp[sorted_index] = np.repeat(label_offset + 1, label_index.counts)
+                for ind, relabel_obj in zip(ind_to_segment, list_relabel_obj):
+                    first, last = label_index.bounds[ind], label_index.bounds[ind+1]
+                    labels_tmp[sorted_index[first:last]] = label_offset[ind] + relabel_obj
 
             self.labels = labels_tmp
-        self.nb_obj = np.unique(self.labels).size
+            
+        # 5 - Index pixels of each label, shared by all the per-object processings
+        self.label_index = my_tools.LabelIndex(self.labels)
+        self.nb_obj = self.label_index.labels.size
 
     def compute_obj_inside_tile(self, az_0_geom, az_max_geom, az_0_and_max_geom):
         """
@@ -722,8 +735,8 @@ class PixelCloud(object):
         self.labels_at_top_edge = np.setdiff1d(labels_at_az_max, self.labels_at_both_edges)
 
         # 5 - Identify labels of objects intersecting az_0_geom, az_max_geom, az_0_and_max_geom
-        for l in np.unique(self.labels):
-            idx = np.where(self.labels == l)
+        for l in self.label_index.labels:
+            idx = self.label_index.get_index(l)
 
             bb_geom = my_tools.get_bounding_box(np.min(self.latitude[idx]), np.max(self.latitude[idx]),
                                                 np.min(self.longitude[idx]), np.max(self.longitude[idx]))
@@ -777,50 +790,21 @@ class PixelCloud(object):
             
         else:
             
-            flag_start = False
+            list_edge_index = []
+            list_edge_label = []
+            list_edge_loc = []
             
-            # 1 - Fill with bottom edge objects
-            if self.nb_obj_at_bottom_edge != 0:
-                flag_start = True
-                self.edge_index = np.where(self.labels == self.labels_at_bottom_edge[0])[0]  # Get PixC pixels related to bottom edge object
-                self.edge_label = np.ones(self.edge_index.size) * self.labels_at_bottom_edge[0]  # Associated label vector
-                self.edge_loc = np.zeros(self.edge_index.size)  # Associated location: 0=bottom 1=top 2=both
-                for indl in np.arange(1, self.nb_obj_at_bottom_edge):  # Loop over the other bottom edge objects
-                    tmp_index = np.where(self.labels == self.labels_at_bottom_edge[indl])[0]  # Get pixels related to edge object
-                    self.edge_index = np.append(self.edge_index, tmp_index)
-                    self.edge_label = np.append(self.edge_label, np.ones(tmp_index.size) * self.labels_at_bottom_edge[indl])
-                    self.edge_loc = np.append(self.edge_loc, np.zeros(tmp_index.size))
-                    
-            # 2 - Fill with top edge objects
-            if self.nb_obj_at_top_edge != 0:
-                if flag_start is False:
-                    flag_start = True
-                    idx_start = 1
-                    self.edge_index = np.where(self.labels == self.labels_at_top_edge[0])[0]  # Get PixC pixels related to top edge object
-                    self.edge_label = np.ones(self.edge_index.size) * self.labels_at_top_edge[0]  # Associated label vector
-                    self.edge_loc = np.zeros(self.edge_index.size) + 1  # Associated location: 0=bottom 1=top 2=both
-                else:
-                    idx_start = 0
-                for indl in np.arange(idx_start, self.nb_obj_at_top_edge):  # Loop over the other top edge objects
-                    tmp_index = np.where(self.labels == self.labels_at_top_edge[indl])[0]  # Get pixels related to edge object
-                    self.edge_index = np.append(self.edge_index, tmp_index)
-                    self.edge_label = np.append(self.edge_label, np.ones(tmp_index.size) * self.labels_at_top_edge[indl])
-                    self.edge_loc = np.append(self.edge_loc, np.zeros(tmp_index.size) + 1)
-                    
-            # 3 - Fill with bottom and top edges objects
-            if self.nb_obj_at_both_edges != 0:
-                if flag_start is False:
-                    idx_start = 1
-                    self.edge_index = np.where(self.labels == self.labels_at_both_edges[0])[0]  # Get PixC pixels related to both edges object
-                    self.edge_label = np.ones(self.edge_index.size) * self.labels_at_both_edges[0]  # Associated label vector
-                    self.edge_loc = np.zeros(self.edge_index.size) + 2  # Associated location: 0=bottom 1=top 2=both
-                else:
-                    idx_start = 0
-                for indl in np.arange(idx_start, self.nb_obj_at_both_edges):  # Loop over the other both edges objects
-                    tmp_index = np.where(self.labels == self.labels_at_both_edges[indl])[0]  # Get pixels related to edge object
-                    self.edge_index = np.append(self.edge_index, tmp_index)
-                    self.edge_label = np.append(self.edge_label, np.ones(tmp_index.size) * self.labels_at_both_edges[indl])
-                    self.edge_loc = np.append(self.edge_loc, np.zeros(tmp_index.size) + 2)
+            # 1 - Fill with bottom edge objects (location=0), then top edge objects (location=1),
+            #     then bottom and top edges objects (location=2)
+            for edge_loc, labels_at_edge in enumerate([self.labels_at_bottom_edge, self.labels_at_top_edge, self.labels_at_both_edges]):
+                for cur_label in labels_at_edge:
+                    tmp_index = self.label_index.get_index(cur_label)  # Get pixels related to edge object
+                    list_edge_index.append(tmp_index)
+                    list_edge_label.append(np.ones(tmp_index.size) * cur_label)  # Associated label vector
+                    list_edge_loc.append(np.zeros(tmp_index.size) + edge_loc)  # Associated location: 0=bottom 1=top 2=both
+            self.edge_index = np.concatenate(list_edge_index)
+            self.edge_label = np.concatenate(list_edge_label)
+            self.edge_loc = np.concatenate(list_edge_loc)
                     
             # 4 - Number of edge pixels
             self.nb_edge_pix = self.edge_index.size
@@ -1216,3 +1200,41 @@ class PixelCloud(object):
 
         # 3 - Destroy the data sources to free resources
         out_data_source.Destroy()
+
+
+#######################################
+
+
+def compute_tile_poly(in_pixc_reader):
+    """
+    Create polygon of the tile from the global attributes of the PIXC file
+
+    :param in_pixc_reader: reader of the L2_HR_PIXC file
+    :type in_pixc_reader: my_netcdf_file.MyNcReader
+
+    :return: polygon of the PixC tile
+    :rtype: ogr.Polygon
+    """
+    ring = ogr.Geometry(ogr.wkbLinearRing)
+    for corner in ["inner_first", "outer_first", "outer_last", "inner_last", "inner_first"]:
+        ring.AddPoint(my_tools.convert_to_m180_180(float(in_pixc_reader.get_att_value("%s_longitude" % corner))),
+                                                   float(in_pixc_reader.get_att_value("%s_latitude" % corner)))
+    out_poly = ogr.Geometry(ogr.wkbPolygon)
+    out_poly.AddGeometry(ring)
+    return out_poly
+
+
+def get_tile_poly_from_pixc_file(in_pixc_file):
+    """
+    Retrieve polygon of the tile from the global attributes of a L2_HR_PIXC file, without reading its variables
+
+    :param in_pixc_file: full path of L2_HR_PIXC file
+    :type in_pixc_file: string
+
+    :return: polygon of the PixC tile
+    :rtype: ogr.Polygon
+    """
+    pixc_reader = my_nc.MyNcReader(in_pixc_file)
+    out_poly = compute_tile_poly(pixc_reader)
+    pixc_reader.close()
+    return out_poly
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: conftest.py
+    :synopsis: pytest configuration of the processing unit tests
+     Make the processing sources importable without setting PYTHONPATH (see README)
+
+..
+   This file is part of the SWOT Hydrology Toolbox
+   Copyright (C) 2018 Centre National d’Etudes Spatiales
+   This software is released under open source license LGPL v.3 and is distributed WITHOUT ANY WARRANTY, read LICENSE.txt for further details.
+
+"""
+import os
+import sys
+
+PROCESSING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(PROCESSING_DIR, "src"), os.path.join(PROCESSING_DIR, "src", "cnes", "sas")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
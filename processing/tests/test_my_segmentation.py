@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: test_my_segmentation.py
+    :synopsis: unit tests of height segmentation methods of cnes.common.lib.my_segmentation
+     Histogram-based k-means (method 5) is compared with its former sklearn implementation on synthetic lakes
+
+..
+   This file is part of the SWOT Hydrology Toolbox
+   Copyright (C) 2018 Centre National d’Etudes Spatiales
+   This software is released under open source license LGPL v.3 and is distributed WITHOUT ANY WARRANTY, read LICENSE.txt for further details.
+
+"""
+import numpy as np
+import pytest
+
+KMeans = pytest.importorskip("sklearn.cluster").KMeans
+
+import cnes.common.lib.my_segmentation as my_segmentation
+
+
+#######################################
+# Former implementation, used as reference
+
+
+def ref_get_kmeans_labelling(in_height):
+    """
+    Method 5 of relabel_lake_using_segmentation_heigth before histogram-based k-means
+    NB: its stopping test read a variable always set to None, which stopped the iterations after the 1st one
+    (std and count of a single dummy class); this effect is reproduced explicitly
+    """
+    std_heigth = np.std(in_height)
+    nb_classes = 1
+    min_count = 100
+    nb_pix_min_by_class = 30
+    in_std_height_max = 1
+    out_labels = np.ones(in_height.shape)
+    while std_heigth > in_std_height_max and min_count > nb_pix_min_by_class:
+        nb_classes += 1
+        kmeans_classif = KMeans(n_clusters=nb_classes, n_init=10, random_state=0)
+        kmeans_classif.fit(in_height.reshape(-1, 1))
+        out_labels = kmeans_classif.labels_
+        std_heigth = 0.
+        min_count = 1
+    return out_labels, nb_classes
+
+
+#######################################
+# Test data
+
+
+def synthetic_lake(in_list_height, in_list_nb_pix, in_noise=0.2, in_seed=0):
+    """
+    Build a lake made of several water bodies side by side along X, each at a given mean height
+
+    :return: X indices, Y indices, heights and areas of pixels, true class of pixels
+    """
+    rng = np.random.RandomState(in_seed)
+    list_x, list_y, list_height, list_class = [], [], [], []
+    x_offset = 0
+    for ind, (cur_height, cur_nb_pix) in enumerate(zip(in_list_height, in_list_nb_pix)):
+        nb_col = int(np.ceil(cur_nb_pix / 20.))
+        idx = np.arange(cur_nb_pix)
+        list_x.append(x_offset + idx // 20)
+        list_y.append(idx % 20)
+        list_height.append(cur_height + in_noise * rng.randn(cur_nb_pix))
+        list_class.append(np.full(cur_nb_pix, ind))
+        x_offset += nb_col
+    height = np.concatenate(list_height)
+    return np.concatenate(list_x), np.concatenate(list_y), height, np.full(height.shape, 50.), np.concatenate(list_class)
+
+
+def same_partition(in_labels1, in_labels2):
+    """
+    Test if 2 labellings define the same partition of pixels, whatever the label values
+    """
+    nb_pairs = np.unique(np.vstack((in_labels1, in_labels2)), axis=1).shape[1]
+    return nb_pairs == np.unique(in_labels1).size == np.unique(in_labels2).size
+
+
+LAKES = [
+    ([10.], [400]),  # 1 water body: height std below 1 m => 1 class
+    ([10., 15.], [400, 600]),
+    ([10., 13.], [800, 200]),
+    ([10., 15., 22.], [300, 400, 300]),  # 3 water bodies: still 2 classes, as before
+    ([10., 10.5, 16.], [500, 500, 300]),
+]
+
+
+#######################################
+# Tests
+
+
+@pytest.mark.parametrize("list_height, list_nb_pix", LAKES)
+@pytest.mark.parametrize("seed", [0, 1])
+def test_get_kmeans_labelling(list_height, list_nb_pix, seed):
+    _, _, height, _, _ = synthetic_lake(list_height, list_nb_pix, in_seed=seed)
+    labels, nb_classes, _ = my_segmentation.get_kmeans_labelling(height)
+    ref_labels, ref_nb_classes = ref_get_kmeans_labelling(height)
+    assert nb_classes == ref_nb_classes
+    assert np.unique(labels).size == np.unique(ref_labels).size
+    assert same_partition(labels, ref_labels)
+    assert np.array_equal(np.sort(np.unique(labels, return_counts=True)[1]),
+                          np.sort(np.unique(ref_labels, return_counts=True)[1]))
+
+
+@pytest.mark.parametrize("list_height, list_nb_pix", LAKES)
+def test_relabel_lake_kmeans(monkeypatch, list_height, list_nb_pix):
+    x, y, height, pix_area, _ = synthetic_lake(list_height, list_nb_pix)
+    labels = my_segmentation.relabel_lake_using_segmentation_heigth(x, y, height, pix_area, 1000., 5)
+    monkeypatch.setattr(my_segmentation, "get_kmeans_labelling",
+                        lambda in_height: ref_get_kmeans_labelling(in_height) + (0.,))
+    ref_labels = my_segmentation.relabel_lake_using_segmentation_heigth(x, y, height, pix_area, 1000., 5)
+    assert np.array_equal(labels, ref_labels)
+
+
+def test_get_kmeans_labelling_two_lakes():
+    _, _, height, _, true_class = synthetic_lake([10., 15.], [400, 600])
+    labels, nb_classes, std_height = my_segmentation.get_kmeans_labelling(height)
+    assert nb_classes == 2
+    assert same_partition(labels, true_class)
+    assert std_height < 1.
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: test_my_tools.py
+    :synopsis: unit tests of raster/vector conversion functions of cnes.common.lib.my_tools
+     Vectorised functions are compared with their former per-pixel loop implementation
+
+..
+   This file is part of the SWOT Hydrology Toolbox
+   Copyright (C) 2018 Centre National d’Etudes Spatiales
+   This software is released under open source license LGPL v.3 and is distributed WITHOUT ANY WARRANTY, read LICENSE.txt for further details.
+
+"""
+import numpy as np
+import pytest
+
+import cnes.common.lib.my_tools as my_tools
+
+
+#######################################
+# Former loop implementations, used as reference
+
+
+def ref_compute_bin_mat(in_size_x, in_size_y, in_x, in_y):
+    np.max(in_x)  # Same exception as the original function for empty inputs
+    out_bin_im = np.zeros((in_size_y, in_size_x))
+    for ind in range(in_x.size):
+        out_bin_im[in_y[ind], in_x[ind]] = 1
+    return out_bin_im
+
+
+def ref_get_1d_from_2d(img, in_x, in_y):
+    vect = np.zeros(in_x.shape)
+    for ind in range(in_x.size):
+        vect[ind] = img[in_y[ind], in_x[ind]]
+    return vect
+
+
+def ref_get_2d_from_1d(vect, in_x, in_y):
+    img = np.zeros((np.max(in_y) + 1, np.max(in_x) + 1))
+    for ind in range(in_x.size):
+        img[in_y[ind], in_x[ind]] = vect[ind]
+    return img
+
+
+def ref_convert_2d_mat_in_1d_vec(in_x, in_y, in_mat):
+    out_vector = np.zeros(in_x.size)
+    for indp in range(in_x.size):
+        out_vector[indp] = in_mat[in_y[indp], in_x[indp]]
+    return out_vector
+
+
+#######################################
+# Test data
+
+
+FILL_VALUE = -9999.0
+
+
+def random_pixels(in_nb_pix, in_size_x=40, in_size_y=30, in_seed=0):
+    """
+    Random pixel coordinates (with many duplicates) and values, some of them being fill values
+    """
+    rng = np.random.RandomState(in_seed)
+    out_x = rng.randint(0, in_size_x, in_nb_pix)
+    out_y = rng.randint(0, in_size_y, in_nb_pix)
+    out_val = rng.normal(size=in_nb_pix)
+    out_val[rng.random_sample(in_nb_pix) < 0.2] = FILL_VALUE
+    return out_x, out_y, out_val
+
+
+def random_image(in_size_x=40, in_size_y=30, in_seed=1):
+    """
+    Random image with fill values and NaN
+    """
+    rng = np.random.RandomState(in_seed)
+    out_img = rng.normal(size=(in_size_y, in_size_x))
+    out_img[rng.random_sample(out_img.shape) < 0.2] = FILL_VALUE
+    out_img[rng.random_sample(out_img.shape) < 0.05] = np.nan
+    return out_img
+
+
+CASES = [
+    # Nb pixels, seed
+    (1, 0),
+    (50, 1),
+    (5000, 2),  # Many duplicate pixels
+]
+
+
+#######################################
+
+
+@pytest.mark.parametrize("nb_pix, seed", CASES)
+def test_compute_bin_mat(nb_pix, seed):
+    in_x, in_y, _ = random_pixels(nb_pix, in_seed=seed)
+    res = my_tools.compute_bin_mat(40, 30, in_x, in_y, verbose=False)
+    ref = ref_compute_bin_mat(40, 30, in_x, in_y)
+    assert res.shape == ref.shape
+    assert res.dtype == ref.dtype
+    np.testing.assert_array_equal(res, ref)
+
+
+def test_compute_bin_mat_duplicates():
+    in_x = np.array([3, 3, 3, 0])
+    in_y = np.array([1, 1, 1, 0])
+    res = my_tools.compute_bin_mat(4, 2, in_x, in_y, verbose=False)
+    np.testing.assert_array_equal(res, ref_compute_bin_mat(4, 2, in_x, in_y))
+    assert res.sum() == 2
+
+
+def test_compute_bin_mat_empty():
+    in_x = np.array([], dtype=int)
+    with pytest.raises(ValueError):
+        ref_compute_bin_mat(4, 2, in_x, in_x)
+    with pytest.raises(ValueError):
+        my_tools.compute_bin_mat(4, 2, in_x, in_x, verbose=False)
+
+
+@pytest.mark.parametrize("nb_pix, seed", CASES)
+def test_get_1d_from_2d(nb_pix, seed):
+    in_x, in_y, _ = random_pixels(nb_pix, in_seed=seed)
+    img = random_image()
+    res = my_tools.get_1d_from_2d(img, in_x, in_y)
+    ref = ref_get_1d_from_2d(img, in_x, in_y)
+    assert res.shape == ref.shape
+    assert res.dtype == ref.dtype
+    np.testing.assert_array_equal(res, ref)  # NaN compared as equal
+
+
+def test_get_1d_from_2d_int_image():
+    img = np.arange(12).reshape(3, 4)
+    in_x = np.array([0, 3, 3])
+    in_y = np.array([2, 0, 0])
+    res = my_tools.get_1d_from_2d(img, in_x, in_y)
+    np.testing.assert_array_equal(res, ref_get_1d_from_2d(img, in_x, in_y))
+    assert res.dtype == np.float64
+
+
+def test_get_1d_from_2d_empty():
+    in_x = np.array([], dtype=int)
+    res = my_tools.get_1d_from_2d(random_image(), in_x, in_x)
+    assert res.size == 0
+    np.testing.assert_array_equal(res, ref_get_1d_from_2d(random_image(), in_x, in_x))
+
+
+@pytest.mark.parametrize("nb_pix, seed", CASES)
+def test_get_2d_from_1d(nb_pix, seed):
+    in_x, in_y, vect = random_pixels(nb_pix, in_seed=seed)
+    res = my_tools.get_2d_from_1d(vect, in_x, in_y)
+    ref = ref_get_2d_from_1d(vect, in_x, in_y)
+    assert res.shape == ref.shape
+    assert res.dtype == ref.dtype
+    np.testing.assert_array_equal(res, ref)
+
+
+def test_get_2d_from_1d_duplicates_last_value_kept():
+    in_x = np.array([1, 1, 0, 1])
+    in_y = np.array([0, 0, 0, 0])
+    vect = np.array([5., FILL_VALUE, 2., 7.])
+    res = my_tools.get_2d_from_1d(vect, in_x, in_y)
+    np.testing.assert_array_equal(res, ref_get_2d_from_1d(vect, in_x, in_y))
+    assert res[0, 1] == 7.
+
+
+def test_get_2d_from_1d_empty():
+    in_x = np.array([], dtype=int)
+    with pytest.raises(ValueError):
+        ref_get_2d_from_1d(np.array([]), in_x, in_x)
+    with pytest.raises(ValueError):
+        my_tools.get_2d_from_1d(np.array([]), in_x, in_x)
+
+
+@pytest.mark.parametrize("nb_pix, seed", CASES)
+def test_convert_2d_mat_in_1d_vec(nb_pix, seed):
+    in_x, in_y, _ = random_pixels(nb_pix, in_seed=seed)
+    img = random_image()
+    res = my_tools.convert_2d_mat_in_1d_vec(in_x, in_y, img)
+    ref = ref_convert_2d_mat_in_1d_vec(in_x, in_y, img)
+    assert res.shape == ref.shape
+    assert res.dtype == ref.dtype
+    np.testing.assert_array_equal(res, ref)
+
+
+def test_convert_2d_mat_in_1d_vec_empty():
+    in_x = np.array([], dtype=int)
+    res = my_tools.convert_2d_mat_in_1d_vec(in_x, in_x, random_image())
+    assert res.size == 0
+    np.testing.assert_array_equal(res, ref_convert_2d_mat_in_1d_vec(in_x, in_x, random_image()))
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: test_proc_pixc_sp.py
+    :synopsis: unit tests of the gathering of LakeTile edge labels in cnes.sas.lake_sp.proc_pixc_sp
+     match_labels is compared with a reference connected-components grouping on large synthetic edge-pair lists;
+     label_matching tests pin the differences with the former grouping (None correspondance, transitive merges)
+
+..
+   This file is part of the SWOT Hydrology Toolbox
+   Copyright (C) 2018 Centre National d’Etudes Spatiales
+   This software is released under open source license LGPL v.3 and is distributed WITHOUT ANY WARRANTY, read LICENSE.txt for further details.
+
+"""
+import numpy as np
+import pytest
+
+import cnes.sas.lake_sp.proc_pixc_sp as proc_pixc_sp
+
+
+#######################################
+# Reference grouping
+
+
+def ref_match_labels(in_liste):
+    """
+    Connected components of the graph whose nodes are the labels of tiles 1 and 2 and whose edges are the tuples of in_liste
+    (None being no correspondance), by breadth-first search; output as a set of entities, order not considered
+    """
+    neighbours = {}
+    for (label1, label2) in in_liste:
+        if label1 is not None:
+            neighbours.setdefault((1, label1), set())
+        if label2 is not None:
+            neighbours.setdefault((2, label2), set())
+        if (label1 is not None) and (label2 is not None):
+            neighbours[(1, label1)].add((2, label2))
+            neighbours[(2, label2)].add((1, label1))
+    out_entities = set()
+    visited = set()
+    for node in neighbours:
+        if node in visited:
+            continue
+        group = []
+        to_visit = [node]
+        visited.add(node)
+        while to_visit:
+            cur_node = to_visit.pop()
+            group.append(cur_node)
+            for next_node in neighbours[cur_node]:
+                if next_node not in visited:
+                    visited.add(next_node)
+                    to_visit.append(next_node)
+        out_entities.add((frozenset([label for (tile, label) in group if tile == 1]),
+                          frozenset([label for (tile, label) in group if tile == 2])))
+    return out_entities
+
+
+def as_set(in_labels_match):
+    """
+    Convert the output of match_labels to a set of entities, checking that no label is in 2 entities
+    """
+    out_entities = set()
+    nb_labels1 = 0
+    nb_labels2 = 0
+    for (set_label_tile1, set_label_tile2) in in_labels_match:
+        assert set_label_tile1 or set_label_tile2
+        nb_labels1 += len(set_label_tile1)
+        nb_labels2 += len(set_label_tile2)
+        out_entities.add((frozenset(set_label_tile1), frozenset(set_label_tile2)))
+    assert nb_labels1 == len(set().union(*[set_label_tile1 for (set_label_tile1, _) in in_labels_match]))
+    assert nb_labels2 == len(set().union(*[set_label_tile2 for (_, set_label_tile2) in in_labels_match]))
+    assert len(out_entities) == len(in_labels_match)
+    return out_entities
+
+
+def synthetic_pairs(in_nb_pairs, in_nb_labels, in_rate_none, in_seed):
+    """
+    Synthetic list of edge pairs (label of tile 1, label of tile 2), with a rate of labels without correspondance
+    """
+    rng = np.random.RandomState(in_seed)
+    out_liste = []
+    for _ in range(in_nb_pairs):
+        label1 = int(rng.randint(1, in_nb_labels + 1))
+        label2 = int(rng.randint(1, in_nb_labels + 1))
+        draw = rng.random_sample()
+        if draw < in_rate_none / 2.:
+            label1 = None
+        elif draw < in_rate_none:
+            label2 = None
+        out_liste.append((label1, label2))
+    return out_liste
+
+
+#######################################
+# match_labels
+
+
+def test_match_labels_docstring_example():
+    liste = [("a", "r"), ("a", "s"), ("b", "s"), ("b", "t"), ("c", "u"), ("d", "u")]
+    assert proc_pixc_sp.match_labels(liste) == [({"a", "b"}, {"r", "s", "t"}), ({"c", "d"}, {"u"})]
+
+
+def test_match_labels_no_correspondance():
+    liste = [(1, None), (None, 5), (2, 6), (3, None), (None, 7)]
+    assert proc_pixc_sp.match_labels(liste) == [({1}, set()), ({3}, set()), (set(), {5}), (set(), {7}), ({2}, {6})]
+
+
+def test_match_labels_none_does_not_gather():
+    # Labels 2 and 5 both have no correspondance for part of their pixels: they must not be gathered through None
+    liste = [(4, 4), (4, 7), (5, None), (2, None), (1, 6), (1, 8), (5, 6), (5, 8)]
+    res = proc_pixc_sp.match_labels(liste)
+    assert as_set(res) == {(frozenset([4]), frozenset([4, 7])),
+                           (frozenset([1, 5]), frozenset([6, 8])),
+                           (frozenset([2]), frozenset())}
+    liste = [(1, 5), (None, 5), (None, 6)]
+    assert as_set(proc_pixc_sp.match_labels(liste)) == {(frozenset([1]), frozenset([5])), (frozenset(), frozenset([6]))}
+
+
+def test_match_labels_transitive():
+    # Label c is linked to the entities of a and b: all are gathered in a single entity
+    liste = [("a", "r"), ("b", "s"), ("c", "r"), ("c", "s")]
+    assert proc_pixc_sp.match_labels(liste) == [({"a", "b", "c"}, {"r", "s"})]
+
+
+def test_match_labels_empty():
+    assert proc_pixc_sp.match_labels([]) == []
+
+
+@pytest.mark.parametrize("nb_pairs, nb_labels, rate_none, seed", [
+    (20, 10, 0.2, 0),
+    (2000, 3000, 0.1, 1),
+    (20000, 20000, 0.3, 2),
+    (50000, 5000, 0.05, 3),  # Large entities
+])
+def test_match_labels_synthetic(nb_pairs, nb_labels, rate_none, seed):
+    liste = synthetic_pairs(nb_pairs, nb_labels, rate_none, seed)
+    res = proc_pixc_sp.match_labels(liste)
+    assert as_set(res) == ref_match_labels(liste)
+
+
+@pytest.mark.parametrize("liste", [
+    [(label, None) for label in range(100000)],  # Only labels without correspondance
+    [(None, label) for label in range(100000)],
+    [(label, label) for label in range(100000)],
+    [(label // 2, label // 2 + label % 2) for label in range(100000)],  # Single chained entity
+])
+def test_match_labels_scaling(liste):
+    res = proc_pixc_sp.match_labels(liste)
+    assert as_set(res) == ref_match_labels(liste)
+
+
+#######################################
+# get_entity_index
+
+
+def test_get_entity_index():
+    labels = np.array([0, 3, 7, 3, 5, 9, 1])
+    res = proc_pixc_sp.get_entity_index(labels, [{3, 1}, {None}, set(), {9, 0}])
+    np.testing.assert_array_equal(res, [-1, 0, -1, 0, -1, 3, 0])
+
+
+def test_get_entity_index_no_entity():
+    labels = np.array([0, 3, 7])
+    np.testing.assert_array_equal(proc_pixc_sp.get_entity_index(labels, []), [-1, -1, -1])
+    np.testing.assert_array_equal(proc_pixc_sp.get_entity_index(np.array([], dtype=int), [{1}]), [])
+
+
+#######################################
+# label_matching
+
+
+def relabel_edge(monkeypatch, in_old_labels1, in_old_labels2, in_new_labels1, in_new_labels2):
+    """
+    Run label_matching over the edge between 2 tiles, all pixels being in the azimuth buffer
+    and belonging to lakes covering at most 2 tiles
+
+    :return: global label of each pixel of tile 1, then tile 2
+    """
+    old_labels = np.array(in_old_labels1 + in_old_labels2)
+    obj_swath = object.__new__(proc_pixc_sp.PixCEdgeSwath)
+    obj_swath.edge_label = old_labels
+    obj_swath.edge_loc = np.zeros(old_labels.size, dtype=int)
+    obj_swath.labels = np.zeros(old_labels.size, dtype=int)
+    tile_idx1 = np.arange(len(in_old_labels1))
+    tile_idx2 = np.arange(len(in_old_labels1), old_labels.size)
+    monkeypatch.setattr(obj_swath, "select_edge_labels", lambda idx1, idx2: (old_labels[idx1], old_labels[idx2]))
+    obj_swath.label_matching(tile_idx1, tile_idx2, np.array(in_new_labels1 + in_new_labels2))
+    return obj_swath.labels
+
+
+def test_label_matching_none_does_not_gather(monkeypatch):
+    # Edge pairs: (4, 4), (4, 7) ; (5, None) ; (2, None) ; (1, 6), (1, 8), (5, 6), (5, 8)
+    # The former grouping gathered label 2 of tile 1 with labels 1 and 5 through their common None correspondance
+    labels = relabel_edge(monkeypatch, [4, 5, 2, 1, 5], [4, 7, 6, 8], [10, 11, 12, 13, 13], [10, 10, 13, 13])
+    assert np.unique(labels).size == 3
+    assert labels[0] == labels[5] == labels[6]
+    assert labels[1] == labels[3] == labels[4] == labels[7] == labels[8]
+    assert labels[2] not in labels[[0, 1, 3, 4, 5, 6, 7, 8]]
+
+
+def test_label_matching_transitive(monkeypatch):
+    # Edge pairs: (1, 11) ; (2, 12) ; (3, 11), (3, 12)
+    # The former grouping copied label 3 into the entities of labels 1 and 2 instead of merging them, which split the lake
+    labels = relabel_edge(monkeypatch, [1, 2, 3, 3], [11, 12, 11, 12], [100, 101, 102, 102], [100, 101, 102, 102])
+    assert np.unique(labels).size == 1
+    assert labels[0] > 0
+
+
+#######################################
+# get_tile_position
+
+
+def swath_with_tiles(in_tile_num):
+    """
+    PixCEdgeSwath object with only its list of tile numbers set
+    """
+    obj_swath = object.__new__(proc_pixc_sp.PixCEdgeSwath)
+    obj_swath.tile_num = in_tile_num
+    return obj_swath
+
+
+def test_get_tile_position():
+    obj_swath = swath_with_tiles([12, 10, 15, 11])
+    assert obj_swath.get_tile_position(15) == 2
+    np.testing.assert_array_equal(obj_swath.get_tile_position(np.array([10, 11, 12, 15, 10])), [1, 3, 0, 2, 1])
+    np.testing.assert_array_equal(obj_swath.get_tile_position(np.array([], dtype=int)), [])
+
+
+@pytest.mark.parametrize("tile_num", [13, 9, 16, np.array([10, 13]), np.array([16, 11])])
+def test_get_tile_position_missing_tile(tile_num):
+    obj_swath = swath_with_tiles([12, 10, 15, 11])
+    with pytest.raises(proc_pixc_sp.service_error.ProcessingError):
+        obj_swath.get_tile_position(tile_num)
+    with pytest.raises(proc_pixc_sp.service_error.ProcessingError):
+        swath_with_tiles([]).get_tile_position(tile_num)
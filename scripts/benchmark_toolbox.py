@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+'''
+.. module:: benchmark_toolbox.py
+    :synopsis: Run the processing chains of the toolbox over test datasets (ex: test/saumur) and record, for each step
+                and each named stage, the wall time and the memory (peak resident memory of the step process, rise of
+                this peak during each stage)
+                Results are written in a JSON file, which can be compared with the one of another commit
+
+ This file is part of the SWOT Hydrology Toolbox
+ Copyright (C) 2018 Centre National d’Etudes Spatiales
+ This software is released under open source license LGPL v.3 and is distributed WITHOUT ANY WARRANTY, read LICENSE.txt for further details.
+'''
+
+import argparse
+from collections import OrderedDict
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+# Environment variable read by my_timer to append stage measurements to a file (see my_timer.BENCHMARK_ENV_VAR)
+BENCHMARK_ENV_VAR = "SHT_BENCHMARK_FILE"
+
+# Steps of the chain, in processing order, with their command relative to the dataset directory (cf. test/*/run_all.sh)
+# NB: the --nogdem flag of run_all.sh is not given, as it is an option of none of these scripts
+STEPS = OrderedDict()
+STEPS["sisimp"] = ["sisimp/proc_sisimp.py", "rdf/parameter_sisimp.rdf"]
+STEPS["river"] = ["scripts/l2pixc_to_rivertile.py", "output/simu", "output/river", "rdf/parameter_river.rdf"]
+STEPS["lake"] = ["scripts/rivertile_to_laketile.py", "output/river", "output/lake", "rdf/parameter_laketile.cfg",
+                 "-output_dir_lakesp", "output/lakesp"]
+STEPS["floodplain"] = ["floodplain/scripts/process_floodplain.py"]
+
+
+#######################################
+
+
+def get_toolbox_dir():
+    """
+    Get the root directory of the toolbox: SWOT_HYDROLOGY_TOOLBOX environment variable if set, parent of this script else
+
+    :return: root directory of the toolbox
+    :rtype: str
+    """
+    retour = os.environ.get("SWOT_HYDROLOGY_TOOLBOX")
+    if not retour:
+        retour = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return retour
+
+
+def get_commit(in_toolbox_dir):
+    """
+    Get the git commit of the toolbox, to identify the benchmarked version
+
+    :param in_toolbox_dir: root directory of the toolbox
+    :type in_toolbox_dir: str
+
+    :return: commit hash (None if not a git repository)
+    :rtype: str
+    """
+    try:
+        retour = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=in_toolbox_dir,
+                                         stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        retour = None
+    return retour
+
+
+def read_stages(in_stage_file):
+    """
+    Read the stage measurements written by my_timer and aggregate them by stage name
+
+    :param in_stage_file: file with 1 JSON record per line
+    :type in_stage_file: str
+
+    :return: for each stage name, number of calls, cumulated wall time (s) and max rise of the peak memory (MB)
+    :rtype: OrderedDict
+    """
+    retour = OrderedDict()
+    if os.path.exists(in_stage_file):
+        with open(in_stage_file) as fp:
+            for line in fp:
+                record = json.loads(line)
+                if record["stage"] not in retour:
+                    retour[record["stage"]] = {"count": 0, "wall_time": 0.0, "peak_memory_rise": None}
+                cur_stage = retour[record["stage"]]
+                cur_stage["count"] += 1
+                cur_stage["wall_time"] += record["wall_time"]
+                if record["peak_memory_rise"] is not None:
+                    cur_stage["peak_memory_rise"] = max(cur_stage["peak_memory_rise"] or 0.0, record["peak_memory_rise"])
+    return retour
+
+
+def run_step(in_name, in_cmd, in_cwd):
+    """
+    Run a step of the chain in a subprocess and measure it
+
+    :param in_name: name of the step
+    :type in_name: str
+    :param in_cmd: command to run
+    :type in_cmd: list of str
+    :param in_cwd: working directory of the command
+    :type in_cwd: str
+
+    :return: measurements of the step
+    :rtype: dict
+    """
+    print("> Step %s: %s" % (in_name, " ".join(in_cmd)))
+
+    fd, stage_file = tempfile.mkstemp(prefix="sht_benchmark_", suffix=".jsonl")
+    os.close(fd)
+    env = dict(os.environ)
+    env[BENCHMARK_ENV_VAR] = stage_file
+
+    try:
+        start_time = time.time()
+        proc = subprocess.Popen(in_cmd, cwd=in_cwd, env=env)
+        # wait4 gives the resource usage of this process only
+        _, status, rusage = os.wait4(proc.pid, 0)
+        wall_time = time.time() - start_time
+        stages = read_stages(stage_file)
+    finally:
+        os.remove(stage_file)
+
+    return_code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+    print("  return code = %d ; wall time = %.1f s ; peak memory = %.1f MB" % (return_code, wall_time, rusage.ru_maxrss / 1024.0))
+
+    return {"name": in_name,
+            "command": in_cmd,
+            "return_code": return_code,
+            "wall_time": wall_time,
+            "peak_memory": rusage.ru_maxrss / 1024.0,
+            "stages": stages}
+
+
+def run_dataset(in_dataset_dir, in_steps, in_floodplain_rdf=None, in_clean=False):
+    """
+    Run the selected steps over a test dataset
+
+    :param in_dataset_dir: dataset directory (ex: test/saumur)
+    :type in_dataset_dir: str
+    :param in_steps: names of the steps to run, among STEPS keys
+    :type in_steps: list of str
+    :param in_floodplain_rdf: parameter file of the floodplain chain (step skipped if None)
+    :type in_floodplain_rdf: str
+    :param in_clean: if True, run clean.sh of the dataset before the steps
+    :type in_clean: bool
+
+    :return: measurements of the dataset
+    :rtype: dict
+    """
+    toolbox_dir = get_toolbox_dir()
+    dataset_dir = os.path.abspath(in_dataset_dir)
+    print("===== Dataset %s =====" % dataset_dir)
+
+    if in_clean and os.path.exists(os.path.join(dataset_dir, "clean.sh")):
+        subprocess.call(["bash", "clean.sh"], cwd=dataset_dir)
+
+    list_steps = []
+    for step in in_steps:
+        cwd = dataset_dir
+        cmd = [sys.executable, os.path.join(toolbox_dir, STEPS[step][0])] + STEPS[step][1:]
+        if step == "lake":
+            os.makedirs(os.path.join(dataset_dir, "output", "lakesp"), exist_ok=True)
+        elif step == "floodplain":
+            if in_floodplain_rdf is None:
+                print("> Step floodplain skipped: no parameter file given")
+                continue
+            # Floodplain scripts import their modules relatively to their directory
+            cwd = os.path.dirname(cmd[1])
+            cmd.append(os.path.abspath(in_floodplain_rdf))
+        cur_step = run_step(step, cmd, cwd)
+        list_steps.append(cur_step)
+        if cur_step["return_code"] != 0:
+            print("> Step %s failed: next steps skipped" % step)
+            break
+
+    return {"dataset": os.path.basename(dataset_dir), "steps": list_steps}
+
+
+def compare(in_result, in_reference):
+    """
+    Print the relative difference of wall time and memory between 2 benchmark results
+    Memory is the peak resident memory for a step, and the rise of this peak during the stage for a stage
+
+    :param in_result: current benchmark result
+    :type in_result: dict
+    :param in_reference: reference benchmark result
+    :type in_reference: dict
+    """
+    print("===== Comparison with commit %s =====" % in_reference.get("commit"))
+
+    def ratio(in_cur, in_ref):
+        if in_cur is None or not in_ref:
+            return "    n/a"
+        return "%+6.1f%%" % (100.0 * (in_cur - in_ref) / in_ref)
+
+    dict_ref = {}
+    for dataset in in_reference["datasets"]:
+        for step in dataset["steps"]:
+            dict_ref[(dataset["dataset"], step["name"], None)] = step
+            for name, cur_stage in step["stages"].items():
+                dict_ref[(dataset["dataset"], step["name"], name)] = cur_stage
+
+    for dataset in in_result["datasets"]:
+        for step in dataset["steps"]:
+            list_items = [(None, step, "peak_memory")] + [(name, cur_stage, "peak_memory_rise")
+                                                           for name, cur_stage in step["stages"].items()]
+            for name, cur, memory_key in list_items:
+                ref = dict_ref.get((dataset["dataset"], step["name"], name))
+                if ref is None:
+                    continue
+                print("%-12s %-12s %-40s time %s  memory %s" % (dataset["dataset"], step["name"], name or "(total)",
+                                                              ratio(cur["wall_time"], ref["wall_time"]),
+                                                              ratio(cur.get(memory_key), ref.get(memory_key))))
+
+
+#######################################
+
+
+def main():
+    """When run as a script"""
+
+    # 0 - Parse inline parameters
+    parser = argparse.ArgumentParser(description="Benchmark the toolbox chains over test datasets")
+    parser.add_argument("dataset_dir", nargs="+", help="test dataset directory (ex: test/saumur)", type=str)
+    parser.add_argument("-o", "--output", help="output JSON file", type=str, default="benchmark.json")
+    parser.add_argument("-s", "--steps", nargs="+", choices=list(STEPS.keys()), default=list(STEPS.keys()),
+                        help="steps to run, in chain order")
+    parser.add_argument("--floodplain_rdf", help="parameter file of the floodplain chain", type=str, default=None)
+    parser.add_argument("--clean", action="store_true", help="run clean.sh of each dataset before processing")
+    parser.add_argument("--reference", help="benchmark JSON file of another commit to compare with", type=str, default=None)
+    args = parser.parse_args()
+
+    # 1 - Run datasets
+    list_steps = [step for step in STEPS if step in args.steps]
+    result = OrderedDict()
+    result["commit"] = get_commit(get_toolbox_dir())
+    result["date"] = datetime.datetime.now().isoformat()
+    result["python"] = sys.version.split()[0]
+    result["datasets"] = [run_dataset(dataset_dir, list_steps, args.floodplain_rdf, args.clean)
+                          for dataset_dir in args.dataset_dir]
+
+    # 2 - Write results
+    with open(args.output, "w") as fp:
+        json.dump(result, fp, indent=2)
+    print("> Results written in %s" % args.output)
+
+    # 3 - Compare with reference
+    if args.reference:
+        with open(args.reference) as fp:
+            compare(result, json.load(fp))
+
+
+#######################################
+
+
+if __name__ == "__main__":
+    main()
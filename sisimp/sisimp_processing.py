@@ -375,7 +375,8 @@ class Processing(object):
             my_api.printInfo("")
             
             # 1 - Read orbit file
-            my_attributes = sisimp_fct.read_orbit(orbit_file, cycle_number, my_attributes)
+            with my_timer.stage("SISIMP.read_orbit"):
+                my_attributes = sisimp_fct.read_orbit(orbit_file, cycle_number, my_attributes)
             
             my_api.printInfo("")
             # 2 - Init SISIMP filenames object
@@ -386,13 +387,14 @@ class Processing(object):
 
             ## loop over tile
 
-            tile_values, tile_list = tiling.get_tiles_from_orbit(my_attributes, pass_number)
-            tropo = tropo_module.Tropo_module(my_attributes.tropo_model, 0, my_attributes.nb_pix_range, 0,
-                                                  len(tile_values), \
-                                                  my_attributes.tropo_error_stdv, my_attributes.tropo_error_mean,
-                                                  my_attributes.tropo_error_correlation, \
-                                                  my_attributes.tropo_error_map_file)
-            tropo.generate_tropo_field_over_pass(min(my_attributes.lat))
+            with my_timer.stage("SISIMP.tiling_and_tropo"):
+                tile_values, tile_list = tiling.get_tiles_from_orbit(my_attributes, pass_number)
+                tropo = tropo_module.Tropo_module(my_attributes.tropo_model, 0, my_attributes.nb_pix_range, 0,
+                                                      len(tile_values), \
+                                                      my_attributes.tropo_error_stdv, my_attributes.tropo_error_mean,
+                                                      my_attributes.tropo_error_correlation, \
+                                                      my_attributes.tropo_error_map_file)
+                tropo.generate_tropo_field_over_pass(min(my_attributes.lat))
 
 
             pre_tiling = True
@@ -403,10 +405,12 @@ class Processing(object):
                     my_api.printInfo("========================================================")
                     my_api.printInfo("[sisimp_processing] Processing tile %d " % (tile_number))
                     my_api.printInfo("========================================================")
-                    my_new_attributes = tiling.crop_orbit(my_attributes, tile_values, tile_number,
-                                                               tropo.tropo_map_rg_az)
+                    with my_timer.stage("SISIMP.crop_orbit"):
+                        my_new_attributes = tiling.crop_orbit(my_attributes, tile_values, tile_number,
+                                                                   tropo.tropo_map_rg_az)
                     # 3 - Process right swath
-                    my_new_attributes = sisimp_fct.make_pixel_cloud("Right", cycle_number, pass_number, my_new_attributes, tile_number)
+                    with my_timer.stage("SISIMP.right_swath"):
+                        my_new_attributes = sisimp_fct.make_pixel_cloud("Right", cycle_number, pass_number, my_new_attributes, tile_number)
                     my_api.printInfo("")
                     my_api.printInfo("[sisimp_processing] %s " % (time.stop()))
                     my_api.printInfo("")
@@ -415,13 +419,15 @@ class Processing(object):
                     time.start()
 
                     # 4 - Process left swath
-                    my_new_attributes = sisimp_fct.make_pixel_cloud("Left", cycle_number, pass_number, my_new_attributes, tile_number)
+                    with my_timer.stage("SISIMP.left_swath"):
+                        my_new_attributes = sisimp_fct.make_pixel_cloud("Left", cycle_number, pass_number, my_new_attributes, tile_number)
                     my_api.printInfo("")
                     my_api.printInfo("[sisimp_processing] %s " % (time.stop()))
                     my_api.printInfo("")
 
                     # 5 - Write swath polygons shapefile
-                    sisimp_fct.write_swath_polygons(my_new_attributes)
+                    with my_timer.stage("SISIMP.write_swath_polygons"):
+                        sisimp_fct.write_swath_polygons(my_new_attributes)
                     my_api.printInfo("")
                     my_api.printInfo("")
 
@@ -431,15 +437,18 @@ class Processing(object):
                 my_attributes.tile_number = 0
                 my_attributes.tropo_map_rg_az = tropo.tropo_map_rg_az
                 
-                my_attributes = sisimp_fct.make_pixel_cloud("Right", cycle_number, pass_number, my_attributes, my_attributes.tile_number)
+                with my_timer.stage("SISIMP.right_swath"):
+                    my_attributes = sisimp_fct.make_pixel_cloud("Right", cycle_number, pass_number, my_attributes, my_attributes.tile_number)
                 my_api.printInfo("")
 
                 # 4 - Process left swath
-                my_attributes = sisimp_fct.make_pixel_cloud("Left", cycle_number, pass_number, my_attributes, my_attributes.tile_number)
+                with my_timer.stage("SISIMP.left_swath"):
+                    my_attributes = sisimp_fct.make_pixel_cloud("Left", cycle_number, pass_number, my_attributes, my_attributes.tile_number)
                 my_api.printInfo("")
 
                 # 5 - Write swath polygons shapefile
-                sisimp_fct.write_swath_polygons(my_attributes)
+                with my_timer.stage("SISIMP.write_swath_polygons"):
+                    sisimp_fct.write_swath_polygons(my_attributes)
                 my_api.printInfo("")
                 my_api.printInfo("")
                 # Delete pickle file if exist
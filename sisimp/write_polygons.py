@@ -1161,42 +1161,59 @@ def azr_from_lonlat(IN_lon, IN_lat, IN_attributes, heau=0.):
     
     # from 50 to 500 to remove strange bug
     nb_points = 500
-    gamma = np.zeros([len(IN_lat), nb_points])
-    beta = np.zeros([len(IN_lat), nb_points])
+    
+    # Search, within nb_points orbit samples around OUT_azcoord, the one minimizing |gamma| for each point
+    # NB: only the current minimum is kept for each point (instead of N x nb_points gamma and beta matrices),
+    #     so that memory stays proportional to the number of points
+    theta = np.pi/2. - IN_lat
+    phi = IN_lon
+    x_ecef = np.sin(theta)*np.cos(phi)
+    y_ecef = np.sin(theta)*np.sin(phi)
+    z_ecef = np.cos(theta)
+    
+    az_int = OUT_azcoord.astype('i4')
+    nb_orbit = len(IN_attributes.costheta_init)
+    min_gamma = np.full(len(IN_lat), np.inf)
+    ind_min = np.zeros(len(IN_lat), int)
   
     for i in range(nb_points):
-        k = OUT_azcoord.astype('i4')+i-int(nb_points/2)
-        bad_ind = np.logical_or((k < 0), (k > len(IN_attributes.costheta_init)-1))
+        k = az_int+i-int(nb_points/2)
+        bad_ind = np.logical_or((k < 0), (k > nb_orbit-1))
         k[bad_ind] = 0.
-
-        theta = np.pi/2. - IN_lat
-        phi = IN_lon
         
         costheta_0 = IN_attributes.costheta_init[k, ]
-        sintheta_0 = IN_attributes.sintheta_init[k, ]
         cosphi_0 = IN_attributes.cosphi_init[k, ]
         sinphi_0 = IN_attributes.sinphi_init[k, ]
         cospsi_0 = IN_attributes.cospsi_init[k, ]
         sinpsi_0 = IN_attributes.sinpsi_init[k, ]
         
-        gamma[:, i] = (GEN_APPROX_RAD_EARTH+heau)*(np.sin(theta)*np.cos(phi)*(-cospsi_0*costheta_0*cosphi_0-sinpsi_0*sinphi_0) \
-                                                   + np.sin(theta)*np.sin(phi)*(-cospsi_0*costheta_0*sinphi_0+sinpsi_0*cosphi_0) \
-                                                   + np.cos(theta)*(cospsi_0*sintheta_0))
-                
-        beta[:, i] = (GEN_APPROX_RAD_EARTH+heau)*(np.sin(theta)*np.cos(phi)*(sinpsi_0*costheta_0*cosphi_0-cospsi_0*sinphi_0) \
-                                                 + np.sin(theta)*np.sin(phi)*(sinpsi_0*costheta_0*sinphi_0+cospsi_0*cosphi_0) \
-                                                 + np.cos(theta)*(-sinpsi_0*sintheta_0))
-
-        gamma[bad_ind, i] = 9.99e20
-        beta[bad_ind, i] = 9.99e20
-                
-    ind = np.zeros(len(IN_lat), int)   
-    y = np.zeros(len(IN_lat), float)   
-             
-    for i in range(len(IN_lat)):
-        indice = np.argmin(np.abs(gamma[i, :]))
-        y[i] = beta[i, indice]
-        ind[i] = indice - int(nb_points/2)
+        gamma = np.abs((GEN_APPROX_RAD_EARTH+heau)*(x_ecef*(-cospsi_0*costheta_0*cosphi_0-sinpsi_0*sinphi_0) \
+                                                    + y_ecef*(-cospsi_0*costheta_0*sinphi_0+sinpsi_0*cosphi_0) \
+                                                    + z_ecef*(cospsi_0*IN_attributes.sintheta_init[k, ])))
+        gamma[bad_ind] = 9.99e20
+        
+        # Keep the first minimum, as np.argmin
+        is_min = gamma < min_gamma
+        min_gamma[is_min] = gamma[is_min]
+        ind_min[is_min] = i
+        
+    # Compute beta for the selected orbit sample only
+    k = az_int+ind_min-int(nb_points/2)
+    bad_ind = np.logical_or((k < 0), (k > nb_orbit-1))
+    k[bad_ind] = 0.
+    
+    costheta_0 = IN_attributes.costheta_init[k, ]
+    sintheta_0 = IN_attributes.sintheta_init[k, ]
+    cosphi_0 = IN_attributes.cosphi_init[k, ]
+    sinphi_0 = IN_attributes.sinphi_init[k, ]
+    cospsi_0 = IN_attributes.cospsi_init[k, ]
+    sinpsi_0 = IN_attributes.sinpsi_init[k, ]
+    
+    y = (GEN_APPROX_RAD_EARTH+heau)*(x_ecef*(sinpsi_0*costheta_0*cosphi_0-cospsi_0*sinphi_0) \
+                                     + y_ecef*(sinpsi_0*costheta_0*sinphi_0+cospsi_0*cosphi_0) \
+                                     + z_ecef*(-sinpsi_0*sintheta_0))
+    y[bad_ind] = 9.99e20
+    ind = ind_min - int(nb_points/2)
     OUT_azcoord2 = OUT_azcoord + ind #-0.5
     #~ # Compute range coordinate (across track)
     OUT_azcoord2[np.where(OUT_azcoord2 < 0)] = 0